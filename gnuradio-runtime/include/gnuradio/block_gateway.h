@@ -26,6 +26,7 @@
 #include <gnuradio/api.h>
 #include <gnuradio/block.h>
 #include <gnuradio/feval.h>
+#include <stdexcept>
 
 namespace gr {
   
@@ -62,6 +63,10 @@ namespace gr {
 
     action_type action;
 
+    //wall clock time (seconds since the epoch) at which the scheduler
+    //called into the gateway, before the python GIL was acquired
+    double call_time;
+
     int general_work_args_noutput_items;
     std::vector<int> general_work_args_ninput_items;
     std::vector<void *> general_work_args_input_items; //TODO this should be const void*, but swig cant int cast it right
@@ -147,6 +152,22 @@ namespace gr {
       return gr::block::output_multiple();
     }
 
+    int block__max_noutput_items(void) {
+      return gr::block::max_noutput_items();
+    }
+
+    void block__set_max_noutput_items(int m) {
+      return gr::block::set_max_noutput_items(m);
+    }
+
+    void block__unset_max_noutput_items(void) {
+      return gr::block::unset_max_noutput_items();
+    }
+
+    bool block__is_set_max_noutput_items(void) {
+      return gr::block::is_set_max_noutput_items();
+    }
+
     void block__consume(int which_input, int how_many_items) {
       return gr::block::consume(which_input, how_many_items);
     }
@@ -199,6 +220,40 @@ namespace gr {
                                      key, value, srcid);
     }
 
+    /*!
+     * Add many tags at once from columns, the inverse of
+     * block__get_tags_in_range_columns. Takes the same PMT tuple
+     * (offsets, key_indexes, keys, values, srcids).
+     */
+    void block__add_item_tags_columns(unsigned int which_output,
+                                      const pmt::pmt_t &columns)
+    {
+      size_t ntags, nkey_indexes;
+      const uint64_t *offsets =
+        pmt::u64vector_elements(pmt::tuple_ref(columns, 0), ntags);
+      const uint32_t *key_indexes =
+        pmt::u32vector_elements(pmt::tuple_ref(columns, 1), nkey_indexes);
+      const pmt::pmt_t keys = pmt::tuple_ref(columns, 2);
+      const pmt::pmt_t values = pmt::tuple_ref(columns, 3);
+      const pmt::pmt_t srcids = pmt::tuple_ref(columns, 4);
+      const size_t nkeys = pmt::length(keys);
+      if(nkey_indexes != ntags || pmt::length(values) != ntags
+         || pmt::length(srcids) != ntags) {
+        throw std::invalid_argument("add_item_tags_columns: columns differ in length");
+      }
+      for(size_t i = 0; i < ntags; i++) {
+        if(key_indexes[i] >= nkeys) {
+          throw std::invalid_argument("add_item_tags_columns: key index out of range");
+        }
+        tag_t tag;
+        tag.offset = offsets[i];
+        tag.key = pmt::vector_ref(keys, key_indexes[i]);
+        tag.value = pmt::vector_ref(values, i);
+        tag.srcid = pmt::vector_ref(srcids, i);
+        gr::block::add_item_tag(which_output, tag);
+      }
+    }
+
     std::vector<tag_t> block__get_tags_in_range(unsigned int which_input,
                                                 uint64_t abs_start,
                                                 uint64_t abs_end)
@@ -218,6 +273,33 @@ namespace gr {
       return tags;
     }
 
+    /*!
+     * Same as block__get_tags_in_range, but the tags are returned as
+     * columns for bulk conversion in python. The result is the PMT
+     * tuple (offsets, key_indexes, keys, values, srcids):
+     * the offsets as a u64vector, the distinct keys as a vector and
+     * the index into keys of every tag as a u32vector, and the values
+     * and srcids as vectors.
+     */
+    pmt::pmt_t block__get_tags_in_range_columns(unsigned int which_input,
+                                                uint64_t abs_start,
+                                                uint64_t abs_end)
+    {
+      std::vector<gr::tag_t> tags;
+      gr::block::get_tags_in_range(tags, which_input, abs_start, abs_end);
+      return tags_to_columns(tags);
+    }
+
+    pmt::pmt_t block__get_tags_in_range_columns(unsigned int which_input,
+                                                uint64_t abs_start,
+                                                uint64_t abs_end,
+                                                const pmt::pmt_t &key)
+    {
+      std::vector<gr::tag_t> tags;
+      gr::block::get_tags_in_range(tags, which_input, abs_start, abs_end, key);
+      return tags_to_columns(tags);
+    }
+
     /* Message passing interface */
     void block__message_port_register_in(pmt::pmt_t port_id) {
       gr::basic_block::message_port_register_in(port_id);
@@ -279,6 +361,35 @@ namespace gr {
         gr::basic_block::dispatch_msg(which_port, msg);
       }
     }
+
+    static pmt::pmt_t tags_to_columns(const std::vector<gr::tag_t> &tags)
+    {
+      const size_t ntags = tags.size();
+      std::vector<uint64_t> offsets(ntags);
+      std::vector<uint32_t> key_indexes(ntags);
+      std::vector<pmt::pmt_t> keys;
+      std::map<pmt::pmt_t, uint32_t, pmt::comparator> key_index;
+      pmt::pmt_t values = pmt::make_vector(ntags, pmt::PMT_NIL);
+      pmt::pmt_t srcids = pmt::make_vector(ntags, pmt::PMT_NIL);
+      for(size_t i = 0; i < ntags; i++) {
+        offsets[i] = tags[i].offset;
+        std::map<pmt::pmt_t, uint32_t, pmt::comparator>::iterator k =
+          key_index.find(tags[i].key);
+        if(k == key_index.end()) {
+          k = key_index.insert(std::make_pair(tags[i].key, (uint32_t)keys.size())).first;
+          keys.push_back(tags[i].key);
+        }
+        key_indexes[i] = k->second;
+        pmt::vector_set(values, i, tags[i].value);
+        pmt::vector_set(srcids, i, tags[i].srcid);
+      }
+      pmt::pmt_t key_vector = pmt::make_vector(keys.size(), pmt::PMT_NIL);
+      for(size_t k = 0; k < keys.size(); k++)
+        pmt::vector_set(key_vector, k, keys[k]);
+      return pmt::make_tuple(pmt::init_u64vector(ntags, offsets),
+                             pmt::init_u32vector(ntags, key_indexes),
+                             key_vector, values, srcids);
+    }
   };
 
 } /* namespace gr */
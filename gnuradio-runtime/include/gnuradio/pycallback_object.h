@@ -76,11 +76,11 @@ public:
   pycallback_object(std::string name, std::string functionbase,
             std::string units, std::string desc,
             myType min, myType max, myType deflt,
-            DisplayType dtype) :
+            DisplayType dtype, bool append_id=true) :
     d_callback(NULL),
     d_functionbase(functionbase), d_units(units), d_desc(desc),
     d_min(min), d_max(max), d_deflt(deflt), d_dtype(dtype),
-    d_name(name), d_id(pycallback_object_count++)
+    d_name(name), d_id(pycallback_object_count++), d_append_id(append_id)
   {
     d_callback = NULL;
     setup_rpc();
@@ -129,9 +129,14 @@ public:
   void setup_rpc()
   {
 #ifdef GR_CTRLPORT
+    // append_id=false registers under the given name as is, e.g. the
+    // alias of a block so the knob sits with its perf counters
+    std::string name = d_name;
+    if(d_append_id)
+      name = (boost::format("%s%d") % d_name % d_id).str();
     add_rpc_variable(
       rpcbasic_sptr(new rpcbasic_register_get<pycallback_object, myType>(
-        (boost::format("%s%d") % d_name % d_id).str() , d_functionbase.c_str(),
+        name, d_functionbase.c_str(),
         this, &pycallback_object::get, pmt_assist<myType>::make(d_min),
         pmt_assist<myType>::make(d_max), pmt_assist<myType>::make(d_deflt),
         d_units.c_str(), d_desc.c_str(), RPC_PRIVLVL_MIN, d_dtype)));
@@ -157,6 +162,7 @@ private:
   std::vector<boost::any> d_rpc_vars; // container for all RPC variables
   std::string d_name;
   int d_id;
+  bool d_append_id;
 };
 
 
@@ -23,6 +23,7 @@
 #include <gnuradio/io_signature.h>
 #include <iostream>
 #include <boost/bind.hpp>
+#include <boost/date_time/posix_time/posix_time.hpp>
 
 namespace gr {
 
@@ -39,6 +40,15 @@ namespace gr {
     }
   }
 
+  //seconds since the epoch, comparable to python's time.time()
+  static double
+  wall_clock_now(void)
+  {
+    static const boost::posix_time::ptime epoch(boost::gregorian::date(1970, 1, 1));
+    return (boost::posix_time::microsec_clock::universal_time() - epoch)
+      .total_microseconds() * 1e-6;
+  }
+
 
   block_gateway::sptr
   block_gateway::make(feval_ll *handler,
@@ -63,6 +73,8 @@ namespace gr {
       _handler(handler),
       _work_type(work_type)
   {
+    _message.call_time = 0;
+
     switch(_work_type) {
     case GR_BLOCK_GW_WORK_GENERAL:
       _decim = 1; //not relevant, but set anyway
@@ -122,6 +134,7 @@ namespace gr {
       _message.general_work_args_ninput_items = ninput_items;
       copy_pointers(_message.general_work_args_input_items, input_items);
       _message.general_work_args_output_items = output_items;
+      _message.call_time = wall_clock_now();
       _handler->calleval(0);
       return _message.general_work_args_return_value;
 
@@ -145,6 +158,7 @@ namespace gr {
     _message.work_args_noutput_items = noutput_items;
     copy_pointers(_message.work_args_input_items, input_items);
     _message.work_args_output_items = output_items;
+    _message.call_time = wall_clock_now();
     _handler->calleval(0);
     return _message.work_args_return_value;
   }
@@ -23,23 +23,161 @@ import runtime_swig as gr
 from runtime_swig import io_signature, io_signaturev
 from runtime_swig import block_gw_message_type
 from runtime_swig import block_gateway
+from tag_utils import columns_to_array, array_to_columns
 import numpy
+import time
 
 ########################################################################
 # Magic to turn pointers into numpy arrays
 # http://docs.scipy.org/doc/numpy/reference/arrays.interface.html
 ########################################################################
+class _array_like(object):
+    """Minimal object exporting a numpy array interface dict"""
+    def __init__(self, interface):
+        self.__array_interface__ = interface
+
 def pointer_to_ndarray(addr, dtype, nitems):
-    class array_like:
-        __array_interface__ = {
-            'data' : (int(addr), False),
-            'typestr' : dtype.base.str,
-            'descr' : dtype.base.descr,
-            'shape' : (nitems,) + dtype.shape,
-            'strides' : None,
-            'version' : 3
-        }
-    return numpy.asarray(array_like()).view(dtype.base)
+    return numpy.asarray(_array_like({
+        'data' : (int(addr), False),
+        'typestr' : dtype.base.str,
+        'descr' : dtype.base.descr,
+        'shape' : (nitems,) + dtype.shape,
+        'strides' : None,
+        'version' : 3
+    })).view(dtype.base)
+
+class ndarray_cache(object):
+    """
+    Cache of the ndarray views handed to work() and general_work().
+
+    The scheduler hands a block pointers into circular buffers, so the
+    same (address, dtype, nitems) triples come back call after call.
+    Reusing the views saves building a new array per port per call.
+    The cache is simply flushed once it grows past max_entries.
+
+    Each call returns a fresh view of the cached array, which is much
+    cheaper than going through the array interface again. A work()
+    that reshapes or otherwise rebinds the attributes of its items
+    thus does not change the arrays handed to later calls.
+    """
+
+    def __init__(self, max_entries=256):
+        self._max_entries = max_entries
+        self._views = dict()
+
+    def __call__(self, addr, dtype, nitems):
+        key = (addr, dtype, nitems)
+        try: return self._views[key].view()
+        except KeyError: pass
+        if len(self._views) >= self._max_entries: self._views.clear()
+        view = pointer_to_ndarray(addr, dtype, nitems)
+        self._views[key] = view
+        return view.view()
+
+    def clear(self):
+        self._views.clear()
+
+    def __len__(self):
+        return len(self._views)
+
+########################################################################
+# Call statistics for python work functions
+########################################################################
+try:
+    import resource
+    #RUSAGE_THREAD is linux only and missing from python < 3.2
+    _RUSAGE_THREAD = resource.RUSAGE_THREAD
+    def thread_cpu_time():
+        """CPU time used by the calling thread in seconds"""
+        usage = resource.getrusage(_RUSAGE_THREAD)
+        return usage.ru_utime + usage.ru_stime
+except (ImportError, AttributeError):
+    #the CPU time of a thread is unavailable, see block_profile
+    thread_cpu_time = None
+
+class block_profile(object):
+    """
+    Call statistics of the work() or general_work() method of a python block.
+
+    All times are in seconds. The GIL wait is the time from the scheduler
+    calling into the gateway until the python code starts running, which
+    is spent acquiring the GIL. A block with a large GIL wait is being
+    held up by other python code; a block with a large work time is the
+    one holding everybody else up.
+
+    The CPU time is only measured where the CPU time of a thread is
+    available (thread_cpu_time is not None); elsewhere it is None.
+
+    When ControlPort is on, the averages are exported as knobs
+    (see export), next to the perf counters of the gateway block.
+    """
+
+    _knobs = (
+        ('py calls', 'calls', 'Calls into python work', 'get_calls'),
+        ('avg py items', 'items', 'Average items per python work call', 'avg_items'),
+        ('avg py work time', 'seconds', 'Average wall time of python work', 'avg_wall_time'),
+        ('avg py cpu time', 'seconds', 'Average CPU time of python work', 'avg_cpu_time'),
+        ('avg py gil wait', 'seconds', 'Average wait for the GIL before python work', 'avg_gil_wait'),
+    )
+
+    def __init__(self):
+        self._rpc_vars = None
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.items = 0
+        self.wall_time = 0.0
+        self.cpu_time = None
+        if thread_cpu_time is not None: self.cpu_time = 0.0
+        self.gil_wait = 0.0
+        self.max_gil_wait = 0.0
+
+    def record(self, nitems, wall_time, cpu_time, gil_wait):
+        gil_wait = max(0.0, gil_wait)
+        self.calls += 1
+        self.items += nitems
+        self.wall_time += wall_time
+        if self.cpu_time is not None: self.cpu_time += cpu_time
+        self.gil_wait += gil_wait
+        self.max_gil_wait = max(self.max_gil_wait, gil_wait)
+
+    def _avg(self, total):
+        if total is None: return None
+        if not self.calls: return 0.0
+        return float(total)/self.calls
+
+    def get_calls(self): return float(self.calls)
+    def avg_items(self): return self._avg(self.items)
+    def avg_wall_time(self): return self._avg(self.wall_time)
+    def avg_cpu_time(self): return self._avg(self.cpu_time)
+    def avg_gil_wait(self): return self._avg(self.gil_wait)
+
+    def stats(self):
+        """All statistics as a dict"""
+        return dict(
+            calls=self.calls, items=self.items,
+            wall_time=self.wall_time, cpu_time=self.cpu_time,
+            gil_wait=self.gil_wait, max_gil_wait=self.max_gil_wait,
+            avg_items=self.avg_items(), avg_wall_time=self.avg_wall_time(),
+            avg_cpu_time=self.avg_cpu_time(), avg_gil_wait=self.avg_gil_wait(),
+        )
+
+    def export(self, name):
+        """
+        Register the averages as ControlPort knobs of the given block name.
+        The knobs are registered under the name as is, so with the alias
+        of a block they sit next to its C++ perf counters.
+        Does nothing when gnuradio was built without ControlPort.
+        """
+        if self._rpc_vars is not None or not hasattr(gr, 'RPC_get_double'): return
+        self._rpc_vars = list()
+        for knob, units, desc, getter in self._knobs:
+            if getter == 'avg_cpu_time' and self.cpu_time is None: continue
+            var = gr.RPC_get_double(name, knob, units, desc, 0, 1e9, 0,
+                                    gr.DISPTIME | gr.DISPOPTSTRIP, False)
+            var.activate(getattr(self, getter))
+            self._rpc_vars.append(var)
 
 ########################################################################
 # Handler that does callbacks from C++
@@ -95,6 +233,9 @@ class gateway_block(object):
         self.__in_indexes = range(len(self.__in_sig))
         self.__out_indexes = range(len(self.__out_sig))
 
+        #reusable views onto the scheduler buffers
+        self.__ndarray_cache = ndarray_cache()
+
         #convert the signatures into gr.io_signatures
         def sig_to_gr_io_sigv(sig):
             if not len(sig): return io_signature(0, 0, 0)
@@ -112,6 +253,15 @@ class gateway_block(object):
         #dict to keep references to all message handlers
         self.__msg_handlers = {}
 
+        #the output multiple set_batching started from and the one it set
+        self.__batch_multiples = None
+
+        #call statistics, see enable_profiling
+        self.__profile = None
+        self.__started = False
+        if gr.prefs.singleton().get_bool('PerfCounters', 'python', False):
+            self.enable_profiling()
+
         #register block functions
         prefix = 'block__'
         for attr in [x for x in dir(self.__gateway) if x.startswith(prefix)]:
@@ -124,20 +274,118 @@ class gateway_block(object):
         """
         return self.__gateway.to_basic_block()
 
+    def set_batching(self, min_items=None, max_items=None, latency=None, samp_rate=None):
+        """
+        Ask the scheduler for fewer, larger calls into python.
+
+        Every call to work() has to take the GIL, so a python block that
+        is handed a few items at a time spends much of its time getting
+        in and out of python. This trades latency for throughput:
+
+        min_items: work() is only called with a multiple of this many
+            output items (rounded up to the block's own output multiple)
+        max_items: work() is never called with more output items
+        latency: the longest time in seconds a batch may take to fill at
+            samp_rate items per second; limits min_items, or sets it
+            when min_items is not given. The budget is rounded down to
+            the block's own output multiple, but is at least one multiple.
+
+        The block's own output multiple is read at each call. Calling
+        set_batching again starts from the multiple the block had before
+        the previous call, unless the block changed it in between.
+
+        Like set_output_multiple, which it uses, a final partial batch
+        at the end of a finite stream is not processed.
+        """
+        multiple = self.output_multiple()
+        if self.__batch_multiples is not None and self.__batch_multiples[1] == multiple:
+            multiple = self.__batch_multiples[0]
+
+        if min_items is not None:
+            min_items = max(1, int(min_items))
+            min_items = ((min_items + multiple - 1)//multiple)*multiple
+        if latency is not None:
+            if samp_rate is None:
+                raise ValueError("a latency needs the sample rate")
+            budget = max(multiple, (int(latency*samp_rate)//multiple)*multiple)
+            if min_items is None: min_items = budget
+            else: min_items = min(min_items, budget)
+        if min_items is None: min_items = multiple
+        if max_items is not None and max_items < min_items:
+            raise ValueError("max_items %d is less than min_items %d"%(max_items, min_items))
+
+        #all checked, a rejected call leaves the block as it was
+        self.set_output_multiple(min_items)
+        self.__batch_multiples = (multiple, min_items)
+        if max_items is None:
+            self.unset_max_noutput_items()
+        else:
+            self.set_max_noutput_items(max_items - max_items % min_items)
+
+    def enable_profiling(self, enable=True):
+        """
+        Turn the call statistics of work() and general_work() on or off.
+        The statistics are kept when turned off; see get_profile.
+        """
+        if enable and self.__profile is None: self.__profile = block_profile()
+        if enable: self.__handler.init(self.__gr_block_handle_profiled)
+        else: self.__handler.init(self.__gr_block_handle)
+        #a running block missed the export at start
+        if enable and self.__started: self.__export_profile()
+
+    def get_profile(self):
+        """The block_profile of this block, None unless profiling was enabled"""
+        return self.__profile
+
+    def __export_profile(self):
+        """
+        Export the call statistics under the alias of the block,
+        the name its C++ perf counters are registered under.
+        """
+        if gr.prefs.singleton().get_bool('ControlPort', 'on', False):
+            self.__profile.export(self.to_basic_block().alias())
+
+    def __gr_block_handle_profiled(self):
+        """
+        Dispatch like __gr_block_handle and record the time spent in work.
+        """
+        action = self.__message.action
+        if action == gr.block_gw_message_type.ACTION_START:
+            self.__export_profile()
+
+        if action != gr.block_gw_message_type.ACTION_WORK and \
+                action != gr.block_gw_message_type.ACTION_GENERAL_WORK:
+            return self.__gr_block_handle()
+
+        cpu_time = None
+        entered = time.time()
+        if thread_cpu_time is not None: cpu_start = thread_cpu_time()
+        self.__gr_block_handle()
+        if thread_cpu_time is not None: cpu_time = thread_cpu_time() - cpu_start
+        wall_time = time.time() - entered
+
+        if action == gr.block_gw_message_type.ACTION_WORK:
+            nitems = self.__message.work_args_return_value
+        else:
+            nitems = self.__message.general_work_args_return_value
+        self.__profile.record(max(nitems, 0), wall_time, cpu_time,
+                              entered - self.__message.call_time)
+
     def __gr_block_handle(self):
         """
         Dispatch tasks according to the action type specified in the message.
         """
+        to_ndarray = self.__ndarray_cache
         if self.__message.action == gr.block_gw_message_type.ACTION_GENERAL_WORK:
             self.__message.general_work_args_return_value = self.general_work(
 
-                input_items=[pointer_to_ndarray(
+                input_items=[to_ndarray(
                     self.__message.general_work_args_input_items[i],
                     self.__in_sig[i],
                     self.__message.general_work_args_ninput_items[i]
                 ) for i in self.__in_indexes],
 
-                output_items=[pointer_to_ndarray(
+                output_items=[to_ndarray(
                     self.__message.general_work_args_output_items[i],
                     self.__out_sig[i],
                     self.__message.general_work_args_noutput_items
@@ -147,13 +395,13 @@ class gateway_block(object):
         elif self.__message.action == gr.block_gw_message_type.ACTION_WORK:
             self.__message.work_args_return_value = self.work(
 
-                input_items=[pointer_to_ndarray(
+                input_items=[to_ndarray(
                     self.__message.work_args_input_items[i],
                     self.__in_sig[i],
                     self.__message.work_args_ninput_items
                 ) for i in self.__in_indexes],
 
-                output_items=[pointer_to_ndarray(
+                output_items=[to_ndarray(
                     self.__message.work_args_output_items[i],
                     self.__out_sig[i],
                     self.__message.work_args_noutput_items
@@ -167,9 +415,12 @@ class gateway_block(object):
             )
 
         elif self.__message.action == gr.block_gw_message_type.ACTION_START:
+            self.__started = True
             self.__message.start_args_return_value = self.start()
 
         elif self.__message.action == gr.block_gw_message_type.ACTION_STOP:
+            self.__started = False
+            self.__ndarray_cache.clear()
             self.__message.stop_args_return_value = self.stop()
 
     def forecast(self, noutput_items, ninput_items_required):
@@ -192,6 +443,32 @@ class gateway_block(object):
     def start(self): return True
     def stop(self): return True
 
+    def get_tags_in_range_array(self, which_input, abs_start, abs_end, key=None):
+        """
+        Get the tags in [abs_start, abs_end) as a structured numpy array.
+        See tag_utils.tags_to_array for the array layout.
+        """
+        if key is None: columns = self.get_tags_in_range_columns(which_input, abs_start, abs_end)
+        else: columns = self.get_tags_in_range_columns(which_input, abs_start, abs_end, key)
+        return columns_to_array(columns)
+
+    def get_tags_in_window_array(self, which_input, rel_start, rel_end, key=None):
+        """
+        Same as get_tags_in_range_array but with offsets relative
+        to the start of the current input buffer.
+        """
+        nread = self.nitems_read(which_input)
+        return self.get_tags_in_range_array(
+            which_input, nread + rel_start, nread + rel_end, key)
+
+    def add_item_tags(self, which_output, tags):
+        """
+        Add many tags at once from a structured numpy array with
+        'offset', 'key', 'value' and optionally 'srcid' columns.
+        The tags are handed to the block as columns in one call.
+        """
+        self.add_item_tags_columns(which_output, array_to_columns(tags))
+
     def set_msg_handler(self, which_port, handler_func):
         handler = msg_handler()
         handler.init(handler_func)
@@ -241,3 +518,35 @@ class interp_block(gateway_block):
             work_type=gr.GR_BLOCK_GW_WORK_INTERP,
             factor=interp,
         )
+
+class stream_block(gateway_block):
+    """
+    A fixed rate block for filters, correlators and other blocks that
+    need to look back at past input.
+
+    The scheduler keeps the last history-1 input items in the same
+    buffer, directly in front of the new ones. work() receives them as
+    one contiguous view per input of noutput_items*decim + history - 1
+    items, so output item k depends on input items
+    [k*decim, k*decim + history). No copy or concatenation is needed to
+    carry the overlap from one call to the next.
+
+    Output is always requested in multiples of output_multiple items,
+    which suits processing in fixed size blocks, e.g. FFT correlators.
+    """
+    def __init__(self, name, in_sig, out_sig, history=1, output_multiple=1, decim=1):
+        if decim > 1: work_type = gr.GR_BLOCK_GW_WORK_DECIM
+        else: work_type = gr.GR_BLOCK_GW_WORK_SYNC
+        gateway_block.__init__(self,
+            name=name,
+            in_sig=in_sig,
+            out_sig=out_sig,
+            work_type=work_type,
+            factor=decim,
+        )
+        self.set_history(history)
+        if output_multiple > 1: self.set_output_multiple(output_multiple)
+
+    def overlap(self):
+        """The number of past items in front of the new input items."""
+        return self.history() - 1
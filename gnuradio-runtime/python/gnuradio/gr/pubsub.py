@@ -24,45 +24,133 @@
 Abstract GNU Radio publisher/subscriber interface
 
 This is a proof of concept implementation, will likely change significantly.
+
+By default, subscribers are called in the thread context of the 'set'
+caller, once per set. A pubsub created with a dispatcher instead
+queues the notification with the dispatcher, which collapses repeated
+sets of the same key and calls the subscribers later, from whichever
+thread runs dispatcher.flush() (typically a GUI main loop).
+
+set_dispatcher() attaches a dispatcher later; an object can build its
+pubsub with direct delivery, so that the sets made while it is being
+constructed take effect at once, and attach the dispatcher when done.
 """
 
+from __future__ import with_statement
+import threading
+import time
+
+class pubsub_dispatcher(object):
+    """
+    Deferred delivery of pubsub notifications.
+
+    Notifications are keyed on (pubsub, key); a newer value for a
+    pending key replaces the older one, so subscribers see at most one
+    notification per key per flush. If schedule is given, it is called
+    with self.flush the first time a notification becomes pending
+    after a flush; e.g. wx.CallAfter to deliver in the GUI thread.
+    """
+    def __init__(self, schedule=None):
+        self._schedule = schedule
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._order = []
+        self._scheduled = False
+
+    def post(self, ps, key, val):
+        with self._lock:
+            pkey = (id(ps), key)
+            collapsed = pkey in self._pending
+            if not collapsed:
+                self._order.append(pkey)
+            self._pending[pkey] = (ps, key, val)
+            schedule = not self._scheduled and self._schedule is not None
+            self._scheduled = True
+        if collapsed:
+            ps._count_collapsed(key)
+        if schedule:
+            self._schedule(self.flush)
+
+    def pending(self):
+        with self._lock:
+            return len(self._order)
+
+    def flush(self):
+        with self._lock:
+            pending, order = self._pending, self._order
+            self._pending, self._order = {}, []
+            self._scheduled = False
+        for pkey in order:
+            (ps, key, val) = pending[pkey]
+            ps._notify(key, val)
+
 class pubsub(dict):
-    def __init__(self):
-	self._publishers = { }
-	self._subscribers = { }
-	self._proxies = { }
+    def __init__(self, dispatcher=None):
+        self._publishers = { }
+        self._subscribers = { }
+        self._proxies = { }
+        self._dispatcher = dispatcher
+        self._sub_lock = threading.RLock()
+        self._stats = { }
+        self._stats_start = time.time()
 
     def __missing__(self, key, value=None):
-	dict.__setitem__(self, key, value)
-	self._publishers[key] = None
-	self._subscribers[key] = []
-	self._proxies[key] = None
+        with self._sub_lock:
+            dict.__setitem__(self, key, value)
+            self._publishers[key] = None
+            self._subscribers[key] = []
+            self._proxies[key] = None
+            self._stats[key] = [0, 0, 0] # sets, notifications, collapsed
 
     def __setitem__(self, key, val):
-	if not self.has_key(key):
-	    self.__missing__(key, val)
-	elif self._proxies[key] is not None:
-	    (p, newkey) = self._proxies[key]
-	    p[newkey] = val
-	else:
-	    dict.__setitem__(self, key, val)
-	for sub in self._subscribers[key]:
-	    # Note this means subscribers will get called in the thread
-	    # context of the 'set' caller.
-	    sub(val)
+        if not self.has_key(key):
+            self.__missing__(key, val)
+        elif self._proxies[key] is not None:
+            (p, newkey) = self._proxies[key]
+            p[newkey] = val
+        else:
+            dict.__setitem__(self, key, val)
+        with self._sub_lock:
+            self._stats[key][0] += 1
+            dispatcher = self._dispatcher
+        if dispatcher is not None:
+            dispatcher.post(self, key, val)
+        else:
+            # Note this means subscribers will get called in the thread
+            # context of the 'set' caller.
+            self._notify(key, val)
+
+    def _notify(self, key, val):
+        with self._sub_lock:
+            subscribers = list(self._subscribers[key])
+            self._stats[key][1] += 1
+        for sub in subscribers:
+            sub(val)
+
+    def _count_collapsed(self, key):
+        with self._sub_lock:
+            self._stats[key][2] += 1
+
+    def set_dispatcher(self, dispatcher):
+        """
+        Deliver the notifications of later sets through the dispatcher,
+        or directly in the setter's thread if it is None.
+        """
+        with self._sub_lock:
+            self._dispatcher = dispatcher
 
     def __getitem__(self, key):
-	if not self.has_key(key): self.__missing__(key)
-	if self._proxies[key] is not None:
-	    (p, newkey) = self._proxies[key]
-	    return p[newkey]
-	elif self._publishers[key] is not None:
-	    return self._publishers[key]()
-	else:
-	    return dict.__getitem__(self, key)
+        if not self.has_key(key): self.__missing__(key)
+        if self._proxies[key] is not None:
+            (p, newkey) = self._proxies[key]
+            return p[newkey]
+        elif self._publishers[key] is not None:
+            return self._publishers[key]()
+        else:
+            return dict.__getitem__(self, key)
 
     def publish(self, key, publisher):
-	if not self.has_key(key): self.__missing__(key)
+        if not self.has_key(key): self.__missing__(key)
         if self._proxies[key] is not None:
             (p, newkey) = self._proxies[key]
             p.publish(newkey, publisher)
@@ -70,12 +158,13 @@ class pubsub(dict):
             self._publishers[key] = publisher
 
     def subscribe(self, key, subscriber):
-	if not self.has_key(key): self.__missing__(key)
+        if not self.has_key(key): self.__missing__(key)
         if self._proxies[key] is not None:
             (p, newkey) = self._proxies[key]
             p.subscribe(newkey, subscriber)
         else:
-            self._subscribers[key].append(subscriber)
+            with self._sub_lock:
+                self._subscribers[key].append(subscriber)
 
     def unpublish(self, key):
         if self._proxies[key] is not None:
@@ -89,16 +178,33 @@ class pubsub(dict):
             (p, newkey) = self._proxies[key]
             p.unsubscribe(newkey, subscriber)
         else:
-            self._subscribers[key].remove(subscriber)
+            with self._sub_lock:
+                self._subscribers[key].remove(subscriber)
 
     def proxy(self, key, p, newkey=None):
-	if not self.has_key(key): self.__missing__(key)
-	if newkey is None: newkey = key
-	self._proxies[key] = (p, newkey)
+        if not self.has_key(key): self.__missing__(key)
+        if newkey is None: newkey = key
+        self._proxies[key] = (p, newkey)
 
     def unproxy(self, key):
         self._proxies[key] = None
 
+    def stats(self):
+        """
+        Return a dict of key -> (sets, notifications, collapsed, rate)
+        where rate is notifications per second since the last reset.
+        """
+        elapsed = max(time.time() - self._stats_start, 1e-9)
+        with self._sub_lock:
+            return dict((key, (s, n, c, n/elapsed))
+                        for key, (s, n, c) in self._stats.items())
+
+    def reset_stats(self):
+        with self._sub_lock:
+            for key in self._stats:
+                self._stats[key] = [0, 0, 0]
+            self._stats_start = time.time()
+
 # Test code
 if __name__ == "__main__":
     import sys
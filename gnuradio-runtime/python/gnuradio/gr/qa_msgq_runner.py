@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+#
+# Copyright 2013 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr, gru, gr_unittest
+
+def fill_queue(msgq, strings, exit=True):
+    for s in strings:
+        msgq.insert_tail(gr.message_from_string(s))
+    if exit:
+        msgq.insert_tail(gr.message(1))
+
+class test_msgq_runner(gr_unittest.TestCase):
+
+    def test_001_blocking(self):
+        msgq = gr.msg_queue()
+        rcvd = []
+        runner = gru.msgq_runner(msgq, lambda msg: rcvd.append(msg.to_string()))
+        fill_queue(msgq, ('a', 'b', 'c'))
+        runner.join(5.0)
+        self.assertTrue(runner.exited())
+        self.assertEqual(['a', 'b', 'c'], rcvd)
+        self.assertEqual(3, runner.delivered())
+        self.assertEqual(0, runner.dropped())
+
+    def test_002_daemon(self):
+        msgq = gr.msg_queue()
+        runner = gru.msgq_runner(msgq, lambda msg: None, daemon=False)
+        self.assertFalse(runner.isDaemon())
+        msgq.insert_tail(gr.message(1))
+        runner.join(5.0)
+        self.assertTrue(runner.exited())
+
+    def test_003_poll_shutdown(self):
+        msgq = gr.msg_queue()
+        runner = gru.msgq_runner(msgq, lambda msg: None, poll_interval=0.01)
+        # no msg arrives, the runner still exits
+        self.assertTrue(runner.shutdown(5.0))
+        self.assertTrue(runner.exited())
+
+    def test_004_batch(self):
+        msgq = gr.msg_queue()
+        fill_queue(msgq, [str(i) for i in range(10)])
+        rcvd = []
+        runner = gru.msgq_runner(msgq, lambda msg: rcvd.append(msg.to_string()),
+                                 poll_interval=0.01, batch_size=4)
+        runner.join(5.0)
+        self.assertTrue(runner.exited())
+        self.assertEqual([str(i) for i in range(10)], rcvd)
+        self.assertEqual(10, runner.delivered())
+        self.assertEqual(0, runner.dropped())
+
+    def test_005_batch_stop(self):
+        msgq = gr.msg_queue()
+        fill_queue(msgq, [str(i) for i in range(5)], exit=False)
+        rcvd = []
+        def callback(msg):
+            rcvd.append(msg.to_string())
+            if len(rcvd) == 2:
+                raise ValueError
+        runner = gru.msgq_runner(msgq, callback, exit_on_error=True,
+                                 poll_interval=0.01, batch_size=8)
+        runner.join(5.0)
+        self.assertTrue(runner.exited())
+        self.assertTrue(isinstance(runner.exit_error(), ValueError))
+        # the rest of the batch is counted as dropped
+        self.assertEqual(['0', '1'], rcvd)
+        self.assertEqual(2, runner.delivered())
+        self.assertEqual(3, runner.dropped())
+
+    def test_006_pool(self):
+        pool = gru.msgq_pool(poll_interval=0.01)
+        msgqs = [gr.msg_queue() for i in range(3)]
+        rcvd = [[] for msgq in msgqs]
+        runners = []
+        for msgq, r in zip(msgqs, rcvd):
+            runners.append(pool.add(msgq, lambda msg, r=r: r.append(msg.to_string())))
+        for i, msgq in enumerate(msgqs):
+            fill_queue(msgq, [str(i)+x for x in 'abc'])
+        for runner in runners:
+            runner.join(5.0)
+            self.assertTrue(runner.exited())
+            self.assertEqual(3, runner.delivered())
+        for i, r in enumerate(rcvd):
+            self.assertEqual([str(i)+x for x in 'abc'], r)
+        self.assertTrue(pool.shutdown(5.0))
+
+    def test_007_pool_shutdown(self):
+        pool = gru.msgq_pool(poll_interval=0.01)
+        runner = pool.add(gr.msg_queue(), lambda msg: None)
+        other = pool.add(gr.msg_queue(), lambda msg: None)
+        # stopping one runner leaves the pool and the others running
+        self.assertTrue(runner.shutdown(5.0))
+        self.assertFalse(other.exited())
+        self.assertTrue(pool.isAlive())
+        # stopping the pool stops the rest
+        self.assertTrue(pool.shutdown(5.0))
+        self.assertTrue(other.exited())
+
+    def test_008_coalesce(self):
+        for poll_interval in (None, 0.01):
+            msgq = gr.msg_queue()
+            # queued before the runner starts, so one wakeup sees them all
+            fill_queue(msgq, [str(i) for i in range(10)])
+            rcvd = []
+            runner = gru.msgq_runner(msgq, lambda msg: rcvd.append(msg.to_string()),
+                                     coalesce=True, poll_interval=poll_interval)
+            runner.join(5.0)
+            self.assertTrue(runner.exited())
+            self.assertEqual(['9'], rcvd)
+            self.assertEqual(1, runner.delivered())
+            self.assertEqual(9, runner.dropped())
+
+    def test_009_coalesce_exit(self):
+        msgq = gr.msg_queue()
+        # an exit msg in the middle of the data ends the batch there
+        fill_queue(msgq, ('a', 'b', 'c'))
+        fill_queue(msgq, ('d', 'e'), exit=False)
+        rcvd = []
+        runner = gru.msgq_runner(msgq, lambda msg: rcvd.append(msg.to_string()),
+                                 coalesce=True)
+        runner.join(5.0)
+        self.assertTrue(runner.exited())
+        self.assertEqual(['c'], rcvd)
+        self.assertEqual(1, runner.delivered())
+        self.assertEqual(2, runner.dropped())
+        # the msgs after the exit msg are left in the queue
+        self.assertEqual(2, msgq.count())
+
+    def test_010_coalesce_exit_only(self):
+        msgq = gr.msg_queue()
+        fill_queue(msgq, ())
+        rcvd = []
+        runner = gru.msgq_runner(msgq, lambda msg: rcvd.append(msg.to_string()),
+                                 coalesce=True)
+        runner.join(5.0)
+        self.assertTrue(runner.exited())
+        self.assertEqual([], rcvd)
+        self.assertEqual(0, runner.dropped())
+
+
+if __name__ == '__main__':
+    gr_unittest.run(test_msgq_runner, "test_msgq_runner.xml")
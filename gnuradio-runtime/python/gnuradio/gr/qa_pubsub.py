@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+#
+# Copyright 2013 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr_unittest
+from gnuradio.gr.pubsub import pubsub, pubsub_dispatcher
+
+class test_pubsub(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.rcvd = []
+
+    def subscribe(self, ps, key):
+        ps.subscribe(key, lambda x: self.rcvd.append((key, x)))
+
+    def test_001_direct(self):
+        ps = pubsub()
+        self.subscribe(ps, 'a')
+        ps['a'] = 1
+        ps['a'] = 2
+        self.assertEqual([('a', 1), ('a', 2)], self.rcvd)
+        self.assertEqual(2, ps['a'])
+
+    def test_002_order(self):
+        d = pubsub_dispatcher()
+        ps = pubsub(dispatcher=d)
+        for key in 'abc': self.subscribe(ps, key)
+        ps['b'] = 1
+        ps['a'] = 2
+        ps['c'] = 3
+        self.assertEqual([], self.rcvd)
+        self.assertEqual(3, d.pending())
+        d.flush()
+        #delivered in the order the keys were first set
+        self.assertEqual([('b', 1), ('a', 2), ('c', 3)], self.rcvd)
+        self.assertEqual(0, d.pending())
+
+    def test_003_collapse(self):
+        d = pubsub_dispatcher()
+        ps = pubsub(dispatcher=d)
+        self.subscribe(ps, 'a')
+        self.subscribe(ps, 'b')
+        ps['a'] = 1
+        ps['b'] = 1
+        ps['a'] = 2
+        ps['a'] = 3
+        self.assertEqual(2, d.pending())
+        d.flush()
+        #only the newest value, in the position of the first set
+        self.assertEqual([('a', 3), ('b', 1)], self.rcvd)
+
+    def test_004_schedule(self):
+        scheduled = []
+        d = pubsub_dispatcher(schedule=scheduled.append)
+        ps = pubsub(dispatcher=d)
+        self.subscribe(ps, 'a')
+        ps['a'] = 1
+        ps['a'] = 2
+        self.assertEqual([d.flush], scheduled)
+        scheduled.pop()()
+        self.assertEqual([('a', 2)], self.rcvd)
+        #scheduled again once the previous flush ran
+        ps['a'] = 3
+        self.assertEqual([d.flush], scheduled)
+
+    def test_005_stats(self):
+        d = pubsub_dispatcher()
+        ps = pubsub(dispatcher=d)
+        self.subscribe(ps, 'a')
+        for i in range(5): ps['a'] = i
+        d.flush()
+        sets, notifications, collapsed, rate = ps.stats()['a']
+        self.assertEqual((5, 1, 4), (sets, notifications, collapsed))
+        self.assertTrue(rate > 0)
+        ps.reset_stats()
+        self.assertEqual((0, 0, 0), ps.stats()['a'][:3])
+
+    def test_006_set_dispatcher(self):
+        ps = pubsub()
+        self.subscribe(ps, 'a')
+        #sets made while constructing are delivered at once
+        ps['a'] = 1
+        self.assertEqual([('a', 1)], self.rcvd)
+        d = pubsub_dispatcher()
+        ps.set_dispatcher(d)
+        ps['a'] = 2
+        self.assertEqual([('a', 1)], self.rcvd)
+        d.flush()
+        self.assertEqual([('a', 1), ('a', 2)], self.rcvd)
+        ps.set_dispatcher(None)
+        ps['a'] = 3
+        self.assertEqual([('a', 1), ('a', 2), ('a', 3)], self.rcvd)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(test_pubsub, "test_pubsub.xml")
@@ -20,6 +20,7 @@
 # Boston, MA 02110-1301, USA.
 #
 
+import numpy
 from gnuradio import gr, gr_unittest
 
 try:
@@ -76,7 +77,74 @@ class test_tag_utils (gr_unittest.TestCase):
         self.assertTrue(pmt.equal(t_tuple.value, value))
         self.assertEqual(t_tuple.offset, offset)
 
-
+    def test_003(self):
+        tags = list()
+        for i in range(5):
+            t = gr.tag_t()
+            t.offset = 100 + i
+            t.key = pmt.string_to_symbol('key%d'%(i%2))
+            t.value = pmt.from_long(i)
+            t.srcid = pmt.from_bool(False)
+            tags.append(t)
+
+        arr = gr.tags_to_array(tags)
+        self.assertEqual(arr.dtype, gr.tag_dtype)
+        self.assertEqual(list(arr['offset']), [100, 101, 102, 103, 104])
+        self.assertEqual(list(arr['key']), ['key0', 'key1', 'key0', 'key1', 'key0'])
+        self.assertEqual(list(arr['value']), [0, 1, 2, 3, 4])
+        self.assertEqual(list(arr['offset'][arr['key'] == 'key1']), [101, 103])
+
+        back = gr.array_to_tags(arr)
+        self.assertEqual(len(back), len(tags))
+        for t0, t1 in zip(tags, back):
+            self.assertEqual(t0.offset, t1.offset)
+            self.assertTrue(pmt.equal(t0.key, t1.key))
+            self.assertTrue(pmt.equal(t0.value, t1.value))
+
+    def test_004(self):
+        arr = gr.tags_to_array([])
+        self.assertEqual(len(arr), 0)
+        self.assertEqual(gr.array_to_tags(arr), [])
+
+    def test_005(self):
+        #columns as returned by a gateway block's get_tags_in_range_columns
+        keys = pmt.make_vector(2, pmt.PMT_NIL)
+        pmt.vector_set(keys, 0, pmt.string_to_symbol('key0'))
+        pmt.vector_set(keys, 1, pmt.string_to_symbol('key1'))
+        values = pmt.make_vector(5, pmt.PMT_NIL)
+        srcids = pmt.make_vector(5, pmt.PMT_F)
+        for i in range(5):
+            pmt.vector_set(values, i, pmt.from_long(i))
+        columns = pmt.make_tuple(
+            pmt.init_u64vector(5, [100, 101, 102, 103, 104]),
+            pmt.init_u32vector(5, [0, 1, 0, 1, 0]),
+            keys, values, srcids)
+
+        arr = gr.columns_to_array(columns)
+        self.assertEqual(arr.dtype, gr.tag_dtype)
+        self.assertEqual(list(arr['offset']), [100, 101, 102, 103, 104])
+        self.assertEqual(list(arr['key']), ['key0', 'key1', 'key0', 'key1', 'key0'])
+        self.assertEqual(list(arr['value']), [0, 1, 2, 3, 4])
+        self.assertEqual(list(arr['srcid']), [False]*5)
+
+        arr = gr.columns_to_array(columns, convert_values=False)
+        self.assertTrue(pmt.equal(arr['value'][3], pmt.from_long(3)))
+
+    def test_006(self):
+        #array to columns and back
+        arr = numpy.zeros(4, dtype=gr.tag_dtype)
+        arr['offset'] = [7, 8, 9, 10]
+        arr['key'] = ['a', 'b', 'a', pmt.intern('c')]
+        for i in range(4): arr['value'][i] = i*2
+        arr['srcid'] = [None, 'src', None, None]
+        columns = gr.array_to_columns(arr)
+        self.assertEqual(pmt.length(pmt.tuple_ref(columns, 2)), 3)
+        self.assertEqual(list(pmt.u32vector_elements(pmt.tuple_ref(columns, 1))), [0, 1, 0, 2])
+        back = gr.columns_to_array(columns)
+        self.assertEqual(list(back['offset']), [7, 8, 9, 10])
+        self.assertEqual(list(back['key']), ['a', 'b', 'a', 'c'])
+        self.assertEqual(list(back['value']), [0, 2, 4, 6])
+        self.assertEqual(list(back['srcid']), [False, 'src', False, False])
 
 if __name__ == '__main__':
     print 'hi'
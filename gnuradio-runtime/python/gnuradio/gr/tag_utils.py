@@ -1,4 +1,5 @@
 import pmt
+import numpy
 
 import runtime_swig as gr
 
@@ -94,4 +95,150 @@ def python_to_tag(tag_struct):
     else:
         return None
 
+########################################################################
+# Bulk conversion between tag lists and structured numpy arrays
+########################################################################
+tag_dtype = numpy.dtype([
+    ('offset', numpy.int64),
+    ('key', object),
+    ('value', object),
+    ('srcid', object),
+])
+
+#most recently used keys, cleared when it grows past the limit
+_key_to_pmt = dict()
+_KEY_TO_PMT_MAX = 1024
+
+def _intern_key(key):
+    """ Symbol string to interned Python string """
+    if pmt.is_symbol(key): return intern(pmt.symbol_to_string(key))
+    return pmt.to_python(key)
+
+def _key_pmt(key):
+    """ Python string to (cached) PMT symbol """
+    if not isinstance(key, basestring): return key
+    try: return _key_to_pmt[key]
+    except KeyError: pass
+    if len(_key_to_pmt) >= _KEY_TO_PMT_MAX: _key_to_pmt.clear()
+    return _key_to_pmt.setdefault(key, pmt.intern(key))
+
+def tags_to_array(tags, convert_values=True):
+    """
+    Convert a sequence of stream tags to a structured numpy array.
+
+    The returned array has the dtype tag_dtype, i.e. an int64 'offset'
+    column plus object columns for 'key', 'value' and 'srcid'. Keys are
+    returned as interned Python strings so that comparisons against
+    string constants are cheap, e.g. arr[arr['key'] == 'rx_time'].
+
+    This converts the tags one at a time; blocks should get their
+    tags as columns instead (see columns_to_array).
+
+    Args:
+        tags: sequence of gr.tag_t, e.g. from get_tags_in_range
+        convert_values: if False, leave values and srcids as PMTs
+
+    Returns:
+        numpy.ndarray of dtype tag_dtype
+    """
+    ntags = len(tags)
+    arr = numpy.empty(ntags, dtype=tag_dtype)
+    if not ntags: return arr
+    arr['offset'] = numpy.fromiter((t.offset for t in tags), numpy.int64, ntags)
+    arr['key'] = [_intern_key(t.key) for t in tags]
+    if convert_values:
+        arr['value'] = [pmt.to_python(t.value) for t in tags]
+        arr['srcid'] = [pmt.to_python(t.srcid) for t in tags]
+    else:
+        arr['value'] = [t.value for t in tags]
+        arr['srcid'] = [t.srcid for t in tags]
+    return arr
+
+def columns_to_array(columns, convert_values=True):
+    """
+    Convert the tag columns of a gateway block to a structured numpy array.
 
+    The columns are the PMT tuple returned by the gateway's
+    get_tags_in_range_columns. The offsets are copied as one block and
+    every distinct key is converted once, so only the values and srcids
+    are converted per tag. The array is the same as tags_to_array makes.
+
+    Args:
+        columns: PMT tuple (offsets, key_indexes, keys, values, srcids)
+        convert_values: if False, leave values and srcids as PMTs
+
+    Returns:
+        numpy.ndarray of dtype tag_dtype
+    """
+    offsets, key_indexes, keys, values, srcids = [
+        pmt.tuple_ref(columns, i) for i in range(5)]
+    ntags = pmt.length(values)
+    arr = numpy.empty(ntags, dtype=tag_dtype)
+    if not ntags: return arr
+    arr['offset'] = numpy.array(pmt.u64vector_elements(offsets), numpy.int64)
+    key_strs = numpy.empty(pmt.length(keys), dtype=object)
+    key_strs[:] = [_intern_key(pmt.vector_ref(keys, k)) for k in range(len(key_strs))]
+    arr['key'] = key_strs[numpy.array(pmt.u32vector_elements(key_indexes), numpy.intp)]
+    values = [pmt.vector_ref(values, i) for i in range(ntags)]
+    srcids = [pmt.vector_ref(srcids, i) for i in range(ntags)]
+    if convert_values:
+        values = map(pmt.to_python, values)
+        srcids = map(pmt.to_python, srcids)
+    for i in range(ntags):
+        #item by item, numpy would unpack sequence values
+        arr['value'][i] = values[i]
+        arr['srcid'][i] = srcids[i]
+    return arr
+
+def array_to_columns(arr):
+    """
+    Convert a structured array (see tags_to_array) to tag columns,
+    the inverse of columns_to_array, for the gateway's
+    add_item_tags_columns. The offsets are copied as one block and
+    every distinct key is converted once; values and srcids are
+    converted per tag as in array_to_tags.
+
+    Returns:
+        PMT tuple (offsets, key_indexes, keys, values, srcids)
+    """
+    ntags = len(arr)
+    offsets = pmt.init_u64vector(ntags, arr['offset'].astype(numpy.uint64).tolist())
+    key_index = dict()
+    key_indexes = [key_index.setdefault(key, len(key_index)) for key in arr['key']]
+    keys = pmt.make_vector(len(key_index), pmt.PMT_NIL)
+    for key, k in key_index.iteritems():
+        pmt.vector_set(keys, k, _key_pmt(key))
+    values = pmt.make_vector(ntags, pmt.PMT_NIL)
+    srcids = pmt.make_vector(ntags, pmt.PMT_F)
+    has_srcid = 'srcid' in arr.dtype.names
+    for i, value in enumerate(arr['value']):
+        pmt.vector_set(values, i, pmt.to_pmt(value))
+        if has_srcid and arr['srcid'][i] is not None:
+            pmt.vector_set(srcids, i, pmt.to_pmt(arr['srcid'][i]))
+    return pmt.make_tuple(offsets, pmt.init_u32vector(ntags, key_indexes),
+                          keys, values, srcids)
+
+def array_to_tags(arr):
+    """
+    Convert a structured array (see tags_to_array) back to stream tags.
+
+    Keys may be Python strings or PMT symbols, values and srcids may
+    be Python objects or PMTs. A missing srcid column defaults to
+    PMT_F.
+
+    Returns:
+        list of gr.tag_t
+    """
+    has_srcid = 'srcid' in arr.dtype.names
+    tags = list()
+    for i, offset in enumerate(arr['offset'].tolist()):
+        tag = gr.tag_t()
+        tag.offset = offset
+        tag.key = _key_pmt(arr['key'][i])
+        tag.value = pmt.to_pmt(arr['value'][i])
+        if has_srcid and arr['srcid'][i] is not None:
+            tag.srcid = pmt.to_pmt(arr['srcid'][i])
+        else:
+            tag.srcid = pmt.PMT_F
+        tags.append(tag)
+    return tags
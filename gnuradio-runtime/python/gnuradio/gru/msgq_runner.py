@@ -19,6 +19,7 @@
 # Boston, MA 02110-1301, USA.
 #
 
+
 """
 Convenience class for dequeuing messages from a gr.msg_queue and
 invoking a callback.
@@ -38,45 +39,236 @@ exit_error() on the object.
 
 To manually stop the runner, call stop() on the object.
 
+If the runner was created with 'coalesce' equal to True, then each
+time it wakes up it drains the queue and invokes callback only with
+the newest msg; older msgs are discarded without being converted.
+This suits displays that only ever show the latest frame. The number
+of msgs passed to callback and discarded are available from
+delivered() and dropped(). Msgs of a batch that are still pending
+when the runner stops are counted as dropped too.
+
+A blocking read cannot be interrupted, so a stopped runner only exits
+once another msg arrives. If the runner was created with a
+'poll_interval' (in seconds), it polls the queue instead and exits
+within one interval of stop(); shutdown() stops the runner and waits
+for it to exit. Up to 'batch_size' msgs are dequeued per wakeup.
+
 To determine if the runner has exited, call exited() on the object.
+The runner thread is a daemon unless created with 'daemon' equal to
+False.
+
+Applications with many queues whose callbacks are short can share a
+single thread instead: msgq_pool polls any number of queues, and
+default_msgq_pool().add() returns a runner with the same interface as
+msgq_runner. The callbacks of a pool run one after another on its
+thread, so a receiver with slow callbacks should keep its own runner.
 """
 
 from gnuradio import gr
 import gnuradio.gr.gr_threading as _threading
 
-class msgq_runner(_threading.Thread):
-
-    def __init__(self, msgq, callback, exit_on_error=False):
-        _threading.Thread.__init__(self)
-
+class _msgq_service(object):
+    """
+    Dequeue and dispatch logic shared by msgq_runner and msgq_pool.
+    """
+    def _init_service(self, msgq, callback, exit_on_error, coalesce, batch_size):
         self._msgq = msgq
         self._callback = callback
         self._exit_on_error = exit_on_error
+        self._coalesce = coalesce
+        self._batch_size = max(1, batch_size)
+        self._delivered = 0
+        self._dropped = 0
         self._done = False
         self._exited = False
         self._exit_error = None
-        self.setDaemon(1)
+
+    def _service(self, block):
+        """
+        Dequeue a batch of msgs and invoke the callback on them.
+        Waits for the first msg if block is True.
+        Returns the number of msgs taken from the queue.
+        """
+        if not block and self._msgq.empty_p():
+            return 0
+        msgs = [self._msgq.delete_head()]
+        # only this runner reads the queue, so a non-empty queue won't block
+        while msgs[-1].type() == 0 and not self._msgq.empty_p() and \
+                (self._coalesce or len(msgs) < self._batch_size):
+            msgs.append(self._msgq.delete_head())
+        exit_msg = msgs[-1].type() != 0
+        data = msgs
+        if exit_msg:
+            data = msgs[:-1]
+        if self._coalesce and len(data) > 1:
+            self._dropped += len(data) - 1
+            data = data[-1:]
+        for i, msg in enumerate(data):
+            if self._done:
+                # stopped mid batch, the rest of it is not delivered
+                self._dropped += len(data) - i
+                break
+            self._delivered += 1
+            try:
+                self._callback(msg)
+            except Exception, e:
+                if self._exit_on_error:
+                    self._exit_error = e
+                    self.stop()
+        if exit_msg:
+            self.stop()
+        return len(msgs)
+
+    def exited(self):
+        return self._exited
+
+    def exit_error(self):
+        return self._exit_error
+
+    def delivered(self):
+        return self._delivered
+
+    def dropped(self):
+        return self._dropped
+
+class msgq_runner(_threading.Thread, _msgq_service):
+
+    def __init__(self, msgq, callback, exit_on_error=False, coalesce=False,
+                 poll_interval=None, batch_size=1, daemon=True):
+        _threading.Thread.__init__(self)
+
+        self._init_service(msgq, callback, exit_on_error, coalesce, batch_size)
+        self._poll_interval = poll_interval
+        self._wakeup = _threading.Event()
+        self.setDaemon(daemon)
         self.start()
 
     def run(self):
         while not self._done:
-            msg = self._msgq.delete_head()
-            if msg.type() != 0:
-                self.stop()
-            else:
-                try:
-                    self._callback(msg)
-                except Exception, e:
-                    if self._exit_on_error:
-                        self._exit_error = e
-                        self.stop()
+            if self._poll_interval is None:
+                self._service(True)
+            elif not self._service(False):
+                self._wakeup.wait(self._poll_interval)
         self._exited = True
 
     def stop(self):
         self._done = True
+        self._wakeup.set()
 
-    def exited(self):
+    def shutdown(self, timeout=None):
+        """
+        Stop the runner and wait up to timeout seconds for it to exit.
+        Returns True if the runner has exited.
+        """
+        self.stop()
+        if _threading.currentThread() is not self:
+            self.join(timeout)
+        return not self.isAlive()
+
+class msgq_pool_runner(_msgq_service):
+    """
+    A msg queue serviced by a msgq_pool; see msgq_pool.add().
+    """
+    def __init__(self, pool, msgq, callback, exit_on_error, coalesce, batch_size):
+        self._init_service(msgq, callback, exit_on_error, coalesce, batch_size)
+        self._pool = pool
+        self._exited_event = _threading.Event()
+
+    def _set_exited(self):
+        self._exited = True
+        self._exited_event.set()
+
+    def stop(self):
+        self._done = True
+        self._pool._wakeup.set()
+
+    def join(self, timeout=None):
+        self._exited_event.wait(timeout)
+
+    def shutdown(self, timeout=None):
+        self.stop()
+        if _threading.currentThread() is not self._pool:
+            self.join(timeout)
         return self._exited
 
-    def exit_error(self):
-        return self._exit_error
+class msgq_pool(_threading.Thread):
+    """
+    Service many msg queues from one thread.
+
+    Queues are polled every poll_interval seconds while idle, and
+    as long as any of them has msgs while busy. Callbacks run in
+    the pool thread one after another, so they should not block.
+    """
+    def __init__(self, poll_interval=0.01):
+        _threading.Thread.__init__(self)
+        self._poll_interval = poll_interval
+        self._runners = []
+        self._lock = _threading.Lock()
+        self._wakeup = _threading.Event()
+        self._done = False
+        self.setDaemon(1)
+        self.start()
+
+    def add(self, msgq, callback, exit_on_error=False, coalesce=False, batch_size=16):
+        """
+        Start servicing msgq. Returns a runner that can be stopped
+        like a msgq_runner.
+        """
+        runner = msgq_pool_runner(self, msgq, callback, exit_on_error,
+                                  coalesce, batch_size)
+        self._lock.acquire()
+        self._runners.append(runner)
+        self._lock.release()
+        self._wakeup.set()
+        return runner
+
+    def run(self):
+        while not self._done:
+            self._wakeup.clear()
+            self._lock.acquire()
+            runners = list(self._runners)
+            self._lock.release()
+            busy = 0
+            for runner in runners:
+                if not runner._done:
+                    busy += runner._service(False)
+                if runner._done:
+                    self._lock.acquire()
+                    self._runners.remove(runner)
+                    self._lock.release()
+                    runner._set_exited()
+            if not busy:
+                self._wakeup.wait(self._poll_interval)
+        for runner in self._runners:
+            runner._set_exited()
+
+    def stop(self):
+        self._done = True
+        self._wakeup.set()
+
+    def shutdown(self, timeout=None):
+        """
+        Stop all runners and wait up to timeout seconds for the pool
+        thread to exit. Returns True if it has exited.
+        """
+        self.stop()
+        if _threading.currentThread() is not self:
+            self.join(timeout)
+        return not self.isAlive()
+
+_default_pool = None
+_default_pool_lock = _threading.Lock()
+
+def default_msgq_pool():
+    """
+    Return the msgq_pool shared by the whole process, starting it on
+    first use.
+    """
+    global _default_pool
+    _default_pool_lock.acquire()
+    try:
+        if _default_pool is None or not _default_pool.isAlive():
+            _default_pool = msgq_pool()
+        return _default_pool
+    finally:
+        _default_pool_lock.release()
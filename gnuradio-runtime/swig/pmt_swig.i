@@ -53,6 +53,8 @@
 %template(pmt_vector_uint16) std::vector<uint16_t>;
 %template(pmt_vector_int32) std::vector<int32_t>;
 %template(pmt_vector_uint32) std::vector<uint32_t>;
+%template(pmt_vector_int64) std::vector<int64_t>;
+%template(pmt_vector_uint64) std::vector<uint64_t>;
 %template(pmt_vector_float) std::vector<float>;
 %template(pmt_vector_double) std::vector<double>;
 %template(pmt_vector_cfloat) std::vector< std::complex<float> >;
@@ -188,6 +190,8 @@ namespace pmt{
   pmt_t init_s16vector(size_t k, const std::vector<int16_t> &data);
   pmt_t init_u32vector(size_t k, const std::vector<uint32_t> &data);
   pmt_t init_s32vector(size_t k, const std::vector<int32_t> &data);
+  pmt_t init_u64vector(size_t k, const std::vector<uint64_t> &data);
+  pmt_t init_s64vector(size_t k, const std::vector<int64_t> &data);
   pmt_t init_f32vector(size_t k, const std::vector<float> &data);
   pmt_t init_f64vector(size_t k, const std::vector<double> &data);
   pmt_t init_c32vector(size_t k, const std::vector<std::complex<float> > &data);
@@ -226,6 +230,8 @@ namespace pmt{
   const std::vector<int16_t>  s16vector_elements(pmt_t v);
   const std::vector<uint32_t> u32vector_elements(pmt_t v);
   const std::vector<int32_t>  s32vector_elements(pmt_t v);
+  const std::vector<uint64_t> u64vector_elements(pmt_t v);
+  const std::vector<int64_t>  s64vector_elements(pmt_t v);
   const std::vector<float>    f32vector_elements(pmt_t v);
   const std::vector<double>   f64vector_elements(pmt_t v);
   const std::vector<std::complex<float> > c32vector_elements(pmt_t v);
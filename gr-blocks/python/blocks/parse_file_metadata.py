@@ -20,7 +20,10 @@
 # Boston, MA 02110-1301, USA.
 #
 
+import os
 import sys
+import zipfile
+import numpy
 from gnuradio import gr, blocks
 import pmt
 
@@ -180,3 +183,245 @@ def parse_extra_dict(p, info, VERBOSE=False):
             print "{0}: {1}".format(key, val)
 
     return info
+
+########################################################################
+# Segment index for random access into metadata files
+########################################################################
+
+string_to_ftype = dict((v, k) for k, v in ftype_to_string.items())
+
+ftype_to_numpy = {"bytes": numpy.int8,
+                  "short": numpy.int16,
+                  "int": numpy.int32,
+                  "long": numpy.int32,
+                  "long long": numpy.int64,
+                  "float": numpy.float32,
+                  "double": numpy.float64}
+
+# One entry per segment (header) of a metadata file
+index_dtype = numpy.dtype([
+    ('hdr_offset', numpy.uint64),  # byte offset of the header
+    ('offset', numpy.uint64),      # byte offset of the data in the data file
+    ('first_item', numpy.uint64),  # index of the first item of the segment
+    ('nitems', numpy.uint64),      # number of items in the segment
+    ('rx_time', numpy.float64),
+    ('rx_rate', numpy.float64),
+])
+
+def index_filename(filename):
+    """ Name of the sidecar index file of a data file """
+    return filename + ".idx"
+
+def item_dtype(info):
+    """
+    Returns the numpy dtype of one item described by the header info
+    as returned by parse_header.
+    """
+    base = numpy.dtype(ftype_to_numpy[info["type"]])
+    if(info["cplx"]):
+        if(base == numpy.float32):
+            base = numpy.dtype(numpy.complex64)
+        elif(base == numpy.float64):
+            base = numpy.dtype(numpy.complex128)
+        else:
+            base = numpy.dtype((base, 2))
+    vlen = info["size"] // base.itemsize
+    if(vlen > 1):
+        return numpy.dtype((base, vlen))
+    return base
+
+def build_index(filename, hdr_filename=None, write=True):
+    """
+    Walks all headers of a metadata file once and builds the segment index.
+
+    Args:
+        filename: the data file (with attached headers unless hdr_filename is given)
+        hdr_filename: the detached header file, if any
+        write: store the index next to the data file (see index_filename);
+            if that fails, e.g. in a read-only directory, the index is
+            only returned
+
+    Returns:
+        (index, info): structured array of index_dtype and the parsed
+        first header
+    """
+    detached = hdr_filename is not None
+    data_size = os.path.getsize(filename)
+    handle = open(hdr_filename if detached else filename, "rb")
+
+    segments = list()
+    first_info = None
+    nread = 0
+    data_offset = 0
+    first_item = 0
+    while(True):
+        handle.seek(nread, 0)
+        header_str = handle.read(HEADER_LENGTH)
+        if(len(header_str) < HEADER_LENGTH):
+            break
+
+        try:
+            header = pmt.deserialize_str(header_str)
+        except RuntimeError:
+            handle.close()
+            raise ValueError("Could not deserialize header at byte {0} of {1}: "
+                             "invalid or corrupt data file.".format(
+                                 nread, hdr_filename or filename))
+
+        info = parse_header(header, False)
+        if(first_info is None):
+            first_info = info
+
+        hdr_offset = nread
+        nread += HEADER_LENGTH + info["extra_len"]
+        if(not detached):
+            data_offset = nread
+            nread += info["nbytes"]
+
+        # the last segment of a file that is still being written may be short
+        nbytes = max(0, min(info["nbytes"], data_size - data_offset))
+        nitems = nbytes // info["size"]
+        segments.append((hdr_offset, data_offset, first_item, nitems,
+                         info["rx_time"], info["rx_rate"]))
+        first_item += nitems
+        if(detached):
+            data_offset += info["nbytes"]
+    handle.close()
+
+    if(first_info is None):
+        raise ValueError("No headers found in {0}".format(hdr_filename or filename))
+
+    index = numpy.array(segments, dtype=index_dtype)
+    if(write):
+        item = numpy.array([first_info["size"], string_to_ftype[first_info["type"]],
+                            first_info["cplx"]], numpy.int64)
+        hdr = numpy.array(_index_hdr_name(hdr_filename))
+        idx_filename = index_filename(filename)
+        try:
+            fp = open(idx_filename, "wb")
+            try:
+                numpy.savez(fp, index=index, item=item, hdr=hdr)
+            finally:
+                fp.close()
+        except (IOError, OSError):
+            try:
+                os.remove(idx_filename)
+            except OSError:
+                pass
+    return index, first_info
+
+def _index_hdr_name(hdr_filename):
+    """ Header file name as recorded in the index, empty if attached """
+    if(hdr_filename is None):
+        return ""
+    return os.path.abspath(hdr_filename)
+
+def load_index(filename, hdr_filename=None):
+    """
+    Loads the sidecar index of a data file. Returns (index, info) like
+    build_index or None if there is no index, it is older than the
+    data file or the detached header file, or it was built from a
+    different header file.
+    """
+    idx_filename = index_filename(filename)
+    try:
+        mtime = os.path.getmtime(idx_filename)
+        if(mtime < os.path.getmtime(filename)):
+            return None
+        if(hdr_filename is not None and mtime < os.path.getmtime(hdr_filename)):
+            return None
+        npz = numpy.load(idx_filename)
+        if(str(npz["hdr"]) != _index_hdr_name(hdr_filename)):
+            return None
+        index = npz["index"]
+        size, ftype, cplx = npz["item"].tolist()
+    except (IOError, OSError, KeyError, ValueError, zipfile.BadZipfile):
+        return None
+    info = {"size": size, "type": ftype_to_string[ftype], "cplx": bool(cplx)}
+    return index, info
+
+class metadata_file(object):
+    """
+    Random access to the samples of a GNU Radio metadata file.
+
+    The headers are walked once to build a segment index, which is
+    stored in a sidecar file (see index_filename) and reused as long as
+    it is newer than the data and header files. Samples can then be addressed by
+    sample index or by timestamp and are returned as memory-mapped
+    arrays, so only the requested span is ever read from disk.
+    """
+
+    def __init__(self, filename, hdr_filename=None, rebuild=False):
+        self.filename = filename
+        self.hdr_filename = hdr_filename
+        loaded = None
+        if(not rebuild):
+            loaded = load_index(filename, hdr_filename)
+        if(loaded is None):
+            loaded = build_index(filename, hdr_filename)
+        self.index, self.info = loaded
+        self.dtype = item_dtype(self.info)
+        self._mmap = numpy.memmap(filename, dtype=numpy.uint8, mode="r")
+
+    def nsegments(self):
+        return len(self.index)
+
+    def nitems(self):
+        if(not len(self.index)):
+            return 0
+        last = self.index[-1]
+        return int(last["first_item"] + last["nitems"])
+
+    def segment_of_item(self, item):
+        """ Returns the number of the segment holding the given item """
+        if(item < 0 or item >= self.nitems()):
+            raise IndexError("item {0} out of range".format(item))
+        return int(numpy.searchsorted(self.index["first_item"], item, side="right")) - 1
+
+    def item_at_time(self, t):
+        """
+        Returns the index of the item at time t (seconds), based on the
+        rx_time and rx_rate of the segment that covers t.
+        """
+        seg = int(numpy.searchsorted(self.index["rx_time"], t, side="right")) - 1
+        seg = max(seg, 0)
+        entry = self.index[seg]
+        n = int(round((t - entry["rx_time"]) * entry["rx_rate"]))
+        n = min(max(n, 0), max(int(entry["nitems"]) - 1, 0))
+        return int(entry["first_item"]) + n
+
+    def time_of_item(self, item):
+        """ Returns the time (seconds) of the given item """
+        entry = self.index[self.segment_of_item(item)]
+        return entry["rx_time"] + (item - int(entry["first_item"])) / entry["rx_rate"]
+
+    def read(self, start, nitems):
+        """
+        Returns nitems items starting at item start. Spans within one
+        segment are returned as memory-mapped views without copying;
+        spans across segment boundaries are gathered into a new array.
+        """
+        stop = min(start + nitems, self.nitems())
+        if(start >= stop):
+            return numpy.zeros(0, dtype=self.dtype)
+
+        itemsize = self.dtype.itemsize
+        seg = self.segment_of_item(start)
+        pieces = list()
+        while(start < stop):
+            entry = self.index[seg]
+            seg_stop = int(entry["first_item"] + entry["nitems"])
+            n = min(stop, seg_stop) - start
+            if(n > 0):
+                begin = int(entry["offset"]) + (start - int(entry["first_item"]))*itemsize
+                pieces.append(self._mmap[begin:begin+n*itemsize].view(self.dtype))
+                start += n
+            seg += 1
+
+        if(len(pieces) == 1):
+            return pieces[0]
+        return numpy.concatenate(pieces)
+
+    def read_time(self, t, nitems):
+        """ Returns nitems items starting at time t (seconds) """
+        return self.read(self.item_at_time(t), nitems)
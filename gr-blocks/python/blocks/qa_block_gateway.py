@@ -69,6 +69,29 @@ class convolve(gr.sync_block):
         output_items[0][:] = numpy.convolve(input_items[0], self._taps, mode='valid')
         return len(output_items[0])
 
+class moving_sum(gr.stream_block):
+    """
+    A moving sum over the input and its history, in blocks of 8 outputs.
+    """
+    def __init__(self, length):
+        gr.stream_block.__init__(
+            self,
+            name = "moving_sum",
+            in_sig = [numpy.float32],
+            out_sig = [numpy.float32],
+            history = length,
+            output_multiple = 8,
+        )
+        self.call_sizes = list()
+
+    def work(self, input_items, output_items):
+        n = len(output_items[0])
+        self.call_sizes.append((n, len(input_items[0])))
+        csum = numpy.cumsum(input_items[0], dtype=numpy.float64)
+        csum = numpy.concatenate(([0], csum))
+        output_items[0][:] = csum[self.history():] - csum[:n]
+        return n
+
 class decim2x(gr.decim_block):
     def __init__(self):
         gr.decim_block.__init__(
@@ -146,6 +169,49 @@ class tag_sink(gr.sync_block):
 
         return num_input_items
 
+class tag_source_bulk(gr.sync_block):
+    def __init__(self):
+        gr.sync_block.__init__(
+            self,
+            name = "tag source bulk",
+            in_sig = None,
+            out_sig = [numpy.float32],
+        )
+
+    def work(self, input_items, output_items):
+        num_output_items = len(output_items[0])
+
+        #tag every 100th item in one call
+        nwritten = self.nitems_written(0)
+        offsets = numpy.arange(nwritten, nwritten+num_output_items, 100)
+        tags = numpy.empty(len(offsets), dtype=gr.tag_dtype)
+        tags['offset'] = offsets
+        tags['key'] = "bulk_key"
+        tags['value'] = offsets.tolist()
+        tags['srcid'] = None
+        self.add_item_tags(0, tags)
+
+        return num_output_items
+
+class tag_sink_bulk(gr.sync_block):
+    def __init__(self):
+        gr.sync_block.__init__(
+            self,
+            name = "tag sink bulk",
+            in_sig = [numpy.float32],
+            out_sig = None,
+        )
+        self.offsets = list()
+        self.values = list()
+
+    def work(self, input_items, output_items):
+        num_input_items = len(input_items[0])
+        tags = self.get_tags_in_window_array(0, 0, num_input_items)
+        tags = tags[tags['key'] == "bulk_key"]
+        self.offsets.extend(tags['offset'])
+        self.values.extend(tags['value'])
+        return num_input_items
+
 class fc32_to_f32_2(gr.sync_block):
     def __init__(self):
         gr.sync_block.__init__(
@@ -215,6 +281,70 @@ class test_block_gateway(gr_unittest.TestCase):
         tb.run()
         self.assertEqual(sink.data(), (1, 2, 3, 4, 5, 6, 7, 8))
 
+    def test_stream_block(self):
+        tb = gr.top_block()
+        data = numpy.arange(1000) % 7
+        src = blocks.vector_source_f(map(float, data), False)
+        ms = moving_sum(5)
+        sink = blocks.vector_sink_f()
+        tb.connect(src, ms, sink)
+        tb.run()
+        expected = numpy.convolve(numpy.concatenate(([0]*4, data)), [1]*5, mode='valid')
+        n = len(sink.data())
+        self.assertEqual(n % 8, 0)
+        # the first outputs depend on the initial contents of the history
+        self.assertFloatTuplesAlmostEqual(sink.data()[4:], expected[4:n], 5)
+        for noutput, ninput in ms.call_sizes:
+            self.assertEqual(noutput % 8, 0)
+            self.assertEqual(ninput, noutput + ms.overlap())
+
+    def test_batching(self):
+        tb = gr.top_block()
+        src = blocks.vector_source_f([1.0]*10000, False)
+        ms = moving_sum(1)
+        ms.set_batching(min_items=60, max_items=300)
+        self.assertEqual(ms.output_multiple(), 64)
+        self.assertEqual(ms.max_noutput_items(), 256)
+        sink = blocks.vector_sink_f()
+        tb.connect(src, ms, sink)
+        tb.run()
+        self.assertEqual(len(sink.data()), 10000 - 10000 % 64)
+        for noutput, ninput in ms.call_sizes:
+            self.assertEqual(noutput % 64, 0)
+            self.assertTrue(noutput <= 256)
+
+    def test_batching_latency(self):
+        ms = moving_sum(1)
+        ms.set_batching(latency=0.001, samp_rate=32000)
+        self.assertEqual(ms.output_multiple(), 32)
+        ms.set_batching(min_items=1000, latency=0.001, samp_rate=32000)
+        self.assertEqual(ms.output_multiple(), 32)
+        self.assertFalse(ms.is_set_max_noutput_items())
+        #the budget is rounded down, but is at least one multiple
+        ms.set_batching(latency=0.001, samp_rate=30000)
+        self.assertEqual(ms.output_multiple(), 24)
+        ms.set_batching(latency=0.001, samp_rate=5000)
+        self.assertEqual(ms.output_multiple(), 8)
+        #a rejected call changes nothing
+        ms.set_batching(min_items=60, max_items=300)
+        self.assertRaises(ValueError, ms.set_batching, latency=0.001)
+        self.assertRaises(ValueError, ms.set_batching, min_items=128, max_items=100)
+        self.assertEqual(ms.output_multiple(), 64)
+        self.assertEqual(ms.max_noutput_items(), 256)
+
+    def test_batching_multiple(self):
+        ms = moving_sum(1)
+        ms.set_batching(min_items=60)
+        self.assertEqual(ms.output_multiple(), 64)
+        ms.set_batching(min_items=20)
+        self.assertEqual(ms.output_multiple(), 24)
+        ms.set_batching()
+        self.assertEqual(ms.output_multiple(), 8)
+        #an output multiple the block sets itself is used from then on
+        ms.set_output_multiple(16)
+        ms.set_batching(min_items=20)
+        self.assertEqual(ms.output_multiple(), 32)
+
     def test_decim2x(self):
         tb = gr.top_block()
         src = blocks.vector_source_f([1, 2, 3, 4, 5, 6, 7, 8], False)
@@ -242,6 +372,17 @@ class test_block_gateway(gr_unittest.TestCase):
         tb.run()
         self.assertEqual(sink.key, "example_key")
 
+    def test_tags_bulk(self):
+        src = tag_source_bulk()
+        sink = tag_sink_bulk()
+        head = blocks.head(gr.sizeof_float, 10000)
+        tb = gr.top_block()
+        tb.connect(src, head, sink)
+        tb.run()
+        self.assertTrue(len(sink.offsets) > 0)
+        self.assertEqual(sink.offsets, sink.values)
+        self.assertEqual(sink.offsets, range(0, 100*len(sink.offsets), 100))
+
     def test_fc32_to_f32_2(self):
         tb = gr.top_block()
         src = blocks.vector_source_c([1+2j, 3+4j, 5+6j, 7+8j, 9+10j], False)
@@ -252,6 +393,67 @@ class test_block_gateway(gr_unittest.TestCase):
         tb.run()
         self.assertEqual(sink.data(), (1, 2, 3, 4, 5, 6, 7, 8, 9, 10))
 
+    def test_profile(self):
+        tb = gr.top_block()
+        data = range(1000)
+        src = blocks.vector_source_f(data, False)
+        cv = convolve()
+        cv.enable_profiling()
+        sink = blocks.vector_sink_f()
+        tb.connect(src, cv, sink)
+        tb.run()
+        self.assertEqual(len(sink.data()), len(data))
+        stats = cv.get_profile().stats()
+        self.assertTrue(stats['calls'] > 0)
+        self.assertEqual(stats['items'], len(data))
+        self.assertTrue(stats['wall_time'] >= 0)
+        self.assertTrue(stats['gil_wait'] >= 0)
+        self.assertAlmostEqual(stats['avg_items'], float(len(data))/stats['calls'])
+        #without the CPU time of a thread it is reported as unavailable
+        from gnuradio.gr import gateway
+        if gateway.thread_cpu_time is None:
+            self.assertEqual(stats['cpu_time'], None)
+            self.assertEqual(stats['avg_cpu_time'], None)
+        else:
+            self.assertTrue(stats['cpu_time'] >= 0)
+
+    def test_ndarray_cache(self):
+        from gnuradio.gr import gateway
+        data = numpy.arange(1024, dtype=numpy.float32)
+        addr = data.__array_interface__['data'][0]
+        dtype = numpy.dtype(numpy.float32)
+        cache = gateway.ndarray_cache(max_entries=4)
+        view = cache(addr, dtype, len(data))
+        self.assertEqual(tuple(view), tuple(data))
+        data[0] = 42
+        self.assertEqual(view[0], 42)
+        #each call gets its own array object on the same memory
+        view.shape = (2, 512)
+        other = cache(addr, dtype, len(data))
+        self.assertFalse(other is view)
+        self.assertEqual(other.shape, (1024,))
+        other[1] = 43
+        self.assertEqual(data[1], 43)
+        for n in range(1, 8): cache(addr, dtype, n)
+        self.assertTrue(len(cache) <= 4)
+
+def _benchmark(ncalls=20000):
+    """Report the calls per second of building and of reusing work buffer views."""
+    import time
+    from gnuradio.gr import gateway
+    data = numpy.zeros(8192, dtype=numpy.complex64)
+    addr = data.__array_interface__['data'][0]
+    dtype = numpy.dtype(numpy.complex64)
+    cache = gateway.ndarray_cache()
+    t0 = time.time()
+    for i in xrange(ncalls): gateway.pointer_to_ndarray(addr, dtype, len(data))
+    t1 = time.time()
+    for i in xrange(ncalls): cache(addr, dtype, len(data))
+    t2 = time.time()
+    print "pointer_to_ndarray: %.0f calls/s, ndarray_cache: %.0f calls/s"%(
+        ncalls/max(t1 - t0, 1e-9), ncalls/max(t2 - t1, 1e-9))
+
 if __name__ == '__main__':
+    _benchmark()
     gr_unittest.run(test_block_gateway, "test_block_gateway.xml")
 
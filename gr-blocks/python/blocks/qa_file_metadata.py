@@ -202,5 +202,90 @@ class test_file_metadata(gr_unittest.TestCase):
 	os.remove(outfile)
 	os.remove(outfile_hdr)
 
+    def test_003(self):
+        N = 1000
+        outfile = "test_out_idx.dat"
+
+        samp_rate = 200000
+        data = sig_source_c(samp_rate, 1000, 1, N)
+        src  = blocks.vector_source_c(data)
+        fsnk = blocks.file_meta_sink(gr.sizeof_gr_complex, outfile,
+                                     samp_rate, 1,
+                                     blocks.GR_FILE_FLOAT, True,
+                                     100, pmt.serialize_str(pmt.make_dict()), False)
+        fsnk.set_unbuffered(True)
+
+        self.tb.connect(src, fsnk)
+        self.tb.run()
+        fsnk.close()
+
+        mfile = parse_file_metadata.metadata_file(outfile)
+        self.assertEqual(mfile.nitems(), N)
+        self.assertTrue(mfile.nsegments() >= N/100)
+        self.assertTrue(os.path.exists(parse_file_metadata.index_filename(outfile)))
+
+        # within a segment and across segment boundaries
+        self.assertComplexTuplesAlmostEqual(mfile.read(10, 20), data[10:30], 5)
+        self.assertComplexTuplesAlmostEqual(mfile.read(95, 210), data[95:305], 5)
+
+        # seek by time
+        t0 = mfile.index[0]["rx_time"]
+        self.assertEqual(mfile.item_at_time(t0 + 250.0/samp_rate), 250)
+        self.assertComplexTuplesAlmostEqual(mfile.read_time(t0 + 250.0/samp_rate, 10),
+                                            data[250:260], 5)
+
+        # the stored index is picked up again
+        mfile2 = parse_file_metadata.metadata_file(outfile)
+        self.assertEqual(mfile2.index.tolist(), mfile.index.tolist())
+
+        os.remove(parse_file_metadata.index_filename(outfile))
+        os.remove(outfile)
+
+    def test_004(self):
+        N = 1000
+        outfile = "test_out_idx_hdr.dat"
+        outfile_hdr = "test_out_idx_hdr.dat.hdr"
+
+        samp_rate = 200000
+        data = sig_source_c(samp_rate, 1000, 1, N)
+        src  = blocks.vector_source_c(data)
+        fsnk = blocks.file_meta_sink(gr.sizeof_gr_complex, outfile,
+                                     samp_rate, 1,
+                                     blocks.GR_FILE_FLOAT, True,
+                                     100, pmt.serialize_str(pmt.make_dict()), True)
+        fsnk.set_unbuffered(True)
+
+        self.tb.connect(src, fsnk)
+        self.tb.run()
+        fsnk.close()
+
+        mfile = parse_file_metadata.metadata_file(outfile, outfile_hdr)
+        self.assertEqual(mfile.nitems(), N)
+        self.assertComplexTuplesAlmostEqual(mfile.read(95, 210), data[95:305], 5)
+        self.assertFalse(parse_file_metadata.load_index(outfile, outfile_hdr) is None)
+
+        # the index records the header file it was built from
+        self.assertTrue(parse_file_metadata.load_index(outfile) is None)
+
+        # a header file newer than the index makes it stale
+        mtime = os.path.getmtime(parse_file_metadata.index_filename(outfile))
+        os.utime(outfile_hdr, (mtime + 10, mtime + 10))
+        self.assertTrue(parse_file_metadata.load_index(outfile, outfile_hdr) is None)
+
+        # without writing, the index is only returned
+        os.remove(parse_file_metadata.index_filename(outfile))
+        index, info = parse_file_metadata.build_index(outfile, outfile_hdr, write=False)
+        self.assertEqual(index.tolist(), mfile.index.tolist())
+        self.assertFalse(os.path.exists(parse_file_metadata.index_filename(outfile)))
+
+        # an index that cannot be written is not fatal
+        os.mkdir(parse_file_metadata.index_filename(outfile))
+        mfile2 = parse_file_metadata.metadata_file(outfile, outfile_hdr)
+        self.assertEqual(mfile2.index.tolist(), mfile.index.tolist())
+        os.rmdir(parse_file_metadata.index_filename(outfile))
+
+        os.remove(outfile)
+        os.remove(outfile_hdr)
+
 if __name__ == '__main__':
     gr_unittest.run(test_file_metadata, "test_file_metadata.xml")
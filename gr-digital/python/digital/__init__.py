@@ -51,6 +51,7 @@ from ofdm_sync_pnac import *
 from ofdm_sync_pn import *
 from ofdm_txrx import ofdm_tx, ofdm_rx
 from soft_dec_lut_gen import *
+from soft_dec_cache import *
 from psk_constellations import *
 from qam_constellations import *
 from constellation_map_generator import *
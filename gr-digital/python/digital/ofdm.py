@@ -21,12 +21,11 @@
 # 
 
 import math
-from gnuradio import gr, fft
+from gnuradio import gr, gru, fft
 from gnuradio import blocks
 import digital_swig as digital
 import ofdm_packet_utils
 from ofdm_receiver import ofdm_receiver
-import gnuradio.gr.gr_threading as _threading
 import psk, qam
 
 # /////////////////////////////////////////////////////////////////////////////
@@ -265,7 +264,15 @@ class ofdm_demod(gr.hier_block2):
         if options.verbose:
             self._print_verbage()
             
-        self._watcher = _queue_watcher_thread(self._rcvd_pktq, callback)
+        self._watcher = _queue_watcher(self._rcvd_pktq, callback)
+
+    def shutdown_watcher(self, timeout=None):
+        """
+        Stop handing received packets to the callback and wait up to
+        timeout seconds for the watcher thread to exit.
+        Returns True if it has exited.
+        """
+        return self._watcher.shutdown(timeout)
 
     def add_options(normal, expert):
         """
@@ -296,22 +303,21 @@ class ofdm_demod(gr.hier_block2):
 
 
 
-class _queue_watcher_thread(_threading.Thread):
-    def __init__(self, rcvd_pktq, callback):
-        _threading.Thread.__init__(self)
-        self.setDaemon(1)
-        self.rcvd_pktq = rcvd_pktq
-        self.callback = callback
-        self.keep_running = True
-        self.start()
+# seconds between polls of the received packet queue
+_watcher_poll_interval = 0.01
 
-
-    def run(self):
-        while self.keep_running:
-            msg = self.rcvd_pktq.delete_head()
-            ok, payload = ofdm_packet_utils.unmake_packet(msg.to_string())
-            if self.callback:
-                self.callback(ok, payload)
+def _queue_watcher(rcvd_pktq, callback):
+    """
+    Unmake received packets on a thread of their own, so a slow
+    callback does not hold up other receivers. The queue is polled,
+    so the watcher can be stopped without a packet arriving.
+    Returns the runner watching the queue.
+    """
+    def handle_msg(msg):
+        ok, payload = ofdm_packet_utils.unmake_packet(msg.to_string())
+        if callback:
+            callback(ok, payload)
+    return gru.msgq_runner(rcvd_pktq, handle_msg, poll_interval=_watcher_poll_interval)
 
 # Generating known symbols with:
 # i = [2*random.randint(0,1)-1 for i in range(4512)]
@@ -28,14 +28,10 @@ def conv_packed_binary_string_to_1_0_string(s):
     """
     '\xAF' --> '10101111'
     """
-    r = []
-    for ch in s:
-        x = ord(ch)
-        for i in range(7,-1,-1):
-            t = (x >> i) & 0x1
-            r.append(t)
-
-    return ''.join(map(lambda x: chr(x + ord('0')), r))
+    if not s:
+        return ''
+    bits = numpy.unpackbits(numpy.frombuffer(s, numpy.uint8))
+    return (bits + ord('0')).tostring()
 
 def conv_1_0_string_to_packed_binary_string(s):
     """
@@ -47,7 +43,7 @@ def conv_1_0_string_to_packed_binary_string(s):
     """
     if not is_1_0_string(s):
         raise ValueError, "Input must be a string containing only 0's and 1's"
-    
+
     # pad to multiple of 8
     padded = False
     rem = len(s) % 8
@@ -58,16 +54,24 @@ def conv_1_0_string_to_packed_binary_string(s):
 
     assert len(s) % 8 == 0
 
-    r = []
-    i = 0
-    while i < len(s):
-        t = 0
-        for j in range(8):
-            t = (t << 1) | (ord(s[i + j]) - ord('0'))
-        r.append(chr(t))
-        i += 8
-    return (''.join(r), padded)
-        
+    if not s:
+        return ('', padded)
+    bits = numpy.frombuffer(s, numpy.uint8) - ord('0')
+    return (numpy.packbits(bits).tostring(), padded)
+
+_packed_1_0_strings = dict()
+
+def _packed_1_0_string(s):
+    """
+    Memoized conv_1_0_string_to_packed_binary_string for the preambles
+    and access codes that make_packet sees over and over again.
+    """
+    try: return _packed_1_0_strings[s]
+    except KeyError: pass
+    if len(_packed_1_0_strings) > 64: _packed_1_0_strings.clear()
+    r = conv_1_0_string_to_packed_binary_string(s)
+    _packed_1_0_strings[s] = r
+    return r
 
 default_access_code = \
   conv_packed_binary_string_to_1_0_string('\xAC\xDD\xA4\xE2\xF2\x8C\x20\xFC')
@@ -77,18 +81,15 @@ default_preamble = \
 def is_1_0_string(s):
     if not isinstance(s, str):
         return False
-    for ch in s:
-        if not ch in ('0', '1'):
-            return False
-    return True
+    return not s.translate(None, '01')
 
 def string_to_hex_list(s):
     return map(lambda x: hex(ord(x)), s)
 
 
 def whiten(s, o):
-    sa = numpy.fromstring(s, numpy.uint8)
-    z = sa ^ random_mask_vec8[o:len(sa)+o]
+    sa = numpy.frombuffer(s, numpy.uint8)
+    z = numpy.bitwise_xor(sa, random_mask_vec8[o:len(sa)+o])
     return z.tostring()
 
 def dewhiten(s, o):
@@ -127,8 +128,8 @@ def make_packet(payload, samples_per_symbol, bits_per_symbol,
     if not whitener_offset >=0 and whitener_offset < 16:
         raise ValueError, "whitener_offset must be between 0 and 15, inclusive (%i)" % (whitener_offset,)
 
-    (packed_access_code, padded) = conv_1_0_string_to_packed_binary_string(access_code)
-    (packed_preamble, ignore) = conv_1_0_string_to_packed_binary_string(preamble)
+    (packed_access_code, padded) = _packed_1_0_string(access_code)
+    (packed_preamble, ignore) = _packed_1_0_string(preamble)
     
     payload_with_crc = crc.gen_and_append_crc32(payload)
     #print "outbound crc =", string_to_hex_list(payload_with_crc[-4:])
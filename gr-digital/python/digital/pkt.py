@@ -20,8 +20,7 @@
 # 
 
 from math import pi
-from gnuradio import gr
-import gnuradio.gr.gr_threading as _threading
+from gnuradio import gr, gru
 import packet_utils
 import digital_swig as digital
 
@@ -152,22 +151,29 @@ class demod_pkts(gr.hier_block2):
         self.framer_sink = digital.framer_sink_1(self._rcvd_pktq)
         self.connect(self, self._demodulator, self.correlator, self.framer_sink)
         
-        self._watcher = _queue_watcher_thread(self._rcvd_pktq, callback)
+        self._watcher = _queue_watcher(self._rcvd_pktq, callback)
 
+    def shutdown_watcher(self, timeout=None):
+        """
+        Stop handing received packets to the callback and wait up to
+        timeout seconds for the watcher thread to exit.
+        Returns True if it has exited.
+        """
+        return self._watcher.shutdown(timeout)
 
-class _queue_watcher_thread(_threading.Thread):
-    def __init__(self, rcvd_pktq, callback):
-        _threading.Thread.__init__(self)
-        self.setDaemon(1)
-        self.rcvd_pktq = rcvd_pktq
-        self.callback = callback
-        self.keep_running = True
-        self.start()
 
+# seconds between polls of the received packet queue
+_watcher_poll_interval = 0.01
 
-    def run(self):
-        while self.keep_running:
-            msg = self.rcvd_pktq.delete_head()
-            ok, payload = packet_utils.unmake_packet(msg.to_string(), int(msg.arg1()))
-            if self.callback:
-                self.callback(ok, payload)
+def _queue_watcher(rcvd_pktq, callback):
+    """
+    Unmake received packets on a thread of their own, so a slow
+    callback does not hold up other receivers. The queue is polled,
+    so the watcher can be stopped without a packet arriving.
+    Returns the runner watching the queue.
+    """
+    def handle_msg(msg):
+        ok, payload = packet_utils.unmake_packet(msg.to_string(), int(msg.arg1()))
+        if callback:
+            callback(ok, payload)
+    return gru.msgq_runner(rcvd_pktq, handle_msg, poll_interval=_watcher_poll_interval)
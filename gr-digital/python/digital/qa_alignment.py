@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+#
+# Copyright 2013 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+import os
+import shutil
+import tempfile
+import numpy
+
+from gnuradio import gr_unittest
+from gnuradio.digital.utils import alignment
+
+def brute_force(d1, d2, offset):
+    """
+    compare_sequences over every overlapping entry, without the wrap
+    around of negative indices of d2 (see correlate_sequences).
+    """
+    max_index = min(len(d1), len(d2)+offset)
+    return alignment.compare_sequences(d1, d2, offset, range(max(0, offset), max_index))
+
+def shifted(rndm, d1, offset):
+    """
+    A sequence d2 that matches d1 at the given offset.
+    """
+    if offset >= 0: return d1[offset:]
+    return numpy.concatenate((rndm.randint(0, 2, -offset), d1))
+
+class test_alignment(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.rndm = numpy.random.RandomState(1234)
+
+    def test_001_correlate(self):
+        d1 = self.rndm.randint(0, 2, 300)
+        d2 = self.rndm.randint(0, 2, 250)
+        for chunk_size in (37, 1<<20):
+            correct, compared = alignment.correlate_sequences(d1, d2, -40, 60, chunk_size)
+            for i, offset in enumerate(range(-40, 61)):
+                self.assertEqual(brute_force(d1, d2, offset),
+                                 (correct[i], compared[i]))
+
+    def test_002_align(self):
+        for offset in (-37, -1, 0, 1, 23):
+            d1 = self.rndm.randint(0, 2, 500)
+            d2 = shifted(self.rndm, d1, offset)
+            for method in ('sample', 'fft'):
+                frac, compared, found, indices = alignment.align_sequences(
+                    d1, d2, max_offset=50, seed=1, method=method)
+                self.assertEqual(offset, found)
+            # the sample method may compare wrapped entries of d2
+            self.assertEqual(1.0, frac)
+
+    def test_003_align_errors(self):
+        d1 = self.rndm.randint(0, 2, 1000)
+        d2 = shifted(self.rndm, d1, -20)
+        errors = self.rndm.rand(len(d2)) < 0.05
+        d2[errors] ^= 1
+        frac, compared, offset, indices = alignment.align_sequences(
+            d1, d2, max_offset=50, method='fft')
+        self.assertEqual(-20, offset)
+        self.assertEqual(brute_force(d1, d2, -20),
+                         (int(round(frac*compared)), compared))
+
+    def test_004_align_edges(self):
+        # with bit errors the true offset scores below the cutoff, while
+        # the few entries compared at the far ends of the lag range all
+        # match; those lags must not win
+        for offset in (-20, 20):
+            d1 = self.rndm.randint(0, 2, 100)
+            d2 = shifted(self.rndm, d1, offset).copy()
+            errors = self.rndm.rand(len(d2)) < 0.15
+            d2[errors] ^= 1
+            d1[:3] = d1[-3:] = 1
+            d2[:3] = d2[-3:] = 1
+            frac, compared, found, indices = alignment.align_sequences(
+                d1, d2, max_offset=500, method='fft')
+            self.assertEqual(offset, found)
+            self.assertTrue(frac < 0.9)
+
+    def test_005_align_files(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            d1 = self.rndm.randint(0, 2, 5000).astype(numpy.uint8)
+            d2 = shifted(self.rndm, d1, 17).astype(numpy.uint8)
+            file1 = os.path.join(tmp_dir, 'd1.dat')
+            file2 = os.path.join(tmp_dir, 'd2.dat')
+            d1.tofile(file1)
+            d2.tofile(file2)
+            frac, compared, offset, indices = alignment.align_files(
+                file1, file2, max_offset=50, chunk_size=1000)
+            self.assertEqual(17, offset)
+            self.assertEqual(1.0, frac)
+            self.assertEqual(len(d2), compared)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(test_alignment, "test_alignment.xml")
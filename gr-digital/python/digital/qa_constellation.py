@@ -21,6 +21,8 @@
 # 
 
 import random
+import shutil
+import tempfile
 from cmath import exp, pi, log, sqrt
 
 from gnuradio import gr, gr_unittest, digital, blocks
@@ -199,7 +201,7 @@ class test_constellation(gr_unittest.TestCase):
         constel = c.points()
         Es = max([abs(constel_i) for constel_i in constel])
 
-        table = digital.soft_dec_table_generator(digital.sd_psk_4_0, prec, Es)
+        table = digital.soft_dec_table_generator(digital.sd_psk_4_0, prec, Es, cache=False)
         c.set_soft_dec_lut(table, prec)
 
         x = sqrt(2.0)/2.0
@@ -241,7 +243,7 @@ class test_constellation(gr_unittest.TestCase):
         constel = c.points()
         Es = max([abs(constel_i) for constel_i in constel])
 
-        table = digital.soft_dec_table(constel, code, prec)
+        table = digital.soft_dec_table(constel, code, prec, cache=False)
         c.gen_soft_dec_lut(prec)
 
         x = sqrt(2.0)/2.0
@@ -266,6 +268,38 @@ class test_constellation(gr_unittest.TestCase):
         self.assertFloatTuplesAlmostEqual(y_python_raw_calc, y_python_table, 4)
         self.assertFloatTuplesAlmostEqual(y_cpp_raw_calc, y_cpp_table, 4)
 
+    def test_soft_dec_batch(self):
+        prec = 6
+        constel, code = digital.qam_16_0x0_0_1_2_3()
+        Es = max([abs(constel_i) for constel_i in constel])
+        samples = [complex(random.uniform(-Es, Es), random.uniform(-Es, Es))
+                   for i in range(100)]
+
+        y_raw_calc = []
+        for sample in samples:
+            y_raw_calc += digital.calc_soft_dec(sample, constel, code)
+        y_batch_calc = digital.calc_soft_dec_batch(samples, constel, code)
+        self.assertFloatTuplesAlmostEqual(y_raw_calc, y_batch_calc.ravel().tolist(), 4)
+
+        table = digital.soft_dec_table(constel, code, prec, cache=False)
+        y_table = []
+        for sample in samples:
+            y_table += digital.calc_soft_dec_from_table(sample, table, prec, Es)
+        y_batch_table = digital.calc_soft_dec_from_table(samples, table, prec, Es)
+        self.assertFloatTuplesAlmostEqual(y_table, y_batch_table.ravel().tolist(), 4)
+
+    def test_soft_dec_table_cache(self):
+        prec = 4
+        constel, code = digital.psk_4_0()
+        cache_dir = tempfile.mkdtemp()
+        try:
+            table = digital.soft_dec_table(constel, code, prec, cache=cache_dir)
+            cached = digital.soft_dec_table(constel, code, prec, cache=cache_dir)
+        finally:
+            shutil.rmtree(cache_dir)
+        self.assertEqual(len(table), 2**(2*prec))
+        self.assertFloatTuplesAlmostEqual(sum(table, []), sum(cached, []), 6)
+
 class mod_demod(gr.hier_block2):
     def __init__(self, constellation, differential, rotation):
         if constellation.arity() > 256:
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+#
+# Copyright 2013 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+import random
+import threading
+
+from gnuradio import gr, gr_unittest, digital
+from gnuradio.digital import packet_utils, ofdm_packet_utils
+
+class test_packet_utils(gr_unittest.TestCase):
+
+    def test_conv_1_0_string(self):
+        s = '\xAF\x00\xFF\x12'
+        bits = packet_utils.conv_packed_binary_string_to_1_0_string(s)
+        self.assertEqual(bits, '10101111000000001111111100010010')
+        self.assertEqual(packet_utils.conv_1_0_string_to_packed_binary_string(bits), (s, False))
+        self.assertEqual(packet_utils.conv_1_0_string_to_packed_binary_string('101'), ('\x05', True))
+        self.assertEqual(packet_utils.conv_packed_binary_string_to_1_0_string(''), '')
+        self.assertRaises(ValueError, packet_utils.conv_1_0_string_to_packed_binary_string, '102')
+
+    def test_is_1_0_string(self):
+        self.assertTrue(packet_utils.is_1_0_string('0110'))
+        self.assertFalse(packet_utils.is_1_0_string('01a0'))
+        self.assertFalse(packet_utils.is_1_0_string(1010))
+
+    def test_whiten(self):
+        s = ''.join(chr(random.randint(0, 255)) for i in range(100))
+        w = packet_utils.whiten(s, 3)
+        self.assertEqual(len(w), len(s))
+        self.assertNotEqual(w, s)
+        self.assertEqual(packet_utils.dewhiten(w, 3), s)
+        self.assertEqual(ord(w[0]), ord(s[0]) ^ packet_utils.random_mask_tuple[3])
+
+    def test_make_unmake_packet(self):
+        payload = ''.join(chr(random.randint(0, 255)) for i in range(200))
+        pkt = packet_utils.make_packet(payload, 2, 1, whitener_offset=5)
+        # strip preamble, access code and header
+        L = (len(packet_utils.default_preamble) + len(packet_utils.default_access_code))/8 + 4
+        data = pkt[L:L+len(payload)+4]
+        self.assertEqual(packet_utils.unmake_packet(data, 5), (True, payload))
+        bad = chr(ord(data[0]) ^ 1) + data[1:]
+        self.assertFalse(packet_utils.unmake_packet(bad, 5)[0])
+
+    def test_ofdm_make_unmake_packet(self):
+        payload = ''.join(chr(random.randint(0, 255)) for i in range(200))
+        pkt = ofdm_packet_utils.make_packet(payload, 1, 1, pad_for_usrp=False)
+        ok, data = ofdm_packet_utils.unmake_packet(pkt[4:-1])
+        self.assertTrue(ok)
+        self.assertEqual(data, payload)
+
+    def test_packet_many(self):
+        payload = ''.join(chr(random.randint(0, 255)) for i in range(1500))
+        L = (len(packet_utils.default_preamble) + len(packet_utils.default_access_code))/8 + 4
+        # the memoized preamble and access code are reused for every packet
+        for i in range(3):
+            pkt = packet_utils.make_packet(payload, 2, 1)
+            data = pkt[L:L+len(payload)+4]
+            self.assertEqual(packet_utils.unmake_packet(data), (True, payload))
+
+    def test_demod_pkts_watcher(self):
+        payload = ''.join(chr(random.randint(0, 255)) for i in range(100))
+        L = (len(packet_utils.default_preamble) + len(packet_utils.default_access_code))/8 + 4
+        data = packet_utils.make_packet(payload, 2, 1)[L:L+len(payload)+4]
+        rcvd = []
+        done = threading.Event()
+        def callback(ok, pkt):
+            rcvd.append((ok, pkt))
+            done.set()
+        demodulator = digital.constellation_decoder_cb(digital.constellation_bpsk().base())
+        demod = digital.demod_pkts(demodulator, callback=callback)
+        demod._rcvd_pktq.insert_tail(gr.message_from_string(data))
+        done.wait(5.0)
+        self.assertEqual(rcvd, [(True, payload)])
+        # the watcher stops without another packet arriving
+        self.assertTrue(demod.shutdown_watcher(5.0))
+
+def _benchmark(npkts=2000):
+    """Report the packets per second of make_packet and unmake_packet."""
+    import time
+    payload = ''.join(chr(random.randint(0, 255)) for i in range(1500))
+    L = (len(packet_utils.default_preamble) + len(packet_utils.default_access_code))/8 + 4
+    t0 = time.time()
+    for i in xrange(npkts):
+        pkt = packet_utils.make_packet(payload, 2, 1)
+    t1 = time.time()
+    data = pkt[L:L+len(payload)+4]
+    for i in xrange(npkts):
+        packet_utils.unmake_packet(data)
+    t2 = time.time()
+    print "make_packet: %.0f packets/s, unmake_packet: %.0f packets/s"%(
+        npkts/max(t1 - t0, 1e-9), npkts/max(t2 - t1, 1e-9))
+
+if __name__ == '__main__':
+    _benchmark()
+    gr_unittest.run(test_packet_utils, "test_packet_utils.xml")
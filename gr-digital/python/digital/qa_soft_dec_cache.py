@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+#
+# Copyright 2013 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+
+import os
+import time
+import shutil
+import tempfile
+import numpy
+
+from gnuradio import gr, gr_unittest, digital
+
+class test_soft_dec_cache(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_001_put_get(self):
+        cache = digital.soft_dec_cache(self.path)
+        key = digital.soft_dec_cache_key('test', numpy.arange(4), 3)
+        self.assertEqual(key, digital.soft_dec_cache_key('test', numpy.arange(4), 3))
+        self.assertNotEqual(key, digital.soft_dec_cache_key('test', numpy.arange(5), 3))
+        self.assertTrue(cache.get(key) is None)
+
+        table = numpy.random.randn(16, 2)
+        cache.put(key, table)
+        cached = cache.get(key)
+        self.assertTrue(isinstance(cached, numpy.memmap))
+        self.assertTrue((cached == table).all())
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_002_evict(self):
+        table = numpy.zeros(1000)
+        cache = digital.soft_dec_cache(self.path)
+        cache.put('0', table)
+        cache.max_bytes = 3*cache.size()
+        for i in range(5):
+            cache.put(str(i), table)
+            # make the modification times distinguishable
+            os.utime(os.path.join(self.path, '%d.npy'%i), (i, i))
+        cache.get('2')
+        cache.put('5', table)
+        self.assertTrue(cache.size() <= cache.max_bytes)
+        self.assertTrue(cache.get('5') is not None)
+        self.assertTrue(cache.get('2') is not None)
+        self.assertTrue(cache.get('0') is None)
+
+    def test_003_soft_dec_table(self):
+        prec = 4
+        constel, code = digital.qam_16_0x0_0_1_2_3()
+        cache = digital.soft_dec_cache(self.path)
+        table = digital.soft_dec_table(constel, code, prec, cache=cache)
+        self.assertEqual(len(cache.entries()), 1)
+        cached = digital.soft_dec_table(constel, code, prec, cache=cache)
+        self.assertEqual(cache.hits, 1)
+        self.assertFloatTuplesAlmostEqual(sum(table, []), sum(cached, []), 6)
+
+        lut = digital.soft_dec_table_generator(digital.sd_qam_16_0x0_0_1_2_3, prec, cache=cache)
+        self.assertEqual(len(cache.entries()), 2)
+        self.assertEqual(lut, digital.soft_dec_table_generator(digital.sd_qam_16_0x0_0_1_2_3, prec, cache=False))
+
+    def test_004_as_array(self):
+        prec = 4
+        constel, code = digital.psk_4_0()
+        cache = digital.soft_dec_cache(self.path)
+        table = digital.soft_dec_table(constel, code, prec, cache=cache)
+        shared = digital.soft_dec_table(constel, code, prec, cache=cache, as_array=True)
+        self.assertTrue(isinstance(shared, numpy.memmap))
+        self.assertEqual(shared.shape, (2**(2*prec), 2))
+        self.assertFloatTuplesAlmostEqual(sum(table, []), shared.ravel().tolist(), 6)
+
+        private = digital.soft_dec_table(constel, code, prec, cache=False, as_array=True)
+        self.assertFalse(isinstance(private, numpy.memmap))
+        self.assertFloatTuplesAlmostEqual(private.ravel().tolist(), shared.ravel().tolist(), 6)
+
+    def test_005_namespace(self):
+        self.assertFalse(hasattr(digital, 'hashlib'))
+        self.assertTrue(hasattr(digital, 'soft_dec_cache_enabled'))
+
+if __name__ == '__main__':
+    gr_unittest.run(test_soft_dec_cache, "test_soft_dec_cache.xml")
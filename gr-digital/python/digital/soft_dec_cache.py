@@ -0,0 +1,193 @@
+#
+# Copyright 2013 Free Software Foundation, Inc.
+# 
+# This file is part of GNU Radio
+# 
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+# 
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+# 
+
+'''
+Persistent, size-bounded cache for soft decision LUTs.
+
+Tables are stored as .npy files named after a digest of everything
+that went into generating them, so identical requests from different
+flowgraphs or processes map to the same file. Tables are opened
+memory-mapped, so several receivers using the same table share one
+copy in the page cache.
+
+soft_dec_table uses the default cache unless told otherwise;
+soft_dec_table_generator only caches when asked to, since its key
+cannot capture everything a generator depends on. Whether the default
+cache is used, its location and its size are read from the GNU Radio
+preferences:
+
+  [digital]
+  soft_dec_cache = True
+  soft_dec_cache_dir = ~/.gnuradio/cache/soft_dec
+  soft_dec_cache_size = 268435456
+'''
+
+from __future__ import with_statement
+
+__all__ = ['soft_dec_cache', 'soft_dec_cache_key', 'default_soft_dec_cache',
+           'soft_dec_cache_enabled']
+
+import os
+import hashlib
+import numpy
+
+from gnuradio import gr
+
+def _default_cache_dir():
+    path = gr.prefs().get_string('digital', 'soft_dec_cache_dir',
+                                 os.path.join('~', '.gnuradio', 'cache', 'soft_dec'))
+    return os.path.expanduser(path)
+
+def soft_dec_cache_enabled():
+    '''
+    Returns True if soft decision tables are cached by default.
+    '''
+    return gr.prefs().get_bool('digital', 'soft_dec_cache', True)
+
+def _default_max_bytes():
+    return gr.prefs().get_long('digital', 'soft_dec_cache_size', 256*1024*1024)
+
+def soft_dec_cache_key(*parts):
+    '''
+    Returns a hex digest over the given parts. Arrays are hashed by
+    dtype and content, anything else by its repr.
+    '''
+    h = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, numpy.ndarray):
+            h.update(part.dtype.str)
+            h.update(part.tostring())
+        else:
+            h.update(repr(part))
+        h.update('\0')
+    return h.hexdigest()
+
+class soft_dec_cache(object):
+    '''
+    Directory of memory-mappable .npy soft decision tables with least
+    recently used eviction once the total size exceeds max_bytes.
+
+    The file modification time doubles as the LRU timestamp; it is
+    refreshed on every hit.
+    '''
+
+    def __init__(self, path=None, max_bytes=None):
+        if path is None: path = _default_cache_dir()
+        if max_bytes is None: max_bytes = _default_max_bytes()
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _file(self, key):
+        return os.path.join(self.path, key + '.npy')
+
+    def get(self, key):
+        '''
+        Returns the memory-mapped table stored under key or None.
+        '''
+        fname = self._file(key)
+        try:
+            table = numpy.load(fname, mmap_mode='r')
+            os.utime(fname, None)
+        except (IOError, OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return table
+
+    def put(self, key, table):
+        '''
+        Stores table under key, evicts old entries if the cache has
+        grown too large and returns the memory-mapped copy. Failures to
+        write the cache are not fatal; the table itself is returned
+        instead.
+        '''
+        fname = self._file(key)
+        tmp = '%s.%d.tmp'%(fname, os.getpid())
+        try:
+            if not os.path.isdir(self.path): os.makedirs(self.path)
+            with open(tmp, 'wb') as fp: numpy.save(fp, numpy.asarray(table))
+            os.rename(tmp, fname)
+            self.evict(keep=fname)
+            return numpy.load(fname, mmap_mode='r')
+        except (IOError, OSError, ValueError):
+            try: os.remove(tmp)
+            except OSError: pass
+            return numpy.asarray(table)
+
+    def get_or_build(self, key, build):
+        '''
+        Returns the table stored under key, calling build() to
+        generate and store it on a miss.
+        '''
+        table = self.get(key)
+        if table is None: table = self.put(key, build())
+        return table
+
+    def entries(self):
+        '''
+        Returns a list of (mtime, size, filename) for the cached
+        tables, least recently used first.
+        '''
+        entries = list()
+        try: names = os.listdir(self.path)
+        except OSError: return entries
+        for name in names:
+            if not name.endswith('.npy'): continue
+            fname = os.path.join(self.path, name)
+            try: st = os.stat(fname)
+            except OSError: continue
+            entries.append((st.st_mtime, st.st_size, fname))
+        entries.sort()
+        return entries
+
+    def size(self):
+        return sum(e[1] for e in self.entries())
+
+    def evict(self, keep=None):
+        '''
+        Removes least recently used tables until the cache fits into
+        max_bytes. The file keep is never removed.
+        '''
+        entries = self.entries()
+        total = sum(e[1] for e in entries)
+        for mtime, size, fname in entries:
+            if total <= self.max_bytes: break
+            if fname == keep: continue
+            try: os.remove(fname)
+            except OSError: continue
+            total -= size
+
+    def clear(self):
+        for mtime, size, fname in self.entries():
+            try: os.remove(fname)
+            except OSError: pass
+
+_default_cache = None
+
+def default_soft_dec_cache():
+    '''
+    Returns the shared cache configured through the preferences.
+    '''
+    global _default_cache
+    if _default_cache is None: _default_cache = soft_dec_cache()
+    return _default_cache
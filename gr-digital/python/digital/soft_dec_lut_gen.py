@@ -21,8 +21,32 @@
 # 
 
 import numpy
+from soft_dec_cache import soft_dec_cache, soft_dec_cache_key, default_soft_dec_cache, \
+    soft_dec_cache_enabled
 
-def soft_dec_table_generator(soft_dec_gen, prec, Es=1):
+# Upper bound on the number of complex distances held in memory at once
+# when computing soft decisions for a batch of samples.
+_max_chunk_elems = 1<<20
+
+def _sample_grid(xrng, yrng):
+    '''
+    Returns the points of the sample space in table order, i.e. moving
+    left to right along xrng and then up a row along yrng.
+    '''
+    return (xrng[numpy.newaxis,:] + 1j*yrng[:,numpy.newaxis]).ravel()
+
+def _get_cache(cache):
+    if cache is None: cache = soft_dec_cache_enabled()
+    if cache is False: return None
+    if cache is True: return default_soft_dec_cache()
+    if isinstance(cache, basestring): return soft_dec_cache(cache)
+    return cache
+
+def _to_table(table, as_array):
+    if as_array: return table
+    return numpy.asarray(table).tolist()
+
+def soft_dec_table_generator(soft_dec_gen, prec, Es=1, cache=None, as_array=False):
     '''
     Builds a LUT that is a list of tuples. The tuple represents the
     soft decisions for the constellation/bit mapping at any given
@@ -78,22 +102,41 @@ def soft_dec_table_generator(soft_dec_gen, prec, Es=1):
     normalized so the outside points sit on +/-1, etc.) but still
     calculate the soft decisions as we would given the full
     constellation.
+
+    The 'cache' and 'as_array' arguments work as for soft_dec_table,
+    except that tables are only cached when 'cache' is given: they are
+    keyed on the name and byte code of soft_dec_gen, which does not
+    cover closures, default arguments, globals or the functions it
+    calls, so two different generators may share a key.
     '''
 
-    npts = 2.0**prec
-    maxd = Es*numpy.sqrt(2)/2
-    yrng = numpy.linspace(-maxd, maxd, npts)
-    xrng = numpy.linspace(-maxd, maxd, npts)
-
-    table = []
-    for y in yrng:
-        for x in xrng:
-            pt = complex(x, y)
-            decs = soft_dec_gen(pt, Es)
-            table.append(decs)
-    return table
-
-def soft_dec_table(constel, symbols, prec, npwr=1):
+    def build():
+        npts = 2**prec
+        maxd = Es*numpy.sqrt(2)/2
+        yrng = numpy.linspace(-maxd, maxd, npts)
+        xrng = numpy.linspace(-maxd, maxd, npts)
+        return [soft_dec_gen(pt, Es) for pt in _sample_grid(xrng, yrng).tolist()]
+
+    # opt-in only, see above
+    if cache is None: cache = False
+    cache = _get_cache(cache)
+    if cache is None:
+        table = build()
+        if as_array: table = numpy.array(table)
+        return table
+
+    code = getattr(soft_dec_gen, 'func_code', None)
+    if code is not None:
+        # nested code objects have addresses in their repr
+        code = (code.co_code, [c for c in code.co_consts if not hasattr(c, 'co_code')])
+    key = soft_dec_cache_key(
+        'soft_dec_table_generator',
+        getattr(soft_dec_gen, '__module__', None),
+        getattr(soft_dec_gen, '__name__', None), code,
+        int(prec), float(Es))
+    return _to_table(cache.get_or_build(key, build), as_array)
+
+def soft_dec_table(constel, symbols, prec, npwr=1, cache=None, as_array=False):
     '''
     Similar in nature to soft_dec_table_generator above. Instead, this
     takes in the constellation and symbol points along with the noise
@@ -107,27 +150,48 @@ def soft_dec_table(constel, symbols, prec, npwr=1):
     samples and the constellations must be working on the same
     magnitudes.
 
-    Because this uses the calc_soft_dec function, it can be quite
-    a bit more expensive to generate the LUT, though it should be
-    one-time work.
+    The whole table is computed with calc_soft_dec_batch, which
+    works through the sample space in chunks of bounded size.
+
+    Generated tables can be kept in a persistent cache (see
+    soft_dec_cache) keyed on the constellation, symbol map, precision
+    and noise power. 'cache' may be True for the cache configured in
+    the GNU Radio preferences, a directory name, a soft_dec_cache
+    object or False to disable caching. The default None uses the
+    configured cache if the preferences enable it (see
+    soft_dec_cache_enabled).
+
+    The table is returned as a list of lists, as needed by
+    constellation.set_soft_dec_lut. With as_array=True the 2D numpy
+    array is returned instead; when it comes from the cache it is
+    memory-mapped read-only, so all processes using the table share
+    one copy. calc_soft_dec_from_table takes either form.
     '''
 
-    re_min = min(numpy.array(constel).real)
-    im_min = min(numpy.array(constel).imag)
-    re_max = max(numpy.array(constel).real)
-    im_max = max(numpy.array(constel).imag)
+    def build():
+        c = numpy.asarray(constel)
+        npts = 2**prec
+        yrng = numpy.linspace(c.imag.min(), c.imag.max(), npts)
+        xrng = numpy.linspace(c.real.min(), c.real.max(), npts)
+        return calc_soft_dec_batch(_sample_grid(xrng, yrng), c, symbols, npwr)
 
-    npts = 2.0**prec
-    yrng = numpy.linspace(im_min, im_max, npts)
-    xrng = numpy.linspace(re_min, re_max, npts)
+    cache = _get_cache(cache)
+    if cache is None: return _to_table(build(), as_array)
 
-    table = []
-    for y in yrng:
-        for x in xrng:
-            pt = complex(x, y)
-            decs = calc_soft_dec(pt, constel, symbols, npwr)
-            table.append(decs)
-    return table
+    key = soft_dec_table_key(constel, symbols, prec, npwr)
+    return _to_table(cache.get_or_build(key, build), as_array)
+
+def soft_dec_table_key(constel, symbols, prec, npwr=1):
+    '''
+    Returns a hex digest identifying the LUT that soft_dec_table
+    builds for the given constellation, symbol map, precision and
+    noise power.
+    '''
+    return soft_dec_cache_key(
+        'soft_dec_table',
+        numpy.asarray(constel, numpy.complex128),
+        numpy.asarray(symbols, numpy.int64),
+        int(prec), float(npwr))
 
 def calc_soft_dec_from_table(sample, table, prec, Es=1):
     '''
@@ -151,7 +215,15 @@ def calc_soft_dec_from_table(sample, table, prec, Es=1):
     normalized so the outside points sit on +/-1, etc.) but still
     calculate the soft decisions as we would given the full
     constellation.
+
+    If sample is an array of samples, the lookups are done at once
+    and a 2D array with one row of soft decisions per sample is
+    returned. Passing the table as a numpy array avoids converting
+    it on every call.
     '''
+    if numpy.ndim(sample) > 0:
+        return _calc_soft_dec_from_table_batch(sample, table, prec, Es)
+
     lut_scale = 2**prec
     maxd = Es*numpy.sqrt(2)/2
     step = 2*maxd / lut_scale
@@ -172,6 +244,25 @@ def calc_soft_dec_from_table(sample, table, prec, Es=1):
 
     return table[index]
 
+def _calc_soft_dec_from_table_batch(samples, table, prec, Es=1):
+    lut_scale = 2**prec
+    maxd = Es*numpy.sqrt(2)/2
+    step = 2*maxd / lut_scale
+    scale = (lut_scale) / (2*maxd) - step
+
+    samples = numpy.asarray(samples)
+    xre = ((maxd + numpy.clip(samples.real, -maxd, maxd)) * scale).astype(numpy.int64)
+    xim = ((maxd + numpy.clip(samples.imag, -maxd, maxd)) * scale).astype(numpy.int64)
+    index = xre + lut_scale*xim
+
+    max_index = lut_scale**2
+    index[index > max_index] = 0
+
+    if (index < 0).any():
+        raise RuntimeError("calc_from_table: input sample out of range.")
+
+    return numpy.asarray(table)[index]
+
 def calc_soft_dec(sample, constel, symbols, npwr=1):
     '''
     This function takes in any consteallation and symbol symbol set
@@ -193,40 +284,45 @@ def calc_soft_dec(sample, constel, symbols, npwr=1):
     than 0 are more likely to indicate a '1' bit.
     '''
     
+    return calc_soft_dec_batch([sample,], constel, symbols, npwr)[0].tolist()
+
+def calc_soft_dec_batch(samples, constel, symbols, npwr=1):
+    '''
+    Same as calc_soft_dec, but for an array of samples. The distances
+    from the samples to all constellation points are computed with
+    numpy in chunks of bounded size.
+
+    Returns a 2D array with the k soft decisions for samples[i] in
+    row i.
+    '''
+
+    constel = numpy.asarray(constel, numpy.complex128)
+    samples = numpy.asarray(samples, numpy.complex128).ravel()
     M = len(constel)
     k = int(numpy.log2(M))
-    tmp = 2*k*[0,]
-    s = k*[0,]
 
     # Find a scaling factor for the constellation, however it was normalized.
-    constel = numpy.array(constel)
     scale = min(min(abs(constel.real)), min(abs(constel.imag)))
 
-    for i in range(M):
-        # Calculate the distance between the sample and the current
-        # constellation point.
-        dist = abs(sample - constel[i])**2
-
-        # Calculate the probability factor from the distance and the
-        # scaled noise power.
+    # bits[i,k-1-j] is the jth bit of the symbol at constel[i], so the
+    # columns come out in the order of the soft decisions.
+    shifts = numpy.arange(k-1, -1, -1)
+    bits = (numpy.asarray(symbols, numpy.int64)[:,numpy.newaxis] >> shifts) & 1
+    ones = bits.astype(numpy.float64)
+    zeros = 1.0 - ones
+
+    s = numpy.empty((len(samples), k), numpy.float64)
+    chunk = max(1, _max_chunk_elems // M)
+    for i in range(0, len(samples), chunk):
+        x = samples[i:i+chunk]
+
+        # Probability factor from the distance of each sample to each
+        # constellation point and the scaled noise power.
+        dist = numpy.abs(x[:,numpy.newaxis] - constel[numpy.newaxis,:])**2
         d = numpy.exp(-dist/(2*npwr*scale**2))
-        
-        for j in range(k):
-            # Get the bit at the jth index
-            mask = 1<<j
-            bit = (symbols[i] & mask) >> j
-
-            # If the bit is a 0, add to the probability of a zero
-            if(bit == 0):
-                tmp[2*j+0] += d
-            # else, add to the probability of a one
-            else:
-                tmp[2*j+1] += d
-                
-    # Calculate the log-likelihood ratio for all bits based on the
-    # probability of ones (tmp[2*i+1]) over the probability of a zero
-    # (tmp[2*i+0]).
-    for i in range(k):
-        s[k-1-i] = (numpy.log(tmp[2*i+1]) - numpy.log(tmp[2*i+0])) * scale**2
+
+        # Log-likelihood ratio of the probability of a one over the
+        # probability of a zero for every bit.
+        s[i:i+chunk] = (numpy.log(numpy.dot(d, ones)) - numpy.log(numpy.dot(d, zeros))) * scale**2
 
     return s
@@ -39,10 +39,14 @@ This module contains functions for aligning sequences.
 >>> correct, overlap, offset = align_sequences(ran_seq, offset_err_seq)
 >>> print(overlap, offset)
 (100, -20)
+>>> correct, overlap, offset, indices = align_sequences(ran_seq, offset_err_seq, method='fft')
+>>> print(overlap, offset)
+(100, -20)
 
 """
 
 import random
+import numpy
 
 # DEFAULT PARAMETERS
 # If the fraction of matching bits between two sequences is greater than
@@ -52,6 +56,11 @@ def_correct_cutoff = 0.9
 def_max_offset = 500
 # The maximum number of samples to take from two sequences to check alignment.
 def_num_samples = 1000
+# The number of entries of d1 correlated at once with method='fft'.
+def_chunk_size = 1<<20
+# The fraction of the shorter sequence that has to overlap for an offset
+# to be chosen with method='fft'.
+def_min_overlap = 0.5
 
 def compare_sequences(d1, d2, offset, sample_indices=None):
     """
@@ -99,7 +108,10 @@ def align_sequences(d1, d2,
                     max_offset=def_max_offset,
                     correct_cutoff=def_correct_cutoff,
                     seed=None,
-                    indices=None):
+                    indices=None,
+                    method='sample',
+                    chunk_size=def_chunk_size,
+                    min_overlap=def_min_overlap):
     """
     Takes two sequences and finds the offset and which the two sequences best
     match.  It returns the fraction correct, the number of entries compared,
@@ -111,7 +123,30 @@ def align_sequences(d1, d2,
                       the offset is assumed to optimum.
     seed -- a random number seed
     indices -- an explicit list of the indices used to compare the two sequences
+    method -- 'sample' compares the entries at a random sample of indices
+              one offset at a time. 'fft' cross-correlates the full binary
+              sequences for all offsets at once (see correlate_sequences);
+              num_samples, seed and indices are then not used and indices
+              is returned unchanged. Entries of d1 with no matching entry
+              of d2 are not compared, whereas the sample method wraps
+              negative indices of d2 around to its end.
+    chunk_size -- number of entries of d1 correlated at once for method='fft'
+    min_overlap -- for method='fft', offsets at which less than this fraction
+                   of the shorter sequence overlaps are not chosen, since a
+                   few matching entries at the far ends would otherwise
+                   beat the true offset
     """
+    pos_range = range(0, min(len(d1), max_offset))
+    neg_range = range(-1, -min(len(d2), max_offset), -1)
+    # Interleave the positive and negative offsets.
+    int_range = [item for items in zip(pos_range, neg_range) for item in items]
+
+    if method == 'fft':
+        return _align_sequences_fft(d1, d2, int_range, correct_cutoff,
+                                    chunk_size, min_overlap) + (indices,)
+    if method != 'sample':
+        raise ValueError("method must be 'sample' or 'fft' (%r)" % (method,))
+
     max_overlap = max(len(d1), len(d2))
     if indices is None:
         indices = random_sample(max_overlap, num_samples, seed)
@@ -119,10 +154,6 @@ def align_sequences(d1, d2,
     best_offset = None
     best_compared = None
     best_correct = None
-    pos_range = range(0, min(len(d1), max_offset))
-    neg_range = range(-1, -min(len(d2), max_offset), -1)
-    # Interleave the positive and negative offsets.
-    int_range = [item for items in zip(pos_range, neg_range) for item in items]
     for offset in int_range:
         correct, compared = compare_sequences(d1, d2, offset, indices)
         frac_correct = 1.0*correct/compared
@@ -134,8 +165,84 @@ def align_sequences(d1, d2,
             if frac_correct > correct_cutoff:
                 break
     return max_frac_correct, best_compared, best_offset, indices
-    
+
+def correlate_sequences(d1, d2, min_offset, max_offset, chunk_size=def_chunk_size):
+    """
+    Cross-correlates two binary sequences for all offsets from min_offset
+    to max_offset (inclusive) using FFTs.  Returns two arrays holding the
+    number of matching entries and the number of compared entries for each
+    offset, with the same meaning of offset as in compare_sequences but
+    comparing every overlapping entry.
+    d1 is processed in chunks of chunk_size entries, and only the matching
+    window of d2 is read for each chunk, so d1 and d2 may be numpy.memmap
+    objects of files that do not fit into memory.
+    Unlike compare_sequences, indices of d2 are never wrapped: for a
+    positive offset the first offset entries of d1 are not compared,
+    where compare_sequences would compare them with the end of d2
+    (d2[i-offset] with a negative index).
+    """
+    nlags = max_offset - min_offset + 1
+    acc = numpy.zeros(nlags)
+    for start in range(0, len(d1), chunk_size):
+        stop = min(start+chunk_size, len(d1))
+        a = 2.0*numpy.asarray(d1[start:stop], numpy.float64) - 1
+        # Window of d2 that any offset can reach from this chunk, zero
+        # outside of d2 so that those entries do not contribute.
+        w_start = start - max_offset
+        w = numpy.zeros(len(a) + nlags - 1)
+        b_start = max(0, w_start)
+        b_stop = min(len(d2), stop - min_offset)
+        if b_stop > b_start:
+            w[b_start-w_start:b_stop-w_start] = \
+                2.0*numpy.asarray(d2[b_start:b_stop], numpy.float64) - 1
+        nfft = 1
+        while nfft < len(w): nfft *= 2
+        # r[m] = sum_k a[k]*w[k+m] belongs to offset max_offset-m
+        r = numpy.fft.irfft(numpy.fft.rfft(w, nfft) *
+                            numpy.conj(numpy.fft.rfft(a, nfft)), nfft)
+        acc += r[:nlags]
+    offsets = numpy.arange(max_offset, min_offset-1, -1)
+    compared = (numpy.minimum(len(d1), len(d2)+offsets) -
+                numpy.maximum(0, offsets)).clip(0)
+    correct = numpy.round((compared + acc)/2).astype(numpy.int64)
+    return correct[::-1], compared[::-1]
+
+def _align_sequences_fft(d1, d2, int_range, correct_cutoff, chunk_size, min_overlap):
+    if not int_range:
+        return 0, None, None
+    min_offset = min(int_range)
+    max_offset = max(int_range)
+    correct, compared = correlate_sequences(d1, d2, min_offset, max_offset, chunk_size)
+    min_compared = max(1, int(min_overlap*min(len(d1), len(d2))))
+    # Pick the offset as the sample method would, searching in the same
+    # interleaved order.
+    max_frac_correct = 0
+    best_offset = None
+    best_compared = None
+    for offset in int_range:
+        i = offset - min_offset
+        if compared[i] < min_compared:
+            continue
+        frac_correct = float(correct[i])/compared[i]
+        if frac_correct > max_frac_correct:
+            max_frac_correct = frac_correct
+            best_offset = offset
+            best_compared = int(compared[i])
+            if frac_correct > correct_cutoff:
+                break
+    return max_frac_correct, best_compared, best_offset
+
+def align_files(filename1, filename2, dtype=numpy.uint8, **kwargs):
+    """
+    Aligns two files of binary sequences (one entry of dtype per bit) without
+    loading them into memory.  Takes the same keyword arguments as
+    align_sequences and uses method='fft' unless told otherwise.
+    """
+    kwargs.setdefault('method', 'fft')
+    d1 = numpy.memmap(filename1, dtype=dtype, mode='r')
+    d2 = numpy.memmap(filename2, dtype=dtype, mode='r')
+    return align_sequences(d1, d2, **kwargs)
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
-    
@@ -34,6 +34,7 @@ from filterbank import *
 from rational_resampler import *
 import pfb
 import optfir
+import tap_cache
 
 # Pull this into the filter module
 from gnuradio.fft import window
@@ -29,9 +29,11 @@ and Barrie W. Jervis, Adison-Wesley, 1993.  ISBN 0-201-54413-X.
 
 import math, cmath
 import filter_swig as filter
+import tap_cache
 
 # ----------------------------------------------------------------
 
+@tap_cache.memoize
 def low_pass (gain, Fs, freq1, freq2, passband_ripple_db, stopband_atten_db,
               nextra_taps=2):
     """
@@ -55,6 +57,7 @@ def low_pass (gain, Fs, freq1, freq2, passband_ripple_db, stopband_atten_db,
     taps = filter.pm_remez (n + nextra_taps, fo, ao, w, "bandpass")
     return taps
 
+@tap_cache.memoize
 def band_pass (gain, Fs, freq_sb1, freq_pb1, freq_pb2, freq_sb2,
                passband_ripple_db, stopband_atten_db,
                nextra_taps=2):
@@ -83,6 +86,7 @@ def band_pass (gain, Fs, freq_sb1, freq_pb1, freq_pb2, freq_sb2,
     taps = filter.pm_remez (n + nextra_taps, fo, ao, w, "bandpass")
     return taps
 
+@tap_cache.memoize
 def complex_band_pass (gain, Fs, freq_sb1, freq_pb1, freq_pb2, freq_sb2,
                        passband_ripple_db, stopband_atten_db,
                        nextra_taps=2):
@@ -111,6 +115,7 @@ def complex_band_pass (gain, Fs, freq_sb1, freq_pb1, freq_pb2, freq_sb2,
     return taps
 
 
+@tap_cache.memoize
 def band_reject (gain, Fs, freq_pb1, freq_sb1, freq_sb2, freq_pb2,
                  passband_ripple_db, stopband_atten_db,
                  nextra_taps=2):
@@ -144,6 +149,7 @@ def band_reject (gain, Fs, freq_pb1, freq_sb1, freq_sb2, freq_pb2,
     return taps
 
 
+@tap_cache.memoize
 def high_pass (gain, Fs, freq1, freq2, passband_ripple_db, stopband_atten_db,
                nextra_taps=2):
     """
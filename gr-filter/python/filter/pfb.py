@@ -29,6 +29,46 @@ try:
 except ImportError:
     import blocks_swig as blocks
 
+def design_default_taps(gain, nfilts, bw=0.4, tb=0.2, atten=100,
+                        ripple=0.1, max_ripple=1.0, tol=0.01):
+    '''
+    Designs the default prototype low pass filter of the PFB blocks.
+
+    optfir.low_pass is tried with the requested passband ripple
+    first. If remez fails to converge, the smallest ripple in
+    (ripple, max_ripple] that still gives a filter is found to within
+    tol dB by bisection, and the chosen design is reported once.
+
+    Returns:
+        the taps of the filter
+    '''
+    def design(r):
+        try:
+            return optfir.low_pass(gain, nfilts, bw, bw+tb, r, atten)
+        except RuntimeError:
+            return None
+
+    taps = design(ripple)
+    if taps is not None:
+        return taps
+
+    # Build in an exit strategy; if the largest ripple fails, it ain't working.
+    lo, hi = ripple, max_ripple
+    taps = design(hi)
+    if taps is None:
+        raise RuntimeError("optfir could not generate an appropriate filter.")
+
+    while hi - lo > tol:
+        mid = (lo + hi) / 2.0
+        mid_taps = design(mid)
+        if mid_taps is None:
+            lo = mid
+        else:
+            hi, taps = mid, mid_taps
+
+    print("Warning: set ripple to %.4f dB (%d taps). If this is a problem, adjust the attenuation or create your own filter taps." % (hi, len(taps)))
+    return taps
+
 class channelizer_ccf(gr.hier_block2):
     '''
     Make a Polyphase Filter channelizer (complex in, complex out, floating-point taps)
@@ -48,22 +88,7 @@ class channelizer_ccf(gr.hier_block2):
             self._taps = taps
         else:
             # Create a filter that covers the full bandwidth of the input signal
-            bw = 0.4
-            tb = 0.2
-            ripple = 0.1
-            made = False
-            while not made:
-                try:
-                    self._taps = optfir.low_pass(1, self._nchans, bw, bw+tb, ripple, atten)
-                    made = True
-                except RuntimeError:
-                    ripple += 0.01
-                    made = False
-                    print("Warning: set ripple to %.4f dB. If this is a problem, adjust the attenuation or create your own filter taps." % (ripple))
-
-                    # Build in an exit strategy; if we've come this far, it ain't working.
-                    if(ripple >= 1.0):
-                        raise RuntimeError("optfir could not generate an appropriate filter.")
+            self._taps = design_default_taps(1, self._nchans, atten=atten)
 
         self.s2ss = blocks.stream_to_streams(gr.sizeof_gr_complex, self._nchans)
         self.pfb = filter.pfb_channelizer_ccf(self._nchans, self._taps,
@@ -104,22 +129,7 @@ class interpolator_ccf(gr.hier_block2):
             self._taps = taps
         else:
             # Create a filter that covers the full bandwidth of the input signal
-            bw = 0.4
-            tb = 0.2
-            ripple = 0.99
-            made = False
-            while not made:
-                try:
-                    self._taps = optfir.low_pass(self._interp, self._interp, bw, bw+tb, ripple, atten)
-                    made = True
-                except RuntimeError:
-                    ripple += 0.01
-                    made = False
-                    print("Warning: set ripple to %.4f dB. If this is a problem, adjust the attenuation or create your own filter taps." % (ripple))
-
-                    # Build in an exit strategy; if we've come this far, it ain't working.
-                    if(ripple >= 1.0):
-                        raise RuntimeError("optfir could not generate an appropriate filter.")
+            self._taps = design_default_taps(self._interp, self._interp, atten=atten, ripple=0.99)
 
         self.pfb = filter.pfb_interpolator_ccf(self._interp, self._taps)
 
@@ -149,22 +159,7 @@ class decimator_ccf(gr.hier_block2):
             self._taps = taps
         else:
             # Create a filter that covers the full bandwidth of the input signal
-            bw = 0.4
-            tb = 0.2
-            ripple = 0.1
-            made = False
-            while not made:
-                try:
-                    self._taps = optfir.low_pass(1, self._decim, bw, bw+tb, ripple, atten)
-                    made = True
-                except RuntimeError:
-                    ripple += 0.01
-                    made = False
-                    print("Warning: set ripple to %.4f dB. If this is a problem, adjust the attenuation or create your own filter taps." % (ripple))
-
-                    # Build in an exit strategy; if we've come this far, it ain't working.
-                    if(ripple >= 1.0):
-                        raise RuntimeError("optfir could not generate an appropriate filter.")
+            self._taps = design_default_taps(1, self._decim, atten=atten)
 
         self.s2ss = blocks.stream_to_streams(gr.sizeof_gr_complex, self._decim)
         self.pfb = filter.pfb_decimator_ccf(self._decim, self._taps, self._channel,
@@ -205,23 +200,7 @@ class arb_resampler_ccf(gr.hier_block2):
             self._taps = taps
         else:
             # Create a filter that covers the full bandwidth of the input signal
-            bw = 0.4
-            tb = 0.2
-            ripple = 0.1
-            #self._taps = filter.firdes.low_pass_2(self._size, self._size, bw, tb, atten)
-            made = False
-            while not made:
-                try:
-                    self._taps = optfir.low_pass(self._size, self._size, bw, bw+tb, ripple, atten)
-                    made = True
-                except RuntimeError:
-                    ripple += 0.01
-                    made = False
-                    print("Warning: set ripple to %.4f dB. If this is a problem, adjust the attenuation or create your own filter taps." % (ripple))
-
-                    # Build in an exit strategy; if we've come this far, it ain't working.
-                    if(ripple >= 1.0):
-                        raise RuntimeError("optfir could not generate an appropriate filter.")
+            self._taps = design_default_taps(self._size, self._size, atten=atten)
 
         self.pfb = filter.pfb_arb_resampler_ccf(self._rate, self._taps, self._size)
         #print "PFB has %d taps\n" % (len(self._taps),)
@@ -258,23 +237,7 @@ class arb_resampler_fff(gr.hier_block2):
             self._taps = taps
         else:
             # Create a filter that covers the full bandwidth of the input signal
-            bw = 0.4
-            tb = 0.2
-            ripple = 0.1
-            #self._taps = filter.firdes.low_pass_2(self._size, self._size, bw, tb, atten)
-            made = False
-            while not made:
-                try:
-                    self._taps = optfir.low_pass(self._size, self._size, bw, bw+tb, ripple, atten)
-                    made = True
-                except RuntimeError:
-                    ripple += 0.01
-                    made = False
-                    print("Warning: set ripple to %.4f dB. If this is a problem, adjust the attenuation or create your own filter taps." % (ripple))
-
-                    # Build in an exit strategy; if we've come this far, it ain't working.
-                    if(ripple >= 1.0):
-                        raise RuntimeError("optfir could not generate an appropriate filter.")
+            self._taps = design_default_taps(self._size, self._size, atten=atten)
 
         self.pfb = filter.pfb_arb_resampler_fff(self._rate, self._taps, self._size)
         #print "PFB has %d taps\n" % (len(self._taps),)
@@ -311,23 +274,7 @@ class arb_resampler_ccc(gr.hier_block2):
             self._taps = taps
         else:
             # Create a filter that covers the full bandwidth of the input signal
-            bw = 0.4
-            tb = 0.2
-            ripple = 0.1
-            #self._taps = filter.firdes.low_pass_2(self._size, self._size, bw, tb, atten)
-            made = False
-            while not made:
-                try:
-                    self._taps = optfir.low_pass(self._size, self._size, bw, bw+tb, ripple, atten)
-                    made = True
-                except RuntimeError:
-                    ripple += 0.01
-                    made = False
-                    print("Warning: set ripple to %.4f dB. If this is a problem, adjust the attenuation or create your own filter taps." % (ripple))
-
-                    # Build in an exit strategy; if we've come this far, it ain't working.
-                    if(ripple >= 1.0):
-                        raise RuntimeError("optfir could not generate an appropriate filter.")
+            self._taps = design_default_taps(self._size, self._size, atten=atten)
 
         self.pfb = filter.pfb_arb_resampler_ccc(self._rate, self._taps, self._size)
         #print "PFB has %d taps\n" % (len(self._taps),)
@@ -112,5 +112,15 @@ class test_pfb_channelizer(gr_unittest.TestCase):
         self.assertComplexTuplesAlmostEqual(expected3_data[-Ntest:], dst3_data[-Ntest:], 3)
         self.assertComplexTuplesAlmostEqual(expected4_data[-Ntest:], dst4_data[-Ntest:], 3)
 
+    def test_001_default_taps(self):
+        taps = filter.pfb.design_default_taps(1, 8, atten=60)
+        self.assertTrue(len(taps) > 0)
+        self.assertEqual(taps, filter.optfir.low_pass(1, 8, 0.4, 0.6, 0.1, 60))
+
+        # remez may not converge at the default ripple for such a
+        # high attenuation; the solver must still find a filter
+        taps = filter.pfb.design_default_taps(1, 8, atten=150)
+        self.assertTrue(len(taps) > 0)
+
 if __name__ == '__main__':
     gr_unittest.run(test_pfb_channelizer, "test_pfb_channelizer.xml")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+#
+# Copyright 2013 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+import shutil
+import tempfile
+
+from gnuradio import gr, gr_unittest, filter
+from gnuradio.filter import optfir, tap_cache
+
+class test_tap_cache(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.old_cache = tap_cache.get_cache()
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        tap_cache.set_cache(self.old_cache)
+        shutil.rmtree(self.path)
+
+    def test_001_memoize(self):
+        cache = tap_cache.tap_cache()
+        tap_cache.set_cache(cache)
+        taps = optfir.low_pass(1, 8, 0.4, 0.6, 0.1, 60)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        self.assertEqual(taps, optfir.low_pass(1, 8, 0.4, 0.6, 0.1, 60))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        optfir.low_pass(1, 8, 0.4, 0.6, 0.1, 70)
+        self.assertEqual(cache.misses, 2)
+
+        # returned lists are copies
+        ctaps = optfir.complex_band_pass(1, 8, -0.6, -0.4, 0.4, 0.6, 0.1, 60)
+        ctaps[0] = 0
+        self.assertNotEqual(ctaps[0], optfir.complex_band_pass(1, 8, -0.6, -0.4, 0.4, 0.6, 0.1, 60)[0])
+
+    def test_002_lru(self):
+        cache = tap_cache.tap_cache(max_entries=2)
+        for i in range(3):
+            cache.get(i, lambda: [i])
+        self.assertEqual(len(cache), 2)
+        cache.get(0, lambda: [42])
+        self.assertEqual(cache.misses, 4)
+
+    def test_003_failures(self):
+        cache = tap_cache.tap_cache()
+        def fail():
+            raise RuntimeError("infeasible")
+        self.assertRaises(RuntimeError, cache.get, 'x', fail)
+        self.assertRaises(RuntimeError, cache.get, 'x', lambda: [1])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_004_persistent(self):
+        tap_cache.set_cache(tap_cache.tap_cache(path=self.path))
+        taps = filter.rational_resampler.design_filter(3, 2, 0.4)
+        cache = tap_cache.tap_cache(path=self.path)
+        tap_cache.set_cache(cache)
+        self.assertFloatTuplesAlmostEqual(taps, filter.rational_resampler.design_filter(3, 2, 0.4))
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+if __name__ == '__main__':
+    gr_unittest.run(test_tap_cache, "test_tap_cache.xml")
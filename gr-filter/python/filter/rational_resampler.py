@@ -21,9 +21,11 @@
 
 from gnuradio import gr, gru
 import filter_swig as filter
+import tap_cache
 
 _plot = None
 
+@tap_cache.memoize
 def design_filter(interpolation, decimation, fractional_bw):
     """
     Given the interpolation rate, decimation rate and a fractional bandwidth,
@@ -0,0 +1,168 @@
+#
+# Copyright 2013 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+'''
+Memoization of filter designs.
+
+Designing taps with the Parks-McClellan algorithm (pm_remez) or a long
+windowed filter can take a noticeable amount of time, and flowgraphs
+often design the same filter many times over. Functions wrapped with
+memoize() keep their results in an in-process LRU and, if enabled, in
+a persistent cache directory that is shared by all processes.
+
+The persistent cache is configured in the GNU Radio preferences:
+
+  [filter]
+  persistent_tap_cache = False
+  tap_cache_dir = ~/.gnuradio/cache/taps
+'''
+
+import os
+import functools
+import hashlib
+import cPickle as pickle
+from collections import OrderedDict
+
+from gnuradio import gr
+
+def _default_cache_dir():
+    path = gr.prefs().get_string('filter', 'tap_cache_dir',
+                                 os.path.join('~', '.gnuradio', 'cache', 'taps'))
+    return os.path.expanduser(path)
+
+class tap_cache(object):
+    '''
+    LRU of designed taps keyed on the design function and its
+    arguments, optionally backed by a directory of pickled designs.
+
+    Designs that fail with a RuntimeError are remembered in process as
+    well, so retrying a known infeasible specification is cheap.
+    '''
+
+    def __init__(self, max_entries=256, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def _file(self, key):
+        return os.path.join(self.path, hashlib.sha1(key).hexdigest() + '.taps')
+
+    def _load(self, key):
+        if self.path is None: return None
+        try:
+            with open(self._file(key), 'rb') as fp:
+                stored_key, taps = pickle.load(fp)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if stored_key != key: return None
+        return taps
+
+    def _store(self, key, taps):
+        if self.path is None: return
+        fname = self._file(key)
+        tmp = '%s.%d.tmp'%(fname, os.getpid())
+        try:
+            if not os.path.isdir(self.path): os.makedirs(self.path)
+            with open(tmp, 'wb') as fp:
+                pickle.dump((key, taps), fp, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp, fname)
+        except (IOError, OSError):
+            try: os.remove(tmp)
+            except OSError: pass
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key, design):
+        '''
+        Returns the taps stored under key, calling design() on a miss.
+        '''
+        try:
+            value = self._entries.pop(key)
+        except KeyError:
+            value = self._load(key)
+        else:
+            self.hits += 1
+            self._remember(key, value)
+            if isinstance(value, RuntimeError): raise value
+            return value
+
+        if value is None:
+            self.misses += 1
+            try:
+                value = design()
+            except RuntimeError as ex:
+                self._remember(key, RuntimeError(*ex.args))
+                raise
+            self._store(key, value)
+        else:
+            self.hits += 1
+        self._remember(key, value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+_cache = None
+
+def get_cache():
+    '''
+    Returns the shared cache used by memoized design functions.
+    '''
+    global _cache
+    if _cache is None:
+        path = None
+        if gr.prefs().get_bool('filter', 'persistent_tap_cache', False):
+            path = _default_cache_dir()
+        _cache = tap_cache(path=path)
+    return _cache
+
+def set_cache(cache):
+    '''
+    Replaces the shared cache, e.g. with tap_cache(path=...) to enable
+    the persistent cache, or tap_cache(max_entries=0) to disable it.
+    '''
+    global _cache
+    _cache = cache
+
+def memoize(func):
+    '''
+    Wraps a filter design function so that repeated calls with equal
+    arguments return the cached taps. The arguments must have stable
+    reprs (numbers, strings and sequences of them).
+    '''
+    name = '%s.%s'%(getattr(func, '__module__', None), func.__name__)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = repr((name, args, sorted(kwargs.items())))
+        taps = get_cache().get(key, lambda: func(*args, **kwargs))
+        # designs returned as lists are mutable; hand out copies
+        if isinstance(taps, list): taps = list(taps)
+        return taps
+    return wrapper
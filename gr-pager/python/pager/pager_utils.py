@@ -18,8 +18,7 @@
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 #
 
-from gnuradio import gr
-import gnuradio.gr.gr_threading as _threading
+from gnuradio import gr, gru
 from string import split, join, printable
 import time
 
@@ -38,23 +37,20 @@ def make_printable(s):
     return s.translate(_trans_table)
 
 
-class queue_runner(_threading.Thread):
+class queue_runner(gru.msgq_runner):
     def __init__(self, msgq):
-        _threading.Thread.__init__(self)
         self.msgq = msgq
         self.done = False
-        self.start()
+        gru.msgq_runner.__init__(self, msgq, self.handle_msg, batch_size=16,
+                                 daemon=False)
 
-    def run(self):
-        while 1:
-            msg = self.msgq.delete_head() # Blocking read
-            if msg.type() != 0:
-                break
+    def handle_msg(self, msg):
+        page = join(split(msg.to_string(), chr(128)), '|')
+        s = make_printable(page)
+        print msg.type(), s
 
-            page = join(split(msg.to_string(), chr(128)), '|')
-            s = make_printable(page)
-            print msg.type(), s
-
-    def end(self):
+    def end(self, timeout=None):
+        # the exit msg wakes the blocking read once pending pages are printed
         self.msgq.insert_tail(gr.message(1))
         self.done = True
+        self.join(timeout)
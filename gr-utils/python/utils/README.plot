@@ -3,6 +3,12 @@ These are a collection of Python scripts to enable viewing and
 analysis of files produced by GNU Radio flow graphs. Most of them work
 off complex data produced by digital waveforms.
 
+The plots built on plot_data and plot_fft_base (gr_plot_char, _float,
+_int, _short and gr_plot_fft*) step through the file with the
+< and > buttons or the arrow keys. The Position slider below the plots
+jumps to any place in the file, and the Home and End keys jump to the
+first and last block.
+
 
 ** gr_plot_float:
 Takes a GNU Radio floating point binary file and displays the samples
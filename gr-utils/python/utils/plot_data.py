@@ -35,22 +35,25 @@ except ImportError:
     raise SystemExit, 1
 
 from optparse import OptionParser
+from gnuradio.plot_file import plot_file, minmax_decimate, envelope
 
 class plot_data:
     def __init__(self, datatype, filenames, options):
-        self.hfile = list()
-        self.legend_text = list()
-        for f in filenames:
-            self.hfile.append(open(f, "r"))
-            self.legend_text.append(f)
-
         self.block_length = options.block
         self.start = options.start
         self.sample_rate = options.sample_rate
+        # blocks longer than this are drawn as a min/max envelope
+        self.max_points = getattr(options, "max_points", 10000)
 
         self.datatype = datatype
         self.sizeof_data = datatype().nbytes    # number of bytes per sample in file
 
+        self.hfile = list()
+        self.legend_text = list()
+        for f in filenames:
+            self.hfile.append(plot_file(f, datatype, getattr(options, "prefetch", False)))
+            self.legend_text.append(f)
+
         self.axis_font_size = 16
         self.label_font_size = 18
         self.title_font_size = 20
@@ -76,6 +79,13 @@ class plot_data:
         self.button_right = Button(self.button_right_axes, ">")
         self.button_right_callback = self.button_right.on_clicked(self.button_right_click)
 
+        # Slider to jump to any position in the file
+        self.slider_axes = self.fig.add_axes([0.15, 0.08, 0.70, 0.03], frameon=True)
+        self.slider = Slider(self.slider_axes, "Position", 0, max(self.last_start(), 1),
+                             valinit=self.position, valfmt="%d")
+        self.slider_lock = False
+        self.slider_callback = self.slider.on_changed(self.slider_changed)
+
         self.xlim = self.sp_f.get_xlim()
 
         self.manager = get_current_fig_manager()
@@ -83,14 +93,22 @@ class plot_data:
         show()
 
     def get_data(self, hfile):
-        self.text_file_pos.set_text("File Position: %d" % (hfile.tell()//self.sizeof_data))
-        try:
-            f = scipy.fromfile(hfile, dtype=self.datatype, count=self.block_length)
-        except MemoryError:
-            print "End of File"
+        self.text_file_pos.set_text("File Position: %d" % (hfile.tell()))
+        start = hfile.tell()
+        self.position = start
+        if(self.max_points and self.block_length > self.max_points):
+            # Too many samples to draw; reduce to a min/max envelope
+            # straight from the memory map
+            hfile.skip(self.block_length)
+            index, mins, maxs = hfile.overview(start, start + self.block_length,
+                                               self.max_points // 2)
+            index, self.f = envelope(index - start, mins, maxs)
         else:
-            self.f = scipy.array(f)
-            self.time = scipy.array([i*(1/self.sample_rate) for i in range(len(self.f))])
+            self.f = hfile.read(self.block_length)
+            index = scipy.arange(len(self.f))
+        if(len(self.f) == 0):
+            print "End of File"
+        self.time = index / self.sample_rate
 
     def make_plots(self):
         self.sp_f = self.fig.add_subplot(2,1,1, position=[0.075, 0.2, 0.875, 0.6])
@@ -104,7 +122,7 @@ class plot_data:
 
         for hf in self.hfile:
             # if specified on the command-line, set file pointer
-            hf.seek(self.sizeof_data*self.start, 1)
+            hf.seek(self.start)
 
             self.get_data(hf)
 
@@ -129,6 +147,7 @@ class plot_data:
             minval = min(minval, self.f.min())
 
         self.sp_f.set_ylim([1.5*minval, 1.5*maxval])
+        self.update_slider(self.position)
 
         draw()
 
@@ -142,6 +161,12 @@ class plot_data:
         elif(find(event.key, backward_valid_keys)):
             self.step_backward()
 
+        elif(event.key == "home"):
+            self.jump_to(0)
+
+        elif(event.key == "end"):
+            self.jump_to(self.last_start())
+
     def button_left_click(self, event):
         self.step_backward()
 
@@ -154,12 +179,28 @@ class plot_data:
     def step_backward(self):
         for hf in self.hfile:
             # Step back in file position
-            if(hf.tell() >= 2*self.sizeof_data*self.block_length ):
-                hf.seek(-2*self.sizeof_data*self.block_length, 1)
-            else:
-                hf.seek(-hf.tell(),1)
+            hf.skip(-2*self.block_length)
+        self.update_plots()
+
+    def jump_to(self, position):
+        for hf in self.hfile:
+            hf.seek(position)
         self.update_plots()
 
+    def last_start(self):
+        # start of the last full block of the longest file
+        return max(0, max([len(hf) for hf in self.hfile]) - self.block_length)
+
+    def slider_changed(self, value):
+        if(not self.slider_lock):
+            self.jump_to(int(value))
+
+    def update_slider(self, position):
+        # move the slider along without jumping again
+        self.slider_lock = True
+        self.slider.set_val(position)
+        self.slider_lock = False
+
 
 def find(item_in, list_search):
     try:
@@ -34,17 +34,21 @@ except ImportError:
     raise SystemExit, 1
 
 from optparse import OptionParser
+from gnuradio.plot_file import plot_file, minmax_decimate, envelope
 
 class plot_fft_base:
     def __init__(self, datatype, filename, options):
-        self.hfile = open(filename, "r")
         self.block_length = options.block
         self.start = options.start
         self.sample_rate = options.sample_rate
+        # blocks longer than this are drawn as a min/max envelope
+        self.max_points = getattr(options, "max_points", 10000)
 
         self.datatype = getattr(scipy, datatype)
         self.sizeof_data = self.datatype().nbytes    # number of bytes per sample in file
 
+        self.hfile = plot_file(filename, self.datatype, getattr(options, "prefetch", False))
+
         self.axis_font_size = 16
         self.label_font_size = 18
         self.title_font_size = 20
@@ -71,6 +75,13 @@ class plot_fft_base:
         self.button_right = Button(self.button_right_axes, ">")
         self.button_right_callback = self.button_right.on_clicked(self.button_right_click)
 
+        # Slider to jump to any position in the file
+        self.slider_axes = self.fig.add_axes([0.15, 0.08, 0.70, 0.03], frameon=True)
+        self.slider = Slider(self.slider_axes, "Position", 0, max(self.last_start(), 1),
+                             valinit=self.position, valfmt="%d")
+        self.slider_lock = False
+        self.slider_callback = self.slider.on_changed(self.slider_changed)
+
         self.xlim = self.sp_iq.get_xlim()
 
         self.manager = get_current_fig_manager()
@@ -79,18 +90,17 @@ class plot_fft_base:
         show()
 
     def get_data(self):
-        self.position = self.hfile.tell()/self.sizeof_data
+        self.position = self.hfile.tell()
         self.text_file_pos.set_text("File Position: %d" % (self.position))
-        try:
-            self.iq = scipy.fromfile(self.hfile, dtype=self.datatype, count=self.block_length)
-        except MemoryError:
+        self.iq = self.hfile.read(self.block_length)
+        if(len(self.iq) == 0):
             print "End of File"
         else:
             self.iq_fft = self.dofft(self.iq)
 
             tstep = 1.0 / self.sample_rate
-            #self.time = scipy.array([tstep*(self.position + i) for i in xrange(len(self.iq))])
-            self.time = scipy.array([tstep*(i) for i in xrange(len(self.iq))])
+            #self.time = tstep*(self.position + scipy.arange(len(self.iq)))
+            self.time = tstep*scipy.arange(len(self.iq))
 
             self.freq = self.calc_freq(self.time, self.sample_rate)
 
@@ -105,12 +115,12 @@ class plot_fft_base:
         N = len(time)
         Fs = 1.0 / (time.max() - time.min())
         Fn = 0.5 * sample_rate
-        freq = scipy.array([-Fn + i*Fs for i in xrange(N)])
+        freq = -Fn + Fs*scipy.arange(N)
         return freq
 
     def make_plots(self):
         # if specified on the command-line, set file pointer
-        self.hfile.seek(self.sizeof_data*self.start, 1)
+        self.hfile.seek(self.start)
 
         # Subplot for real and imaginary parts of signal
         self.sp_iq = self.fig.add_subplot(2,2,1, position=[0.075, 0.2, 0.4, 0.6])
@@ -136,10 +146,19 @@ class plot_fft_base:
         draw()
 
     def draw_time(self):
-        reals = self.iq.real
-        imags = self.iq.imag
-        self.plot_iq[0].set_data([self.time, reals])
-        self.plot_iq[1].set_data([self.time, imags])
+        if(self.max_points and len(self.iq) > self.max_points):
+            # Too many samples to draw; plot the min/max envelope
+            index, mins, maxs = minmax_decimate(self.iq, self.max_points // 2)
+            x, y = envelope(index, mins, maxs)
+            time = x / self.sample_rate
+            reals = y.real
+            imags = y.imag
+        else:
+            time = self.time
+            reals = self.iq.real
+            imags = self.iq.imag
+        self.plot_iq[0].set_data([time, reals])
+        self.plot_iq[1].set_data([time, imags])
         self.sp_iq.set_xlim(self.time.min(), self.time.max())
         self.sp_iq.set_ylim([1.5*min([reals.min(), imags.min()]),
                              1.5*max([reals.max(), imags.max()])])
@@ -152,6 +171,7 @@ class plot_fft_base:
     def update_plots(self):
         self.draw_time()
         self.draw_fft()
+        self.update_slider(self.position)
 
         self.xlim = self.sp_iq.get_xlim()
         draw()
@@ -188,6 +208,12 @@ class plot_fft_base:
         elif(find(event.key, backward_valid_keys)):
             self.step_backward()
 
+        elif(event.key == "home"):
+            self.jump_to(0)
+
+        elif(event.key == "end"):
+            self.jump_to(self.last_start())
+
     def button_left_click(self, event):
         self.step_backward()
 
@@ -200,13 +226,29 @@ class plot_fft_base:
 
     def step_backward(self):
         # Step back in file position
-        if(self.hfile.tell() >= 2*self.sizeof_data*self.block_length ):
-            self.hfile.seek(-2*self.sizeof_data*self.block_length, 1)
-        else:
-            self.hfile.seek(-self.hfile.tell(),1)
+        self.hfile.skip(-2*self.block_length)
         self.get_data()
         self.update_plots()
 
+    def jump_to(self, position):
+        self.hfile.seek(position)
+        self.get_data()
+        self.update_plots()
+
+    def last_start(self):
+        # start of the last full block of the file
+        return max(0, len(self.hfile) - self.block_length)
+
+    def slider_changed(self, value):
+        if(not self.slider_lock):
+            self.jump_to(int(value))
+
+    def update_slider(self, position):
+        # move the slider along without jumping again
+        self.slider_lock = True
+        self.slider.set_val(position)
+        self.slider_lock = False
+
     @staticmethod
     def setup_options():
         usage="%prog: [options] input_filename"
@@ -221,6 +263,10 @@ class plot_fft_base:
                           help="Specify where to start in the file [default=%default]")
         parser.add_option("-R", "--sample-rate", type="float", default=1.0,
                           help="Set the sampler rate of the data [default=%default]")
+        parser.add_option("", "--max-points", type="int", default=10000,
+                          help="Draw blocks longer than this as a min/max envelope [default=%default]")
+        parser.add_option("", "--prefetch", action="store_true", default=False,
+                          help="Read the next block in the background")
         return parser
 
 def find(item_in, list_search):
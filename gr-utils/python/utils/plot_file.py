@@ -0,0 +1,189 @@
+#
+# Copyright 2013 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+"""
+Memory-mapped access to raw sample files for the gr_plot_* tools.
+"""
+
+import os
+import threading
+
+import numpy
+
+class plot_file:
+    """
+    Random access reader for a raw binary file of samples.
+
+    The file is mapped with numpy.memmap, so jumping to any position
+    is free and only the pages that are actually plotted are read from
+    disk. The reader keeps its own position (in items) and advances it
+    on every read, like a file handle would.
+
+    If prefetch is True, after each read a background thread touches
+    the next block so that stepping forward through a large capture
+    does not stall on disk I/O.
+    """
+    def __init__(self, filename, dtype, prefetch=False):
+        self.filename = filename
+        self.dtype = numpy.dtype(dtype)
+        self.position = 0
+        self.prefetch = prefetch
+        self._prefetch_thread = None
+
+        nitems = os.path.getsize(filename) // self.dtype.itemsize
+        if nitems > 0:
+            self.data = numpy.memmap(filename, dtype=self.dtype, mode='r',
+                                     shape=(nitems,))
+        else:
+            # numpy cannot map an empty file
+            self.data = numpy.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.data)
+
+    def tell(self):
+        return self.position
+
+    def seek(self, position):
+        """Move to the given item, clamped to the bounds of the file."""
+        self.position = max(0, min(int(position), len(self.data)))
+
+    def skip(self, nitems):
+        """Move relative to the current position."""
+        self.seek(self.position + nitems)
+
+    def read(self, nitems):
+        """
+        Return the next nitems items as an in-memory array and advance
+        the position. Fewer items are returned at the end of the file.
+        """
+        start = self.position
+        stop = min(start + nitems, len(self.data))
+        block = numpy.array(self.data[start:stop])
+        self.position = stop
+        if self.prefetch:
+            self._start_prefetch(stop, nitems)
+        return block
+
+    def overview(self, start, stop, npoints):
+        """
+        Return a min/max envelope of items [start, stop).
+
+        See minmax_decimate.
+        """
+        start = max(0, start)
+        stop = min(stop, len(self.data))
+        return minmax_decimate(self.data[start:stop], npoints, start)
+
+    def _start_prefetch(self, start, nitems):
+        if self._prefetch_thread is not None and self._prefetch_thread.is_alive():
+            return
+        stop = min(start + nitems, len(self.data))
+        if stop <= start:
+            return
+        self._prefetch_thread = threading.Thread(target=self._touch,
+                                                 args=(start, stop))
+        self._prefetch_thread.daemon = True
+        self._prefetch_thread.start()
+
+    def _touch(self, start, stop):
+        # Reading one item per page is enough to pull the block into
+        # the page cache; the actual copy happens in read().
+        step = max(1, mmap_page_items(self.dtype))
+        self.data[start:stop:step].sum()
+
+def mmap_page_items(dtype):
+    """Number of items of dtype in one memory page."""
+    try:
+        import mmap
+        pagesize = mmap.PAGESIZE
+    except (ImportError, AttributeError):
+        pagesize = 4096
+    return pagesize // numpy.dtype(dtype).itemsize
+
+def minmax_decimate(data, npoints, offset=0, chunk_size=1<<20):
+    """
+    Reduce data to at most npoints bins, keeping the minimum and
+    maximum of each bin.
+
+    Plotting the envelope draws the same picture as plotting every
+    sample (no peak is lost), but only needs 2*npoints vertices. The
+    input is processed chunk_size items at a time so that a memmap
+    over a very large file is never loaded at once.
+
+    Complex data is reduced on the real and imaginary parts
+    separately.
+
+    Returns (index, mins, maxs), where index is the item number
+    (plus offset) of the first item of each bin.
+    """
+    n = len(data)
+    if n == 0 or npoints <= 0:
+        empty = numpy.zeros(0)
+        return empty, empty, empty
+
+    binsize = max(1, int(numpy.ceil(n / float(npoints))))
+    nbins = (n + binsize - 1) // binsize
+    iscomplex = numpy.iscomplexobj(data)
+    if iscomplex:
+        mins = numpy.empty(nbins, dtype=numpy.complex128)
+    else:
+        mins = numpy.empty(nbins, dtype=numpy.float64)
+    maxs = numpy.empty_like(mins)
+
+    # keep chunks aligned to bins
+    chunk = max(binsize, (chunk_size // binsize) * binsize)
+    for s in xrange(0, n, chunk):
+        block = numpy.asarray(data[s:s+chunk])
+        b0 = s // binsize
+        nfull = len(block) // binsize
+        parts = [block.real]
+        if iscomplex:
+            parts.append(block.imag)
+        for i, part in enumerate(parts):
+            lo = numpy.empty((len(block) + binsize - 1) // binsize)
+            hi = numpy.empty_like(lo)
+            if nfull:
+                full = part[:nfull*binsize].reshape(nfull, binsize)
+                lo[:nfull] = full.min(axis=1)
+                hi[:nfull] = full.max(axis=1)
+            if len(lo) > nfull:
+                lo[nfull] = part[nfull*binsize:].min()
+                hi[nfull] = part[nfull*binsize:].max()
+            if i == 0:
+                mins.real[b0:b0+len(lo)] = lo
+                maxs.real[b0:b0+len(hi)] = hi
+            else:
+                mins.imag[b0:b0+len(lo)] = lo
+                maxs.imag[b0:b0+len(hi)] = hi
+
+    index = offset + numpy.arange(nbins) * binsize
+    return index, mins, maxs
+
+def envelope(index, mins, maxs):
+    """
+    Interleave a min/max envelope into a single (x, y) trace that can
+    be passed to plot(); each bin becomes a vertical segment.
+    """
+    x = numpy.repeat(index, 2)
+    y = numpy.empty(2*len(mins), dtype=mins.dtype)
+    y[0::2] = mins
+    y[1::2] = maxs
+    return x, y
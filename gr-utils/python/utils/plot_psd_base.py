@@ -36,10 +36,10 @@ except ImportError:
 from optparse import OptionParser
 from scipy import log10
 from gnuradio.eng_option import eng_option
+from gnuradio.plot_file import plot_file
 
 class plot_psd_base:
     def __init__(self, datatype, filename, options):
-        self.hfile = open(filename, "r")
         self.block_length = options.block
         self.start = options.start
         self.sample_rate = options.sample_rate
@@ -50,6 +50,7 @@ class plot_psd_base:
 
         self.datatype = getattr(scipy, datatype) #scipy.complex64
         self.sizeof_data = self.datatype().nbytes    # number of bytes per sample in file
+        self.hfile = plot_file(filename, self.datatype, getattr(options, "prefetch", False))
 
         self.axis_font_size = 16
         self.label_font_size = 18
@@ -87,26 +88,19 @@ class plot_psd_base:
         show()
 
     def get_data(self):
-        self.position = self.hfile.tell()/self.sizeof_data
+        self.position = self.hfile.tell()
         self.text_file_pos.set_text("File Position: %d" % self.position)
-        try:
-            self.iq = scipy.fromfile(self.hfile, dtype=self.datatype, count=self.block_length)
-        except MemoryError:
+        self.iq = self.hfile.read(self.block_length)
+        if(len(self.iq) > 0):
+            tstep = 1.0 / self.sample_rate
+            #self.time = tstep*(self.position + scipy.arange(len(self.iq)))
+            self.time = tstep*scipy.arange(len(self.iq))
+
+            self.iq_psd, self.freq = self.dopsd(self.iq)
+            return True
+        else:
             print "End of File"
             return False
-        else:
-            # retesting length here as newer version of scipy does not throw a MemoryError, just
-            # returns a zero-length array
-            if(len(self.iq) > 0):
-                tstep = 1.0 / self.sample_rate
-                #self.time = scipy.array([tstep*(self.position + i) for i in xrange(len(self.iq))])
-                self.time = scipy.array([tstep*(i) for i in xrange(len(self.iq))])
-
-                self.iq_psd, self.freq = self.dopsd(self.iq)
-                return True
-            else:
-                print "End of File"
-                return False
 
     def dopsd(self, iq):
         ''' Need to do this here and plot later so we can do the fftshift '''
@@ -120,7 +114,7 @@ class plot_psd_base:
 
     def make_plots(self):
         # if specified on the command-line, set file pointer
-        self.hfile.seek(self.sizeof_data*self.start, 1)
+        self.hfile.seek(self.start)
 
         iqdims = [[0.075, 0.2, 0.4, 0.6], [0.075, 0.55, 0.4, 0.3]]
         psddims = [[0.575, 0.2, 0.4, 0.6], [0.575, 0.55, 0.4, 0.3]]
@@ -234,10 +228,7 @@ class plot_psd_base:
 
     def step_backward(self):
         # Step back in file position
-        if(self.hfile.tell() >= 2*self.sizeof_data*self.block_length ):
-            self.hfile.seek(-2*self.sizeof_data*self.block_length, 1)
-        else:
-            self.hfile.seek(-self.hfile.tell(),1)
+        self.hfile.skip(-2*self.block_length)
         r = self.get_data()
         if(r):
             self.update_plots()
@@ -263,6 +254,8 @@ class plot_psd_base:
                           help="Set the size of the spectrogram FFT [default=%default]")
         parser.add_option("-S", "--enable-spec", action="store_true", default=False,
                           help="Turn on plotting the spectrogram [default=%default]")
+        parser.add_option("", "--prefetch", action="store_true", default=False,
+                          help="Read the next block in the background")
 
         return parser
 
@@ -150,13 +150,14 @@ class input_watcher(gru.msgq_runner):
 	Input watcher thread runs forever.
 	Read messages from the message queue.
 	Forward messages to the message handler.
+	When coalesce is set, only the newest queued message is forwarded.
 	"""
-	def __init__ (self, msgq, controller, msg_key, arg1_key='', arg2_key=''):
+	def __init__ (self, msgq, controller, msg_key, arg1_key='', arg2_key='', coalesce=False):
 		self._controller = controller
 		self._msg_key = msg_key
 		self._arg1_key = arg1_key
 		self._arg2_key = arg2_key
-		gru.msgq_runner.__init__(self, msgq, self.handle_msg)
+		gru.msgq_runner.__init__(self, msgq, self.handle_msg, coalesce=coalesce)
 
 	def handle_msg(self, msg):
 		if self._arg1_key: self._controller[self._arg1_key] = msg.arg1()
@@ -256,7 +257,8 @@ def get_min_max(samples):
 	factor = 2.0
 	mean = numpy.average(samples)
 	std = numpy.std(samples)
-	fft = numpy.abs(numpy.fft.fft(samples - mean))
+	#the spectrum of real samples is symmetric, the positive half has the same peak
+	fft = numpy.abs(numpy.fft.rfft(samples - mean))
 	envelope = 2*numpy.max(fft)/len(samples)
 	ampl = max(std, envelope) or 0.1
 	return mean - factor*ampl, mean + factor*ampl
@@ -274,7 +276,7 @@ def get_min_max_fft(fft_samps):
 	#get the peak level (max of the samples)
 	peak_level = numpy.max(fft_samps)
 	#separate noise samples
-	noise_samps = numpy.sort(fft_samps)[:len(fft_samps)/2]
+	noise_samps = get_lower_half(fft_samps)
 	#get the noise floor
 	noise_floor = numpy.average(noise_samps)
 	#get the noise deviation
@@ -283,3 +285,160 @@ def get_min_max_fft(fft_samps):
 	max_level = peak_level
 	min_level = noise_floor - abs(2*noise_dev)
 	return min_level, max_level
+
+def get_lower_half(samples):
+	"""
+	Get the smallest half of the samples, in no particular order.
+	Uses a partial selection rather than a full sort when numpy has one.
+	
+	Args:
+	    samples: the array of real values
+	
+	Returns:
+	    an array of len(samples)/2 values
+	"""
+	num = len(samples)/2
+	if not num: return samples[:0]
+	if hasattr(numpy, 'partition'): return numpy.partition(samples, num-1)[:num]
+	return numpy.sort(samples)[:num]
+
+##################################################
+# Trace Processing
+##################################################
+class trace_processor(object):
+	"""
+	Per frame processing for fft and histogram traces.
+	The reorder indexes are computed once per frame size. Every frame
+	is read from the message in place and taken into a new trace, and
+	the peak hold is a new array after every update. Plotters and
+	stored traces may therefore keep the arrays returned below.
+	"""
+
+	def __init__(self, shift=False, real=False):
+		"""
+		Create a new trace processor.
+		
+		Args:
+		    shift: reorder fft frames so the negative bins come first
+		    real: keep only the positive bins of fft frames
+		"""
+		self._shift = shift
+		self._real = real
+		self._index = None
+		self.trace = numpy.zeros(0, numpy.float32)
+		self.reset_peak()
+
+	def _resize(self, num_samps):
+		"""
+		Compute the reorder indexes for a frame size.
+		"""
+		if self._real: index = numpy.arange((num_samps+1)/2)
+		elif self._shift: index = numpy.concatenate((numpy.arange(num_samps/2+1, num_samps), numpy.arange((num_samps+1)/2)))
+		else: index = numpy.arange(num_samps)
+		self._num_samps = num_samps
+		self._index = index
+		self.reset_peak()
+
+	def process(self, msg, size, scale=None):
+		"""
+		Load a frame into a new trace.
+		The message string is read in place, not copied.
+		
+		Args:
+		    msg: the frame as a character array
+		    size: the number of float32 values in the frame
+		    scale: optional factor to multiply the frame by
+		
+		Returns:
+		    the trace array
+		"""
+		samples = numpy.frombuffer(msg, numpy.float32, count=min(size, len(msg)/4))
+		if self._index is None or len(samples) != self._num_samps: self._resize(len(samples))
+		#a new array, the last trace may still be in use by a plotter
+		self.trace = numpy.take(samples, self._index)
+		if scale is not None: self.trace *= scale
+		return self.trace
+
+	def reset_peak(self, *args): self._peak_valid = False
+
+	def hold_peak(self):
+		"""
+		Update the peak hold with the current trace.
+		
+		Returns:
+		    the peak array
+		"""
+		if not self._peak_valid:
+			self.peak = self.trace
+			self._peak_valid = True
+		else: self.peak = numpy.maximum(self.trace, self.peak)
+		return self.peak
+
+	def get_min_max(self):
+		"""
+		Get the autoscale bounds of the current trace.
+		See get_min_max_fft.
+		
+		Returns:
+		    a tuple of min, max
+		"""
+		return get_min_max_fft(self.trace)
+
+##################################################
+# Display Reduction
+##################################################
+REDUCE_FRAMES = gr.prefs().get_bool('wxgui', 'reduce_frames', True)
+REDUCE_MINMAX = 'minmax'
+REDUCE_MAX = 'max'
+REDUCE_MEAN = 'mean'
+
+def get_envelope(samples, num_cols):
+	"""
+	Collapse an array of samples into columns.
+	Each column covers the same number of consecutive samples,
+	except for the last column, which may be shorter.
+	
+	Args:
+	    samples: the array of real values
+	    num_cols: the maximum number of columns
+	
+	Returns:
+	    a tuple of min, max, mean arrays, one value per column
+	"""
+	samples = numpy.asarray(samples)
+	num_samps = len(samples)
+	bin_size = int(math.ceil(float(num_samps)/max(num_cols, 1)))
+	starts = numpy.arange(0, num_samps, bin_size)
+	counts = numpy.diff(numpy.append(starts, num_samps))
+	mins = numpy.minimum.reduceat(samples, starts)
+	maxs = numpy.maximum.reduceat(samples, starts)
+	means = numpy.add.reduceat(samples, starts)/counts
+	return mins, maxs, means
+
+def reduce_samples(samples, num_cols, mode=REDUCE_MINMAX):
+	"""
+	Reduce a frame of samples for a plot that is num_cols pixels wide.
+	Frames that already fit the width are returned unchanged.
+	In minmax mode, each column becomes its min followed by its max,
+	so that peaks and nulls remain visible.
+	
+	Args:
+	    samples: the array of real values
+	    num_cols: the plot width in pixels or 0 when unknown
+	    mode: REDUCE_MINMAX, REDUCE_MAX or REDUCE_MEAN
+	
+	Returns:
+	    a tuple of reduced samples, input samples per output sample
+	"""
+	points_per_col = mode == REDUCE_MINMAX and 2 or 1
+	if not REDUCE_FRAMES or num_cols <= 0 or len(samples) <= points_per_col*num_cols:
+		return samples, 1.0
+	mins, maxs, means = get_envelope(samples, num_cols)
+	if mode == REDUCE_MINMAX:
+		reduced = numpy.empty(2*len(mins), mins.dtype)
+		reduced[0::2] = mins
+		reduced[1::2] = maxs
+	elif mode == REDUCE_MAX: reduced = maxs
+	elif mode == REDUCE_MEAN: reduced = means
+	else: raise ValueError, 'unknown reduce mode "%s"'%mode
+	return reduced, float(len(samples))/len(reduced)
@@ -27,7 +27,7 @@ import common
 from gnuradio import gr
 from gnuradio import blocks
 from gnuradio import analog
-from pubsub import pubsub
+from pubsub import pubsub, wx_dispatcher
 from constants import *
 import sys
 try:
@@ -121,7 +121,7 @@ class const_sink_c(gr.hier_block2, common.wxgui_hb):
 		#initial update
 		self.controller[SAMPLE_RATE_KEY] = sample_rate
 		#start input watcher
-		common.input_watcher(msgq, self.controller, MSG_KEY)
+		common.input_watcher(msgq, self.controller, MSG_KEY, coalesce=True)
 		#create window
 		self.win = const_window.const_window(
 			parent=parent,
@@ -138,5 +138,7 @@ class const_sink_c(gr.hier_block2, common.wxgui_hb):
 		common.register_access_methods(self, self.win)
 		#connect
 		self.wxgui_connect(self, self._costas, self._retime, agc, sd, sink)
+		#updates after construction are collapsed and delivered in the gui thread
+		self.controller.set_dispatcher(wx_dispatcher())
 
 
@@ -235,6 +235,7 @@ class fft_window(wx.Panel, pubsub.pubsub):
 		self.samples = EMPTY_TRACE
 		self.real = real
 		self.fft_size = fft_size
+		self._processor = common.trace_processor(shift=True, real=real)
 		self._reset_peak_vals()
 		self._traces = dict()
 		#proxy the keys
@@ -312,13 +313,15 @@ class fft_window(wx.Panel, pubsub.pubsub):
 		Set the dynamic range and reference level.
 		"""
 		if not len(self.samples): return
-		min_level, max_level = common.get_min_max_fft(self.samples)
+		min_level, max_level = self._processor.get_min_max()
 		#set the range to a clean number of the dynamic range
 		self[Y_PER_DIV_KEY] = common.get_clean_num(1+(max_level - min_level)/self[Y_DIVS_KEY])
 		#set the reference level to a multiple of y per div
 		self[REF_LEVEL_KEY] = self[Y_PER_DIV_KEY]*round(.5+max_level/self[Y_PER_DIV_KEY])
 
-	def _reset_peak_vals(self, *args): self.peak_vals = EMPTY_TRACE
+	def _reset_peak_vals(self, *args):
+		self.peak_vals = EMPTY_TRACE
+		self._processor.reset_peak()
 
 	def handle_msg(self, msg):
 		"""
@@ -332,21 +335,18 @@ class fft_window(wx.Panel, pubsub.pubsub):
 		    msg: the fft array as a character array
 		"""
 		if not self[RUNNING_KEY]: return
-		#convert to floating point numbers
-		samples = numpy.fromstring(msg, numpy.float32)[:self.fft_size] #only take first frame
-		num_samps = len(samples)
-		#reorder fft
-		if self.real: samples = samples[:(num_samps+1)/2]
-		else: samples = numpy.concatenate((samples[num_samps/2+1:], samples[:(num_samps+1)/2]))
+		#convert to floating point numbers and reorder fft
+		samples = self._processor.process(msg, self.fft_size) #only take first frame
 		self.samples = samples
+		#reduce to the plot width
+		num_cols = self.plotter.get_num_columns()
 		#peak hold calculation
 		if self[PEAK_HOLD_KEY]:
-			if len(self.peak_vals) != len(samples): self.peak_vals = samples
-			self.peak_vals = numpy.maximum(samples, self.peak_vals)
+			self.peak_vals = self._processor.hold_peak()
 			#plot the peak hold
 			self.plotter.set_waveform(
 				channel='Peak',
-				samples=self.peak_vals,
+				samples=common.reduce_samples(self.peak_vals, num_cols)[0],
 				color_spec=PEAK_VALS_COLOR_SPEC,
 			)
 		else:
@@ -355,7 +355,7 @@ class fft_window(wx.Panel, pubsub.pubsub):
 		#plot the fft
 		self.plotter.set_waveform(
 			channel='FFT',
-			samples=samples,
+			samples=common.reduce_samples(samples, num_cols)[0],
 			color_spec=FFT_PLOT_COLOR_SPEC,
 		)
 		#update the plotter
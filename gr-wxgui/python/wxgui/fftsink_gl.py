@@ -30,7 +30,7 @@ from gnuradio import gr, fft
 from gnuradio import analog
 from gnuradio import blocks
 from gnuradio.fft import logpwrfft
-from pubsub import pubsub
+from pubsub import pubsub, wx_dispatcher
 from constants import *
 import math
 
@@ -104,7 +104,7 @@ class _fft_sink_base(gr.hier_block2, common.wxgui_hb):
 		self.controller.subscribe(SAMPLE_RATE_KEY, fft.set_sample_rate)
 		self.controller.publish(SAMPLE_RATE_KEY, fft.sample_rate)
 		#start input watcher
-		common.input_watcher(msgq, self.controller, MSG_KEY)
+		common.input_watcher(msgq, self.controller, MSG_KEY, coalesce=True)
 		#create window
 		self.win = fft_window.fft_window(
 			parent=parent,
@@ -130,6 +130,8 @@ class _fft_sink_base(gr.hier_block2, common.wxgui_hb):
 		setattr(self.win, 'set_peak_hold', getattr(self, 'set_peak_hold')) #BACKWARDS
 		#connect
 		self.wxgui_connect(self, fft, sink)
+		#updates after construction are collapsed and delivered in the gui thread
+		self.controller.set_dispatcher(wx_dispatcher())
 		
 	def set_callback(self,callb):
 		self.win.set_callback(callb)
@@ -103,6 +103,7 @@ class histo_window(wx.Panel, pubsub.pubsub):
 		msg_key,
 	):
 		pubsub.pubsub.__init__(self)
+		self._processor = common.trace_processor()
 		#setup
 		self.samples = list()
 		#proxy the keys
@@ -143,7 +144,7 @@ class histo_window(wx.Panel, pubsub.pubsub):
 		"""
 		if not self[RUNNING_KEY]: return
 		#convert to floating point numbers
-		self.samples = 100*numpy.fromstring(msg, numpy.float32)[:self[NUM_BINS_KEY]] #only take first frame
+		self.samples = self._processor.process(msg, self[NUM_BINS_KEY], scale=100) #only take first frame
 		self.plotter.set_bars(
 			bars=self.samples,
 			bar_width=0.6,
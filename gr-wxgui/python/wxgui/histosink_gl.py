@@ -28,7 +28,7 @@ from gnuradio import gr
 from gnuradio import analog
 from gnuradio import blocks
 from gnuradio import wxgui
-from pubsub import pubsub
+from pubsub import pubsub, wx_dispatcher
 from constants import *
 
 ##################################################
@@ -66,7 +66,7 @@ class histo_sink_f(gr.hier_block2, common.wxgui_hb):
 		self.controller.subscribe(FRAME_SIZE_KEY, histo.set_frame_size)
 		self.controller.publish(FRAME_SIZE_KEY, histo.get_frame_size)
 		#start input watcher
-		common.input_watcher(msgq, self.controller, MSG_KEY, arg1_key=MINIMUM_KEY, arg2_key=MAXIMUM_KEY)
+		common.input_watcher(msgq, self.controller, MSG_KEY, arg1_key=MINIMUM_KEY, arg2_key=MAXIMUM_KEY, coalesce=True)
 		#create window
 		self.win = histo_window.histo_window(
 			parent=parent,
@@ -82,6 +82,8 @@ class histo_sink_f(gr.hier_block2, common.wxgui_hb):
 		common.register_access_methods(self, self.win)
 		#connect
 		self.wxgui_connect(self, histo)
+		#updates after construction are collapsed and delivered in the gui thread
+		self.controller.set_dispatcher(wx_dispatcher())
 
 # ----------------------------------------------------------------
 # Standalone test app
@@ -27,7 +27,7 @@ import common
 from gnuradio import gr, filter
 from gnuradio import analog
 from gnuradio import blocks
-from pubsub import pubsub
+from pubsub import pubsub, wx_dispatcher
 from constants import *
 
 ##################################################
@@ -96,7 +96,7 @@ class _number_sink_base(gr.hier_block2, common.wxgui_hb):
 		self.controller.subscribe(AVERAGE_KEY, update_avg)
 		self.controller.subscribe(AVG_ALPHA_KEY, update_avg)
 		#start input watcher
-		common.input_watcher(msgq, self.controller, MSG_KEY)
+		common.input_watcher(msgq, self.controller, MSG_KEY, coalesce=True)
 		#create window
 		self.win = number_window.number_window(
 			parent=parent,
@@ -120,6 +120,8 @@ class _number_sink_base(gr.hier_block2, common.wxgui_hb):
 		self.set_show_gauge = self.win.show_gauges
 		#connect
 		self.wxgui_connect(self, sd, mult, add, avg, sink)
+		#updates after construction are collapsed and delivered in the gui thread
+		self.controller.set_dispatcher(wx_dispatcher())
 
 class number_sink_f(_number_sink_base):
 	_item_size = gr.sizeof_float
@@ -21,6 +21,7 @@
 
 import wx
 from grid_plotter_base import grid_plotter_base
+from plotter_base import gl_vertex_buffer
 from OpenGL import GL
 import common
 import numpy
@@ -35,6 +36,7 @@ SAMPLES_KEY = 'samples'
 COLOR_SPEC_KEY = 'color_spec'
 MARKERY_KEY = 'marker'
 TRIG_OFF_KEY = 'trig_off'
+VERTEX_BUFFER_KEY = 'vertex_buffer'
 
 ##################################################
 # Channel Plotter for X Y Waveforms
@@ -51,9 +53,10 @@ class channel_plotter(grid_plotter_base):
 		#setup legend cache
 		self._legend_cache = self.new_gl_cache(self._draw_legend, 50)
 		self.enable_legend(False)
-		#setup waveform cache
-		self._waveform_cache = self.new_gl_cache(self._draw_waveforms, 50)
+		#setup waveform drawing, vertex buffers are updated in place
+		self.register_draw(self._draw_waveforms, 50)
 		self._channels = dict()
+		self._stale_buffers = list()
 		#init channel plotter
 		self.register_init(self._init_channel_plotter)
 		self.callback = None
@@ -85,6 +88,9 @@ class channel_plotter(grid_plotter_base):
 		Draw the waveforms for each channel.
 		Scale the waveform data to the grid using gl matrix operations.
 		"""
+		#free buffers of removed channels
+		for vertex_buffer in self._stale_buffers: vertex_buffer.delete()
+		self._stale_buffers = list()
 		#use scissor to prevent drawing outside grid
 		GL.glEnable(GL.GL_SCISSOR_TEST)
 		GL.glScissor(
@@ -95,6 +101,7 @@ class channel_plotter(grid_plotter_base):
 		)
 		for channel in reversed(sorted(self._channels.keys())):
 			samples = self._channels[channel][SAMPLES_KEY]
+			vertex_buffer = self._channels[channel][VERTEX_BUFFER_KEY]
 			num_samps = len(samples)
 			if not num_samps: continue
 			#use opengl to scale the waveform
@@ -108,22 +115,18 @@ class channel_plotter(grid_plotter_base):
 			GL.glTranslatef(0, 1, 0)
 			if isinstance(samples, tuple):
 				x_scale, x_trans = 1.0/(self.x_max-self.x_min), -self.x_min
-				points = zip(*samples)
 			else:
 				x_scale, x_trans = 1.0/(num_samps-1), -self._channels[channel][TRIG_OFF_KEY]
-				points = zip(numpy.arange(0, num_samps), samples)
 			GL.glScalef(x_scale, -1.0/(self.y_max-self.y_min), 1)
 			GL.glTranslatef(x_trans, -self.y_min, 0)
 			#draw the points/lines
 			GL.glColor3f(*self._channels[channel][COLOR_SPEC_KEY])
 			marker = self._channels[channel][MARKERY_KEY]
 			if marker is None:
-				GL.glVertexPointerf(points)
-				GL.glDrawArrays(GL.GL_LINE_STRIP, 0, len(points))
+				vertex_buffer.draw(GL.GL_LINE_STRIP)
 			elif isinstance(marker, (int, float)) and marker > 0:
 				GL.glPointSize(marker)
-				GL.glVertexPointerf(points)
-				GL.glDrawArrays(GL.GL_POINTS, 0, len(points))
+				vertex_buffer.draw(GL.GL_POINTS)
 			GL.glPopMatrix()
 		GL.glDisable(GL.GL_SCISSOR_TEST)
 
@@ -201,9 +204,8 @@ class channel_plotter(grid_plotter_base):
 		"""
 		self.lock()
 		if channel in self._channels.keys():
-			self._channels.pop(channel)
+			self._stale_buffers.append(self._channels.pop(channel)[VERTEX_BUFFER_KEY])
 			self._legend_cache.changed(True)
-			self._waveform_cache.changed(True)
 		self.unlock()
 
 	def set_waveform(self, channel, samples=[], color_spec=(0, 0, 0), marker=None, trig_off=0):
@@ -218,14 +220,20 @@ class channel_plotter(grid_plotter_base):
 		    trig_off: fraction of sample for trigger offset
 		"""
 		self.lock()
-		if channel not in self._channels.keys(): self._legend_cache.changed(True)
+		if channel not in self._channels.keys():
+			self._legend_cache.changed(True)
+			vertex_buffer = gl_vertex_buffer()
+		else: vertex_buffer = self._channels[channel][VERTEX_BUFFER_KEY]
+		#fill the vertex buffer in place
+		if isinstance(samples, tuple): vertex_buffer.set_points(*samples)
+		else: vertex_buffer.set_samples(samples)
 		self._channels[channel] = {
 			SAMPLES_KEY: samples,
 			COLOR_SPEC_KEY: color_spec,
 			MARKERY_KEY: marker,
 			TRIG_OFF_KEY: trig_off,
+			VERTEX_BUFFER_KEY: vertex_buffer,
 		}
-		self._waveform_cache.changed(True)
 		self.unlock()
 
 if __name__ == '__main__':
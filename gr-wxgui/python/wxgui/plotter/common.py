@@ -107,6 +107,45 @@ class mutex(object):
 	def lock(self): self._lock.acquire()
 	def unlock(self): self._lock.release()
 
+##################################################
+# Redraw cost measurement
+##################################################
+class frame_timer(object):
+	"""
+	Measure the time spent redrawing a plotter.
+	Keeps the last frame time, a smoothed average and a frame count.
+	"""
+
+	def __init__(self, alpha=0.1):
+		"""
+		Create a new frame timer.
+
+                Args:
+		    alpha: the averaging constant for the smoothed frame time
+		"""
+		self._alpha = alpha
+		self.reset()
+
+	def reset(self):
+		self._start = None
+		self._last = 0.0
+		self._average = 0.0
+		self._count = 0
+
+	def start(self): self._start = time.time()
+
+	def stop(self):
+		if self._start is None: return
+		self._last = time.time() - self._start
+		self._start = None
+		if self._count: self._average += self._alpha*(self._last - self._average)
+		else: self._average = self._last
+		self._count += 1
+
+	def get_last(self): return self._last
+	def get_average(self): return self._average
+	def get_count(self): return self._count
+
 ##################################################
 # Periodic update thread for point label
 ##################################################
@@ -121,6 +121,16 @@ class grid_plotter_base(plotter_base):
 		for cache in self._gl_caches: cache.changed(True)
 		self.unlock()
 
+	def get_num_columns(self):
+		"""
+		Get the width of the grid area in pixels.
+
+                Returns:
+		    the number of pixel columns or 0 before the first paint
+		"""
+		try: return max(0, self.width - self.padding_left - self.padding_right)
+		except AttributeError: return 0
+
 	def enable_point_label(self, enable=None):
 		"""
 		Enable/disable the point label.
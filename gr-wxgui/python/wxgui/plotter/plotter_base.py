@@ -23,6 +23,7 @@ import wx
 import wx.glcanvas
 from OpenGL import GL
 import common
+import numpy
 
 BACKGROUND_COLOR_SPEC = (1, 0.976, 1, 1) #creamy white
 
@@ -72,6 +73,109 @@ class gl_cache(object):
 		if state is None: return self._changed
 		self._changed = state
 
+##################################################
+# Vertex buffer interface
+##################################################
+def has_vbo():
+	"""
+	Check if the current gl context supports vertex buffer objects.
+	"""
+	try: return bool(GL.glGenBuffers)
+	except Exception: return False
+
+class gl_vertex_buffer(object):
+	"""
+	A persistent array of interleaved x, y float32 vertices.
+	The array is preallocated and filled in place with numpy,
+	then uploaded to a vertex buffer object on the next draw.
+	Falls back to a client side vertex array when vbos are not available.
+	"""
+
+	def __init__(self):
+		self._vertices = numpy.zeros((0, 2), numpy.float32)
+		self._num_verts = 0
+		self._index_x = False #x column holds 0...n-1
+		self._dirty = True
+		self._vbo = None
+		self._vbo_size = 0
+
+	def _reserve(self, num_verts):
+		"""
+		Grow the storage to hold at least num_verts vertices.
+		Storage grows in powers of two so it is rarely reallocated.
+		"""
+		if num_verts <= len(self._vertices): return
+		size = 1
+		while size < num_verts: size *= 2
+		self._vertices = numpy.zeros((size, 2), numpy.float32)
+		self._index_x = False
+
+	def set_samples(self, samples):
+		"""
+		Load a waveform with implicit x values 0...n-1.
+
+                Args:
+		    samples: the y values
+		"""
+		num_verts = len(samples)
+		self._reserve(num_verts)
+		if not self._index_x or num_verts > self._num_verts:
+			self._vertices[:num_verts, 0] = numpy.arange(num_verts)
+			self._index_x = True
+		self._vertices[:num_verts, 1] = samples
+		self._num_verts = num_verts
+		self._dirty = True
+
+	def set_points(self, x, y):
+		"""
+		Load a waveform with explicit x values.
+
+                Args:
+		    x: the x values
+		    y: the y values
+		"""
+		num_verts = min(len(x), len(y))
+		self._reserve(num_verts)
+		self._vertices[:num_verts, 0] = x[:num_verts]
+		self._vertices[:num_verts, 1] = y[:num_verts]
+		self._index_x = False
+		self._num_verts = num_verts
+		self._dirty = True
+
+	def __len__(self): return self._num_verts
+
+	def draw(self, mode):
+		"""
+		Draw the vertices with the gl primitive mode.
+		Upload the vertices first if they changed.
+		Must be called with the gl context current.
+		"""
+		if not self._num_verts: return
+		if self._vbo is None and has_vbo(): self._vbo = GL.glGenBuffers(1)
+		if self._vbo is None:
+			GL.glVertexPointerf(self._vertices[:self._num_verts])
+		else:
+			GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self._vbo)
+			if self._vbo_size != len(self._vertices):
+				GL.glBufferData(GL.GL_ARRAY_BUFFER, self._vertices.nbytes, self._vertices, GL.GL_DYNAMIC_DRAW)
+				self._vbo_size = len(self._vertices)
+			elif self._dirty:
+				GL.glBufferSubData(GL.GL_ARRAY_BUFFER, 0, self._vertices[:self._num_verts].nbytes, self._vertices[:self._num_verts])
+			GL.glVertexPointer(2, GL.GL_FLOAT, 0, None)
+		self._dirty = False
+		GL.glDrawArrays(mode, 0, self._num_verts)
+		if self._vbo is not None: GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+
+	def delete(self):
+		"""
+		Free the vertex buffer object.
+		Must be called with the gl context current.
+		"""
+		if self._vbo is not None: GL.glDeleteBuffers(1, [self._vbo])
+		self._vbo = None
+		self._vbo_size = 0
+		self._dirty = True
+
 ##################################################
 # OpenGL WX Plotter Canvas
 ##################################################
@@ -101,6 +205,7 @@ class plotter_base(wx.glcanvas.GLCanvas, common.mutex):
 		self._init_fcns = list()
 		self._draw_fcns = list()
 		self._gl_caches = list()
+		self._frame_timer = common.frame_timer()
 		self.Bind(wx.EVT_PAINT, self._on_paint)
 		self.Bind(wx.EVT_SIZE, self._on_size)
 		self.Bind(wx.EVT_ERASE_BACKGROUND, lambda e: None)
@@ -112,6 +217,18 @@ class plotter_base(wx.glcanvas.GLCanvas, common.mutex):
 	def set_persist_alpha(self,analog_alpha):
 		self.persist_alpha=analog_alpha
 
+	def get_frame_time(self):
+		"""
+		Get the smoothed time in seconds spent redrawing the plotter.
+		"""
+		return self._frame_timer.get_average()
+
+	def get_frame_count(self):
+		"""
+		Get the number of frames drawn so far.
+		"""
+		return self._frame_timer.get_count()
+
 	def new_gl_cache(self, draw_fcn, draw_pri=50):
 		"""
 		Create a new gl cache.
@@ -165,6 +282,7 @@ class plotter_base(wx.glcanvas.GLCanvas, common.mutex):
 		if event.GetEventObject():	# Only create DC if paint triggered by WM message (for OS X)
 			dc = wx.PaintDC(self)
 		self.lock()
+		self._frame_timer.start()
 		self.SetCurrent(self._gl_ctx)	# Real the explicit GL context
 
 		# check if gl was initialized
@@ -210,6 +328,7 @@ class plotter_base(wx.glcanvas.GLCanvas, common.mutex):
 
 		# show result
 		self.SwapBuffers()
+		self._frame_timer.stop()
 		self.unlock()
 
 	def update(self):
@@ -35,6 +35,8 @@ LEGEND_WIDTH = 8
 LEGEND_FONT_SIZE = 8
 LEGEND_BORDER_COLOR_SPEC = (0, 0, 0) #black
 MIN_PADDING = 0, 60, 0, 0 #top, right, bottom, left
+DROP_OLDEST = 'oldest' #overwrite the oldest pending line when the buffer is full
+DROP_NEWEST = 'newest' #discard the incoming line when the buffer is full
 
 ceil_log2 = lambda x: 2**int(math.ceil(math.log(x)/math.log(2)))
 
@@ -89,6 +91,68 @@ COLORS = {
 	),
 }
 
+##################################################
+# Pending Line Buffer
+##################################################
+class line_buffer(object):
+	"""
+	A fixed capacity ring buffer of rgba lines waiting for texture upload.
+	Lines are colorized directly into the buffer storage.
+	When the gl thread falls behind, lines are dropped by the drop policy
+	so that memory stays bounded.
+	"""
+
+	def __init__(self, capacity, line_size, drop_policy=DROP_OLDEST):
+		"""
+		Create a new line buffer.
+
+                Args:
+		    capacity: the maximum number of pending lines
+		    line_size: the number of pixels per line
+		    drop_policy: DROP_OLDEST or DROP_NEWEST
+		"""
+		if drop_policy not in (DROP_OLDEST, DROP_NEWEST):
+			raise ValueError, 'unknown drop policy "%s"'%drop_policy
+		self._lines = numpy.zeros((max(capacity, 1), line_size), numpy.uint32)
+		self._drop_policy = drop_policy
+		self._head = 0 #index of the oldest pending line
+		self._count = 0
+		self.dropped = 0
+
+	def __len__(self): return self._count
+
+	def next_line(self):
+		"""
+		Reserve storage for a new line.
+
+                Returns:
+		    a writable line array or None if the line was dropped
+		"""
+		capacity = len(self._lines)
+		if self._count == capacity:
+			self.dropped += 1
+			if self._drop_policy == DROP_NEWEST: return None
+			self._head = (self._head + 1)%capacity
+			self._count -= 1
+		index = (self._head + self._count)%capacity
+		self._count += 1
+		return self._lines[index]
+
+	def pop_all(self):
+		"""
+		Remove all pending lines.
+
+                Returns:
+		    a contiguous array of lines, oldest first
+		"""
+		capacity = len(self._lines)
+		end = self._head + self._count
+		if end <= capacity: lines = self._lines[self._head:end].copy()
+		else: lines = numpy.concatenate((self._lines[self._head:], self._lines[:end - capacity]))
+		self._head = 0
+		self._count = 0
+		return lines
+
 ##################################################
 # Waterfall Plotter
 ##################################################
@@ -109,7 +173,9 @@ class waterfall_plotter(grid_plotter_base):
 		self._minimum = 0
 		self._maximum = 0
 		self._fft_size = 1
-		self._buffer = list()
+		self._buffer_size = None
+		self._drop_policy = DROP_OLDEST
+		self._buffer = line_buffer(1, self._fft_size)
 		self._pointer = 0
 		self._counter = 0
 		self.set_num_lines(0)
@@ -137,9 +203,18 @@ class waterfall_plotter(grid_plotter_base):
 		GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, GL.GL_REPEAT)
 		GL.glTexEnvi(GL.GL_TEXTURE_ENV, GL.GL_TEXTURE_ENV_MODE, GL.GL_REPLACE)
 		#write the buffer to the texture
-		while self._buffer:
-			GL.glTexSubImage2D(GL.GL_TEXTURE_2D, 0, 0, self._pointer, self._fft_size, 1, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, self._buffer.pop(0))
-			self._pointer = (self._pointer + 1)%self._num_lines
+		lines = self._buffer.pop_all()
+		if not self._num_lines: lines = lines[:0]
+		#only the newest num_lines lines can be visible
+		if len(lines) > self._num_lines:
+			self._pointer = (self._pointer + len(lines) - self._num_lines)%self._num_lines
+			lines = lines[-self._num_lines:]
+		#upload in at most two spans, split where the texture wraps
+		while len(lines):
+			num = min(len(lines), self._num_lines - self._pointer)
+			GL.glTexSubImage2D(GL.GL_TEXTURE_2D, 0, 0, self._pointer, self._fft_size, num, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, lines[:num])
+			self._pointer = (self._pointer + num)%self._num_lines
+			lines = lines[num:]
 		#begin drawing
 		GL.glEnable(GL.GL_TEXTURE_2D)
 		GL.glPushMatrix()
@@ -226,7 +301,7 @@ class waterfall_plotter(grid_plotter_base):
 			self._resize_texture_flag = flag
 			return
 		if not self._resize_texture_flag: return
-		self._buffer = list()
+		self._new_buffer()
 		self._pointer = 0
 		if self._num_lines and self._fft_size:
 			GL.glBindTexture(GL.GL_TEXTURE_2D, self._waterfall_texture)
@@ -234,6 +309,36 @@ class waterfall_plotter(grid_plotter_base):
 			GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, GL.GL_RGBA, ceil_log2(self._fft_size), self._num_lines, 0, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, data)
 		self._resize_texture_flag = False
 
+	def _new_buffer(self):
+		"""
+		Create an empty line buffer for the current fft size.
+		Without an explicit size, hold at most one screen of lines.
+		"""
+		capacity = self._buffer_size or self._num_lines
+		self._buffer = line_buffer(capacity, self._fft_size, self._drop_policy)
+
+	def set_buffer_size(self, buffer_size=None, drop_policy=DROP_OLDEST):
+		"""
+		Set the number of lines that may wait for upload.
+
+                Args:
+		    buffer_size: the number of lines or None for num lines
+		    drop_policy: DROP_OLDEST or DROP_NEWEST
+		"""
+		if drop_policy not in (DROP_OLDEST, DROP_NEWEST):
+			raise ValueError, 'unknown drop policy "%s"'%drop_policy
+		self.lock()
+		self._buffer_size = buffer_size
+		self._drop_policy = drop_policy
+		self._new_buffer()
+		self.unlock()
+
+	def get_dropped_lines(self):
+		"""
+		Get the number of lines dropped because the buffer was full.
+		"""
+		return self._buffer.dropped
+
 	def set_color_mode(self, color_mode):
 		"""
 		Set the color mode.
@@ -261,6 +366,7 @@ class waterfall_plotter(grid_plotter_base):
 		self.lock()
 		self._num_lines = num_lines
 		self._resize_texture(True)
+		self._new_buffer()
 		self.update()
 		self.unlock()
 
@@ -283,12 +389,14 @@ class waterfall_plotter(grid_plotter_base):
 		if self._fft_size != len(samples):
 			self._fft_size = len(samples)
 			self._resize_texture(True)
-		#normalize the samples to min/max
-		samples = (samples - minimum)*float(255/(maximum-minimum))
-		samples = numpy.clip(samples, 0, 255) #clip
-		samples = numpy.array(samples, numpy.uint8)
-		#convert the samples to RGBA data
-		data = COLORS[self._color_mode][samples].tostring()
-		self._buffer.append(data)
+			self._new_buffer()
+		line = self._buffer.next_line()
+		if line is not None:
+			#normalize the samples to min/max
+			samples = numpy.asarray(samples, numpy.float32) - minimum
+			samples *= 255.0/(maximum-minimum)
+			numpy.clip(samples, 0, 255, out=samples) #clip
+			#convert the samples to RGBA data in place
+			COLORS[self._color_mode].take(samples.astype(numpy.uint8), out=line)
 		self._waterfall_cache.changed(True)
 		self.unlock()
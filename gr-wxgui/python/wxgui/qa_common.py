@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+#
+# Copyright 2013 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr_unittest
+from gnuradio.wxgui import common
+import numpy
+
+#the implementations common.py had before the trace processor
+def old_get_min_max(samples):
+	factor = 2.0
+	mean = numpy.average(samples)
+	std = numpy.std(samples)
+	fft = numpy.abs(numpy.fft.fft(samples - mean))
+	envelope = 2*numpy.max(fft)/len(samples)
+	ampl = max(std, envelope) or 0.1
+	return mean - factor*ampl, mean + factor*ampl
+
+def old_get_min_max_fft(fft_samps):
+	peak_level = numpy.max(fft_samps)
+	noise_samps = numpy.sort(fft_samps)[:len(fft_samps)/2]
+	noise_floor = numpy.average(noise_samps)
+	noise_dev = numpy.std(noise_samps)
+	return noise_floor - abs(2*noise_dev), peak_level
+
+def old_reorder(samples, real):
+	num_samps = len(samples)
+	if real: return samples[:(num_samps+1)/2]
+	return numpy.concatenate((samples[num_samps/2+1:], samples[:(num_samps+1)/2]))
+
+class test_common(gr_unittest.TestCase):
+
+	def setUp(self):
+		self.rng = numpy.random.RandomState(0)
+
+	def test_001_get_min_max(self):
+		for num in (1, 2, 7, 64, 1001):
+			samples = self.rng.randn(num).astype(numpy.float32)
+			self.assertFloatTuplesAlmostEqual(
+				old_get_min_max(samples), common.get_min_max(samples), 4)
+
+	def test_002_get_lower_half(self):
+		for num in (0, 1, 2, 7, 64, 1001):
+			samples = self.rng.randn(num)
+			self.assertEqual(
+				list(numpy.sort(samples)[:num/2]),
+				list(numpy.sort(common.get_lower_half(samples))))
+
+	def test_003_get_min_max_fft(self):
+		for num in (2, 7, 64, 1001):
+			samples = self.rng.randn(num)
+			self.assertFloatTuplesAlmostEqual(
+				old_get_min_max_fft(samples), common.get_min_max_fft(samples), 6)
+
+	def test_004_process(self):
+		for real in (False, True):
+			processor = common.trace_processor(shift=True, real=real)
+			traces = []
+			for num in (16, 16, 15):
+				samples = self.rng.randn(num).astype(numpy.float32)
+				trace = processor.process(samples.tostring(), num)
+				self.assertEqual(list(old_reorder(samples, real)), list(trace))
+				traces.append((trace, trace.copy()))
+			#a trace is not overwritten by the next frames
+			for trace, copy in traces:
+				self.assertEqual(list(copy), list(trace))
+
+	def test_005_process_size(self):
+		processor = common.trace_processor()
+		samples = self.rng.randn(32).astype(numpy.float32)
+		#only the first frame, scaled
+		trace = processor.process(samples.tostring(), 8, scale=100)
+		self.assertFloatTuplesAlmostEqual(100*samples[:8], trace, 4)
+
+	def test_006_hold_peak(self):
+		processor = common.trace_processor()
+		frames = [self.rng.randn(8).astype(numpy.float32) for i in range(4)]
+		peaks = []
+		for frame in frames:
+			processor.process(frame.tostring(), 8)
+			peak = processor.hold_peak()
+			peaks.append((peak, peak.copy()))
+		self.assertEqual(list(numpy.max(frames, axis=0)), list(peaks[-1][0]))
+		for peak, copy in peaks:
+			self.assertEqual(list(copy), list(peak))
+		processor.reset_peak()
+		processor.process(frames[0].tostring(), 8)
+		self.assertEqual(list(frames[0]), list(processor.hold_peak()))
+
+
+if __name__ == '__main__':
+	gr_unittest.run(test_common, "test_common.xml")
@@ -624,14 +624,17 @@ class scope_window(wx.Panel, pubsub.pubsub):
 			if num_samps < 2: self[T_PER_DIV_KEY] = common.get_clean_incr(self[T_PER_DIV_KEY])
 			#num samps in bounds, plot each waveform
 			elif num_samps <= len(sampleses[0]):
+				num_cols = self.plotter.get_num_columns()
 				for i, samples in enumerate(sampleses):
+					#reduce to the plot width
+					samples, factor = common.reduce_samples(samples[samps_off:num_samps+samps_off], num_cols)
 					#plot samples
 					self.plotter.set_waveform(
 						channel='Ch%d'%(i+1),
-						samples=samples[samps_off:num_samps+samps_off],
+						samples=samples,
 						color_spec=CHANNEL_COLOR_SPECS[i],
 						marker=self[common.index_key(MARKER_KEY, i)],
-						trig_off=self.trigger_offset,
+						trig_off=self.trigger_offset/factor,
 					)
 			#turn XY channel off
 			self.plotter.clear_waveform(channel='XY')
@@ -28,7 +28,7 @@ from gnuradio import gr, filter
 from gnuradio import blocks
 from gnuradio import analog
 from gnuradio import wxgui
-from pubsub import pubsub
+from pubsub import pubsub, wx_dispatcher
 from constants import *
 import math
 
@@ -123,7 +123,7 @@ class _scope_sink_base(gr.hier_block2, common.wxgui_hb):
 		for i in range(actual_num_inputs):
 			self.controller[common.index_key(AC_COUPLE_KEY, i)] = ac_couple
 		#start input watcher
-		common.input_watcher(msgq, self.controller, MSG_KEY)
+		common.input_watcher(msgq, self.controller, MSG_KEY, coalesce=True)
 		#create window
 		self.win = scope_window.scope_window(
 			parent=parent,
@@ -168,6 +168,8 @@ class _scope_sink_base(gr.hier_block2, common.wxgui_hb):
 						ac_couple_block(self.controller, common.index_key(AC_COUPLE_KEY, 2*i+j), SAMPLE_RATE_KEY),
 						(scope, 2*i+j),
 					)
+		#updates after construction are collapsed and delivered in the gui thread
+		self.controller.set_dispatcher(wx_dispatcher())
 
 class scope_sink_f(_scope_sink_base):
 	_item_size = gr.sizeof_float
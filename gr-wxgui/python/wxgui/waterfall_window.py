@@ -198,6 +198,7 @@ class waterfall_window(wx.Panel, pubsub.pubsub):
 		self.samples = list()
 		self.real = real
 		self.fft_size = fft_size
+		self._processor = common.trace_processor(shift=True, real=real)
 		#proxy the keys
 		self.proxy(MSG_KEY, controller, msg_key)
 		self.proxy(DECIMATION_KEY, controller, decimation_key)
@@ -251,7 +252,7 @@ class waterfall_window(wx.Panel, pubsub.pubsub):
 		Does not affect the current data in the waterfall.
 		"""
 		if not len(self.samples): return
-		min_level, max_level = common.get_min_max_fft(self.samples)
+		min_level, max_level = self._processor.get_min_max()
 		#set the range and level
 		self[DYNAMIC_RANGE_KEY] = common.get_clean_num(max_level - min_level)
 		self[REF_LEVEL_KEY] = DYNAMIC_RANGE_STEP*round(.5+max_level/DYNAMIC_RANGE_STEP)
@@ -267,12 +268,10 @@ class waterfall_window(wx.Panel, pubsub.pubsub):
 		    msg: the fft array as a character array
 		"""
 		if not self[RUNNING_KEY]: return
-		#convert to floating point numbers
-		self.samples = samples = numpy.fromstring(msg, numpy.float32)[:self.fft_size] #only take first frame
-		num_samps = len(samples)
-		#reorder fft
-		if self.real: samples = samples[:(num_samps+1)/2]
-		else: samples = numpy.concatenate((samples[num_samps/2+1:], samples[:(num_samps+1)/2]))
+		#convert to floating point numbers and reorder fft
+		self.samples = samples = self._processor.process(msg, self.fft_size) #only take first frame
+		#reduce to the plot width, keep the strongest bin of each column
+		samples = common.reduce_samples(samples, self.plotter.get_num_columns(), common.REDUCE_MAX)[0]
 		#plot the fft
 		self.plotter.set_samples(
 			samples=samples,
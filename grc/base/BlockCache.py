@@ -0,0 +1,161 @@
+"""
+Copyright 2013 Free Software Foundation, Inc.
+This file is part of GNU Radio
+
+GNU Radio Companion is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+GNU Radio Companion is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+"""
+
+from __future__ import with_statement
+import os
+import tempfile
+import cPickle as pickle
+
+#bump when the format of the nested data changes
+CACHE_VERSION = 1
+
+
+def file_stamp(path):
+    """
+    Get the stamp of a file used to tell if it changed.
+
+    Args:
+        path: the file path
+
+    Returns:
+        a (mtime, size) tuple or None if the file does not exist
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime, st.st_size)
+
+
+class BlockCache(object):
+    """
+    A persistent cache of the nested data parsed from xml files.
+
+    An entry stays valid as long as the modification time and size of
+    its file are unchanged, so an unchanged file is neither validated
+    nor parsed again. The whole cache is dropped when any of the
+    dependency files (the dtds) changes.
+
+    The nested data is kept pickled, so the caller may modify the data
+    it gets without changing the cache.
+    """
+
+    def __init__(self, cache_file, dependencies=()):
+        """
+        Make a cache and load it from the cache file.
+
+        Args:
+            cache_file: the path of the cache file
+            dependencies: file paths that invalidate the cache when changed
+        """
+        self._cache_file = cache_file
+        self._header = (CACHE_VERSION, [(path, file_stamp(path)) for path in dependencies])
+        self._entries = dict()
+        self._used = set()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        """Load the cache file, an unreadable or stale cache is ignored"""
+        self._entries = dict()
+        self._used = set()
+        self._dirty = False
+        try:
+            header, entries = pickle.load(open(self._cache_file, 'rb'))
+        except Exception:
+            return
+        if header == self._header:
+            self._entries = entries
+
+    def save(self):
+        """
+        Write the cache file if anything changed.
+        Entries of files not looked up since the last load are dropped.
+        """
+        if set(self._entries.keys()) != self._used:
+            self._entries = dict((path, self._entries[path]) for path in self._used)
+            self._dirty = True
+        if not self._dirty:
+            return
+        tmp_file = None
+        try:
+            cache_dir = os.path.dirname(self._cache_file)
+            if cache_dir and not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            #a unique file, several GRC instances may save at once
+            fd, tmp_file = tempfile.mkstemp(dir=cache_dir or os.curdir,
+                prefix=os.path.basename(self._cache_file) + '.')
+            with os.fdopen(fd, 'wb') as fp:
+                pickle.dump((self._header, self._entries), fp, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_file, self._cache_file)
+            self._dirty = False
+        except (IOError, OSError):
+            if tmp_file is not None:
+                try: os.remove(tmp_file)
+                except OSError: pass
+
+    def is_valid(self, path):
+        """
+        Is the cached entry of a file up to date?
+
+        Args:
+            path: the xml file path
+
+        Returns:
+            true if the file is cached and unchanged
+        """
+        entry = self._entries.get(path)
+        return entry is not None and entry[0] == file_stamp(path)
+
+    def lookup(self, path):
+        """
+        Get the cached nested data of a file.
+
+        Args:
+            path: the xml file path
+
+        Returns:
+            a tuple of the file stamp (to pass to store) and
+            the nested data or None if not cached or out of date
+        """
+        stamp = file_stamp(path)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            self._used.add(path)
+            self.hits += 1
+            return stamp, pickle.loads(entry[1])
+        self.misses += 1
+        return stamp, None
+
+    def store(self, path, stamp, nested_data):
+        """
+        Cache the nested data parsed from a file.
+
+        Args:
+            path: the xml file path
+            stamp: the file stamp returned by lookup before parsing
+            nested_data: the nested data
+        """
+        if stamp is None:
+            return
+        self._entries[path] = (stamp, pickle.dumps(nested_data, pickle.HIGHEST_PROTOCOL))
+        self._used.add(path)
+        self._dirty = True
@@ -23,3 +23,6 @@ import os
 DATA_DIR = os.path.dirname(__file__)
 FLOW_GRAPH_DTD = os.path.join(DATA_DIR, 'flow_graph.dtd')
 BLOCK_TREE_DTD = os.path.join(DATA_DIR, 'block_tree.dtd')
+
+#parse block xml in parallel only when there are at least this many files
+PARALLEL_PARSE_MIN_FILES = 64
@@ -60,6 +60,25 @@ def validate_dtd(xml_file, dtd_file=None):
     except etree.LxmlError:
         raise XMLSyntaxError(dtd.error_log)
 
+def parse_file(args):
+    """
+    Validate an xml file and create nested data from it.
+    Used to parse files in worker processes; errors are not reported.
+    
+    Args:
+        args: a tuple of the xml file path and the dtd file path
+    
+    Returns:
+        the nested data or None if the validation or parsing failed
+    """
+    xml_file, dtd_file = args
+    try:
+        validate_dtd(xml_file, dtd_file)
+        return from_file(xml_file)
+    except Exception:
+        return None
+
+
 def from_file(xml_file):
     """
     Create nested data from an xml file using the from xml helper.
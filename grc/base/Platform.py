@@ -20,19 +20,21 @@ Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 import os
 import sys
 from .. base import ParseXML, odict
+from BlockCache import BlockCache
 from Element import Element as _Element
 from FlowGraph import FlowGraph as _FlowGraph
 from Connection import Connection as _Connection
 from Block import Block as _Block
 from Port import Port as _Port
 from Param import Param as _Param
-from Constants import BLOCK_TREE_DTD, FLOW_GRAPH_DTD
+from Constants import BLOCK_TREE_DTD, FLOW_GRAPH_DTD, PARALLEL_PARSE_MIN_FILES
 
 
 class Platform(_Element):
     def __init__(self, name, version, key,
                  block_paths, block_dtd, default_flow_graph, generator,
-                 license='', website=None, colors=None):
+                 license='', website=None, colors=None, block_cache=None,
+                 parse_workers=1):
         """
         Make a platform from the arguments.
         
@@ -47,6 +49,9 @@ class Platform(_Element):
             colors: a list of title, color_spec tuples
             license: a multi-line license (first line is copyright)
             website: the website url for this platform
+            block_cache: the optional file path to cache parsed block xml in
+            parse_workers: the number of processes to parse block xml with,
+                0 for one per CPU
         
         Returns:
             a platform object
@@ -62,6 +67,11 @@ class Platform(_Element):
         self._default_flow_graph = default_flow_graph
         self._generator = generator
         self._colors = colors or []
+        self._block_cache = None
+        if block_cache:
+            self._block_cache = BlockCache(block_cache, (block_dtd, BLOCK_TREE_DTD))
+        self._parse_workers = parse_workers
+        self._parsed_xml = dict()
         #create a dummy flow graph for the blocks
         self._flow_graph = _Element(self)
 
@@ -77,8 +87,11 @@ class Platform(_Element):
         self._blocks_n = odict()
         self._category_trees_n = list()
         ParseXML.xml_failures.clear()
+        if self._block_cache: self._block_cache.load()
+        xml_files = list(self.iter_xml_files())
+        self._parsed_xml = self.parse_xml_files(xml_files)
         # try to parse and load blocks
-        for xml_file in self.iter_xml_files():
+        for xml_file in xml_files:
             try:
                 if xml_file.endswith("block_tree.xml"):
                     self.load_category_tree_xml(xml_file)
@@ -89,6 +102,8 @@ class Platform(_Element):
                 pass
             except Exception as e:
                 print >> sys.stderr, 'Warning: Block loading failed:\n\t%s\n\tIgnoring: %s' % (e, xml_file)
+        self._parsed_xml = dict()
+        if self._block_cache: self._block_cache.save()
 
     def iter_xml_files(self):
         """Iterator for block descriptions and category trees"""
@@ -100,11 +115,74 @@ class Platform(_Element):
                     for filename in sorted(filter(lambda f: f.endswith('.xml'), filenames)):
                         yield os.path.join(dirpath, filename)
 
+    def get_dtd(self, xml_file):
+        """Get the dtd load_blocks validates an xml file from the block paths against"""
+        if xml_file.endswith("block_tree.xml"): return BLOCK_TREE_DTD
+        return self._block_dtd
+
+    def parse_xml_files(self, xml_files):
+        """
+        Validate and parse xml files in parallel with a pool of worker processes.
+        Files in the block cache are skipped. Files that fail are left out
+        and parsed again by parse_xml, which reports the errors.
+        
+        Args:
+            xml_files: a list of xml files
+        
+        Returns:
+            a dict of xml file to nested data
+        """
+        if self._block_cache:
+            xml_files = filter(lambda f: not self._block_cache.is_valid(f), xml_files)
+        if self._parse_workers == 1 or len(xml_files) < PARALLEL_PARSE_MIN_FILES:
+            return dict()
+        #multiprocessing needs python 2.6, parse serially without it
+        try: import multiprocessing
+        except ImportError: return dict()
+        parse_workers = self._parse_workers
+        if parse_workers < 1:
+            try: parse_workers = multiprocessing.cpu_count()
+            except NotImplementedError: return dict()
+        if parse_workers < 2: return dict()
+        args = [(xml_file, self.get_dtd(xml_file)) for xml_file in xml_files]
+        try:
+            pool = multiprocessing.Pool(min(parse_workers, len(args)))
+            try:
+                results = pool.map(ParseXML.parse_file, args, chunksize=16)
+            finally:
+                pool.close()
+                pool.join()
+        except (OSError, ImportError):  # no processes here, parse serially
+            return dict()
+        return dict((f, n) for f, n in zip(xml_files, results) if n is not None)
+
+    def parse_xml(self, xml_file, dtd_file):
+        """
+        Validate and parse an xml file from the block paths.
+        Files that are unchanged since they were cached are not parsed again.
+        
+        Args:
+            xml_file: the xml file
+            dtd_file: the dtd to validate against
+        
+        Returns:
+            nested data
+        @throws exception if the validation fails
+        """
+        stamp, n = None, None
+        if self._block_cache: stamp, n = self._block_cache.lookup(xml_file)
+        if n is None:
+            n = self._parsed_xml.pop(xml_file, None)
+            if n is None:
+                ParseXML.validate_dtd(xml_file, dtd_file)
+                n = ParseXML.from_file(xml_file)
+            if self._block_cache: self._block_cache.store(xml_file, stamp, n)
+        return n
+
     def load_block_xml(self, xml_file):
         """Load block description from xml file"""
         # validate and import
-        ParseXML.validate_dtd(xml_file, self._block_dtd)
-        n = ParseXML.from_file(xml_file).find('block')
+        n = self.parse_xml(xml_file, self._block_dtd).find('block')
         n['block_wrapper_path'] = xml_file  # inject block wrapper path
         # get block instance and add it to the list of blocks
         block = self.Block(self._flow_graph, n)
@@ -117,8 +195,7 @@ class Platform(_Element):
 
     def load_category_tree_xml(self, xml_file):
         """Validate and parse category tree file and add it to list"""
-        ParseXML.validate_dtd(xml_file, BLOCK_TREE_DTD)
-        n = ParseXML.from_file(xml_file).find('cat')
+        n = self.parse_xml(xml_file, BLOCK_TREE_DTD).find('cat')
         self._category_trees_n.append(n)
 
     def parse_flow_graph(self, flow_graph_file):
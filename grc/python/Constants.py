@@ -36,6 +36,15 @@ BLOCKS_DIRS = filter( #filter blank strings
 
 #user settings
 XTERM_EXECUTABLE = _gr_prefs.get_string('grc', 'xterm_executable', 'xterm')
+#parsed block xml is cached here, an empty path disables the cache
+BLOCK_CACHE_FILE = _gr_prefs.get_string('grc', 'block_cache',
+    os.path.join(os.path.expanduser('~'), '.gnuradio', 'grc_block_cache'))
+#block xml not in the cache is parsed with this many processes, 1 to disable, 0 for one per CPU
+PARSE_WORKERS = _gr_prefs.get_long('grc', 'parse_workers', 0)
+
+#bounds of the cache of evaluated expressions
+EVAL_CACHE_ENTRIES = _gr_prefs.get_long('grc', 'eval_cache_entries', 4096)
+EVAL_CACHE_BYTES = _gr_prefs.get_long('grc', 'eval_cache_bytes', 64*1024*1024)
 
 #file creation modes
 TOP_BLOCK_FILE_MODE = stat.S_IRUSR | stat.S_IWUSR | stat.S_IXUSR | stat.S_IRGRP | stat.S_IWGRP | stat.S_IXGRP | stat.S_IROTH
@@ -0,0 +1,154 @@
+"""
+Copyright 2013 Free Software Foundation, Inc.
+This file is part of GNU Radio
+
+GNU Radio Companion is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+GNU Radio Companion is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+"""
+
+import sys
+import heapq
+import itertools
+import expr_utils
+
+
+def get_size(obj):
+    """
+    Estimate the memory used by an evaluated object.
+    Arrays report their buffer size, sequences add up their items.
+
+    Args:
+        obj: any object
+
+    Returns:
+        the size in bytes
+    """
+    size = getattr(obj, 'nbytes', None)
+    if isinstance(size, (int, long)): return size
+    try: size = sys.getsizeof(obj)
+    except TypeError: return 0
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(map(sys.getsizeof, obj))
+    return size
+
+
+class EvalCache(object):
+    """
+    A least recently used cache of evaluated expressions.
+
+    An entry is keyed on the code and remembers the versions of the
+    names the code uses. It is only valid while those versions are
+    unchanged, so changing a variable invalidates the expressions that
+    use it and no others. The cache holds at most max_entries entries
+    and about max_bytes of evaluated objects; the least recently used
+    entries are dropped first.
+    """
+
+    def __init__(self, max_entries=4096, max_bytes=64*1024*1024):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        #code -> [last use, names, versions, value, size]
+        self._entries = dict()
+        #heap of (last use, code), items older than the entry are skipped
+        self._uses = list()
+        self._clock = itertools.count()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self): return len(self._entries)
+
+    def get(self, code, get_version):
+        """
+        Get the cached value of the code.
+
+        Args:
+            code: a string with python code
+            get_version: a function returning the current version of a name
+
+        Returns:
+            a tuple of True and the value, or False and None if not cached
+        """
+        entry = self._entries.get(code)
+        if entry is not None:
+            if entry[2] == tuple(map(get_version, entry[1])):
+                entry[0] = self._clock.next()
+                self._push(entry[0], code)
+                self.hits += 1
+                return True, entry[3]
+            del self._entries[code] #stale, drop it
+            self._bytes -= entry[4]
+        self.misses += 1
+        return False, None
+
+    def put(self, code, get_version, value):
+        """
+        Cache the value of the code.
+
+        Args:
+            code: a string with python code
+            get_version: a function returning the current version of a name
+            value: the evaluated object
+        """
+        entry = self._entries.pop(code, None)
+        if entry is not None: self._bytes -= entry[4]
+        names = tuple(sorted(expr_utils.get_identifiers(code)))
+        size = get_size(value)
+        entry = [self._clock.next(), names, tuple(map(get_version, names)), value, size]
+        self._entries[code] = entry
+        self._push(entry[0], code)
+        self._bytes += size
+        if len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            self._evict()
+
+    def _push(self, last_use, code):
+        """
+        Record a use of the code. Earlier uses stay in the heap until
+        they are popped, so rebuild it when it holds too many of them.
+        """
+        if len(self._uses) > 2*len(self._entries) + 64:
+            self._uses = [(entry[0], c) for c, entry in self._entries.iteritems()]
+            heapq.heapify(self._uses)
+        else: heapq.heappush(self._uses, (last_use, code))
+
+    def _evict(self):
+        """
+        Drop the least recently used entries until the cache is within
+        its bounds again. The newest entry is always kept.
+        """
+        while len(self._entries) > 1 and (len(self._entries) > self._max_entries or self._bytes > self._max_bytes):
+            last_use, code = heapq.heappop(self._uses)
+            entry = self._entries.get(code)
+            if entry is None or entry[0] != last_use: continue #outdated use
+            self._bytes -= self._entries.pop(code)[4]
+            self.evictions += 1
+
+    def clear(self):
+        """Drop all entries"""
+        self._entries.clear()
+        self._uses = list()
+        self._bytes = 0
+
+    def stats(self):
+        """
+        Get the cache statistics.
+
+        Returns:
+            a dict with entries, bytes, hits, misses and evictions
+        """
+        return dict(
+            entries=len(self._entries), bytes=self._bytes,
+            hits=self.hits, misses=self.misses, evictions=self.evictions,
+        )
@@ -18,9 +18,11 @@ Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 """
 
 import expr_utils
+from EvalCache import EvalCache
 from .. base.FlowGraph import FlowGraph as _FlowGraph
 from .. gui.FlowGraph import FlowGraph as _GUIFlowGraph
 from .. base.odict import odict
+from Constants import EVAL_CACHE_ENTRIES, EVAL_CACHE_BYTES
 import re
 
 _variable_matcher = re.compile('^(variable\w*)$')
@@ -34,29 +36,39 @@ _bus_struct_src_searcher = re.compile('^(bus_structure_source)$')
 class FlowGraph(_FlowGraph, _GUIFlowGraph):
 
     def __init__(self, **kwargs):
+        self._init_namespace()
         _FlowGraph.__init__(self, **kwargs)
         _GUIFlowGraph.__init__(self)
-        self._eval_cache = dict()
 
-    def _eval(self, code, namespace, namespace_hash):
+    def _init_namespace(self):
+        #incrementally evaluated namespace, see _renew_namespace
+        self.n = dict()
+        self.n_hash = 0
+        self._ns_imports = None
+        self._ns_base = dict()
+        self._ns_codes = dict()
+        self._ns_versions = dict()
+        self._eval_cache = EvalCache(EVAL_CACHE_ENTRIES, EVAL_CACHE_BYTES)
+
+    def _eval(self, code, namespace):
         """
         Evaluate the code with the given namespace.
+        The result is cached until a variable used by the code changes.
         
         Args:
             code: a string with python code
             namespace: a dict representing the namespace
-            namespace_hash: a unique hash for the namespace
         
         Returns:
             the resultant object
         """
         if not code: raise Exception, 'Cannot evaluate empty statement.'
-        my_hash = hash(code) ^ namespace_hash
-        #cache if does not exist
-        if not self._eval_cache.has_key(my_hash):
-            self._eval_cache[my_hash] = eval(code, namespace, namespace)
-        #return from cache
-        return self._eval_cache[my_hash]
+        get_version = self._ns_versions.get
+        cached, e = self._eval_cache.get(code, get_version)
+        if not cached:
+            e = eval(code, namespace, namespace)
+            self._eval_cache.put(code, get_version, e)
+        return e
 
     def get_io_signaturev(self, direction):
         """
@@ -228,29 +240,89 @@ class FlowGraph(_FlowGraph, _GUIFlowGraph):
         """
         if self._renew_eval_ns:
             self._renew_eval_ns = False
+            self._renew_namespace()
+        #evaluate
+        e = self._eval(expr, self.n)
+        return e
+
+    def _renew_namespace(self):
+        """
+        Bring the namespace up to date with the parameters and variables.
+
+        Only the parameters and variables whose code changed, and the
+        variables that depend on them, are evaluated again. Every name
+        has a version that is bumped when its value is re-evaluated or
+        removed; n_hash is the latest version, so it changes with any
+        value in the namespace. A change of the imports reloads the
+        whole namespace.
+        """
+        imports = self.get_imports()
+        if imports != self._ns_imports:
             #reload namespace
             n = dict()
             #load imports
-            for imp in self.get_imports():
+            for imp in imports:
                 try: exec imp in n
                 except: pass
-            #load parameters
-            np = dict()
-            for parameter in self.get_parameters():
-                try:
-                    e = eval(parameter.get_param('value').to_code(), n, n)
-                    np[parameter.get_id()] = e
-                except: pass
-            n.update(np) #merge param namespace
-            #load variables
-            for variable in self.get_variables():
-                try:
-                    e = eval(variable.get_param('value').to_code(), n, n)
-                    n[variable.get_id()] = e
-                except: pass
-            #make namespace public
-            self.n = n
-            self.n_hash = hash(str(n))
-        #evaluate
-        e = self._eval(expr, self.n, self.n_hash)
-        return e
+            self._ns_imports = imports
+            self._ns_base = n
+            self._ns_codes = dict()
+            self.n = dict(n)
+            self._eval_cache.clear()
+        n = self.n
+
+        parameters = [(p.get_id(), p.get_param('value').to_code()) for p in self.get_parameters()]
+        variables = [(v.get_id(), v.get_param('value').to_code()) for v in self.get_variables()]
+        codes = dict(parameters + variables)
+        removed = filter(lambda id: id not in codes, self._ns_codes.keys())
+        changed = set(filter(lambda id: self._ns_codes.get(id) != codes[id], codes.keys()))
+        changed.update(removed)
+        if not changed: return
+
+        #find everything downstream of the changes
+        exprs = dict(codes)
+        for id in removed: exprs[id] = ''
+        dirty = expr_utils.get_dependents(expr_utils.get_graph(exprs), changed)
+
+        def bump(id):
+            self.n_hash += 1
+            self._ns_versions[id] = self.n_hash
+
+        def unbind(id):
+            #uncover the import the id may have shadowed
+            if id in self._ns_base: n[id] = self._ns_base[id]
+            else: n.pop(id, None)
+
+        for id in removed:
+            unbind(id)
+            self._ns_codes.pop(id)
+            self._ns_versions.pop(id, None)
+            self.n_hash += 1
+        #load parameters, in the namespace of the imports only
+        for id, code in parameters:
+            if id not in dirty: continue
+            unbind(id)
+            try: n[id] = eval(code, self._ns_base, self._ns_base)
+            except: pass
+            self._ns_codes[id] = code
+            bump(id)
+        #load variables
+        for id, code in variables:
+            if id not in dirty: continue
+            unbind(id)
+            try: n[id] = eval(code, n, n)
+            except: pass
+            self._ns_codes[id] = code
+            bump(id)
+
+    def get_namespace_version(self, id):
+        """
+        Get the version of a parameter or variable in the namespace.
+
+        Args:
+            id: the parameter or variable id
+
+        Returns:
+            an int that changes when the value is evaluated again, or None
+        """
+        return self._ns_versions.get(id)
@@ -29,7 +29,7 @@ from Param import Param as _Param
 from Generator import Generator
 from Constants import \
     HIER_BLOCKS_LIB_DIR, BLOCK_DTD, \
-    DEFAULT_FLOW_GRAPH, BLOCKS_DIRS
+    DEFAULT_FLOW_GRAPH, BLOCKS_DIRS, BLOCK_CACHE_FILE, PARSE_WORKERS
 import Constants
 
 COLORS = [(name, color) for name, key, sizeof, color in Constants.CORE_TYPES]
@@ -57,6 +57,8 @@ class Platform(_Platform, _GUIPlatform):
             default_flow_graph=DEFAULT_FLOW_GRAPH,
             generator=Generator,
             colors=COLORS,
+            block_cache=BLOCK_CACHE_FILE,
+            parse_workers=PARSE_WORKERS,
         )
         _GUIPlatform.__init__(self)
 
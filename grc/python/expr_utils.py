@@ -49,6 +49,10 @@ class graph(object):
 
     def get_edges(self, node_key): return self._graph[node_key]
 
+#memoized results of expr_split, flushed when it grows too large
+_expr_split_cache = dict()
+_EXPR_SPLIT_CACHE_SIZE = 16384
+
 def expr_split(expr):
     """
     Split up an expression by non alphanumeric characters, including underscore.
@@ -61,6 +65,14 @@ def expr_split(expr):
     Returns:
         a list of string tokens that form expr
     """
+    try: return list(_expr_split_cache[expr])
+    except KeyError: pass
+    if len(_expr_split_cache) >= _EXPR_SPLIT_CACHE_SIZE: _expr_split_cache.clear()
+    toks = _expr_split(expr)
+    _expr_split_cache[expr] = tuple(toks)
+    return toks
+
+def _expr_split(expr):
     toks = list()
     tok = ''
     quote = ''
@@ -96,6 +108,18 @@ def expr_replace(expr, replace_dict):
             expr_splits[i] = replace_dict[es]
     return ''.join(expr_splits)
 
+def get_identifiers(expr):
+    """
+    Get the names an expression could refer to.
+    
+    Args:
+        expr: an expression string
+    
+    Returns:
+        a set of the identifier tokens in expr
+    """
+    return set(filter(lambda t: t[0] in string.letters + '_', expr_split(expr)))
+
 def get_variable_dependencies(expr, vars):
     """
     Return a set of variables used in this expression.
@@ -107,7 +131,7 @@ def get_variable_dependencies(expr, vars):
     Returns:
         a subset of vars used in the expression
     """
-    expr_toks = expr_split(expr)
+    expr_toks = set(expr_split(expr))
     return set(filter(lambda v: v in expr_toks, vars))
 
 def get_graph(exprs):
@@ -120,15 +144,35 @@ def get_graph(exprs):
     Returns:
         a graph of variable deps
     """
-    vars = exprs.keys()
+    vars = set(exprs.keys())
     #get dependencies for each expression, load into graph
     var_graph = graph()
     for var in vars: var_graph.add_node(var)
     for var, expr in exprs.iteritems():
-        for dep in get_variable_dependencies(expr, vars):
+        for dep in vars.intersection(expr_split(expr)):
             if dep != var: var_graph.add_edge(dep, var)
     return var_graph
 
+def get_dependents(var_graph, var_keys):
+    """
+    Get the variables that depend on the given variables, directly or not.
+    
+    Args:
+        var_graph: a graph of variable deps (see get_graph)
+        var_keys: an iterable of variable names
+    
+    Returns:
+        a set of the given variable names and all their dependents
+    """
+    dependents = set(var_keys)
+    stack = list(dependents)
+    while stack:
+        for var in var_graph.get_edges(stack.pop()):
+            if var in dependents: continue
+            dependents.add(var)
+            stack.append(var)
+    return dependents
+
 def sort_variables(exprs):
     """
     Get a list of variables in order of dependencies.
@@ -141,16 +185,30 @@ def sort_variables(exprs):
     @throws Exception circular dependencies
     """
     var_graph = get_graph(exprs)
+    #Kahn's algorithm from the variables nothing depends on: a variable is
+    #ready once all its dependents are placed, its level is one more than
+    #the highest level of its dependents.
+    #Sorting each level keeps the order of the former peel-off-the-leaves loop.
+    nodes = var_graph.get_nodes()
+    dependencies = dict((var, list()) for var in nodes)
+    num_dependents = dict()
+    for var in nodes:
+        edges = var_graph.get_edges(var)
+        num_dependents[var] = len(edges)
+        for dep in edges: dependencies[dep].append(var)
+    levels = [filter(lambda var: not num_dependents[var], nodes)]
+    num_sorted = 0
+    while levels[-1]:
+        num_sorted += len(levels[-1])
+        next_level = list()
+        for var in levels[-1]:
+            for dep in dependencies[var]:
+                num_dependents[dep] -= 1
+                if not num_dependents[dep]: next_level.append(dep)
+        levels.append(next_level)
+    if num_sorted != len(nodes): raise Exception('circular dependency caught in sort_variables')
     sorted_vars = list()
-    #determine dependency order
-    while var_graph.get_nodes():
-        #get a list of nodes with no edges
-        indep_vars = filter(lambda var: not var_graph.get_edges(var), var_graph.get_nodes())
-        if not indep_vars: raise Exception('circular dependency caught in sort_variables')
-        #add the indep vars to the end of the list
-        sorted_vars.extend(sorted(indep_vars))
-        #remove each edge-less node from the graph
-        for var in indep_vars: var_graph.remove_node(var)
+    for level in levels: sorted_vars.extend(sorted(level))
     return reversed(sorted_vars)
 
 def sort_objects(objects, get_id, get_expr):
@@ -173,5 +231,26 @@ def sort_objects(objects, get_id, get_expr):
     #return list of sorted objects
     return [id2obj[id] for id in sorted_ids]
 
+def _benchmark(num_vars=5000, max_deps=4):
+    """Time sort_variables on a synthetic flow graph with many variables."""
+    import random, time
+    random.seed(0)
+    exprs = dict()
+    for i in range(num_vars):
+        deps = ['var_%d'%random.randrange(i) for j in range(random.randint(0, min(i, max_deps)))]
+        exprs['var_%d'%i] = '+'.join(deps + ['%d'%i])
+    _expr_split_cache.clear()
+    t0 = time.time()
+    sorted_vars = list(sort_variables(exprs))
+    t1 = time.time()
+    print 'sort_variables: %d variables in %.3f s'%(len(sorted_vars), t1 - t0)
+    #check the order
+    position = dict((var, i) for i, var in enumerate(sorted_vars))
+    var_graph = get_graph(exprs)
+    for var in var_graph.get_nodes():
+        for dependent in var_graph.get_edges(var):
+            assert position[var] < position[dependent]
+
 if __name__ == '__main__':
     for i in sort_variables({'x':'1', 'y':'x+1', 'a':'x+y', 'b':'y+1', 'c':'a+b+x+y'}): print i
+    _benchmark()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Copyright 2013 Free Software Foundation, Inc.
+This file is part of GNU Radio
+
+GNU Radio Companion is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+GNU Radio Companion is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+"""
+
+import numpy
+from gnuradio import gr_unittest
+from grc.python.EvalCache import EvalCache, get_size
+
+class test_eval_cache(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.versions = dict(x=1, y=1)
+        self.get_version = self.versions.get
+
+    def test_001_hit(self):
+        cache = EvalCache()
+        self.assertEqual((False, None), cache.get('x+1', self.get_version))
+        cache.put('x+1', self.get_version, 2)
+        self.assertEqual((True, 2), cache.get('x+1', self.get_version))
+        stats = cache.stats()
+        self.assertEqual((1, 1, 1, 0), (stats['entries'], stats['hits'], stats['misses'], stats['evictions']))
+
+    def test_002_stale(self):
+        cache = EvalCache()
+        cache.put('x+1', self.get_version, numpy.zeros(100))
+        cache.put('y+1', self.get_version, 2)
+        self.versions['x'] = 2
+        #only the entry using the changed name is dropped
+        self.assertEqual((False, None), cache.get('x+1', self.get_version))
+        self.assertEqual((True, 2), cache.get('y+1', self.get_version))
+        self.assertEqual(1, len(cache))
+        self.assertEqual(get_size(2), cache.stats()['bytes'])
+
+    def test_003_evict_entries(self):
+        cache = EvalCache(max_entries=2)
+        cache.put('1', self.get_version, 1)
+        cache.put('2', self.get_version, 2)
+        #using an entry keeps it from being evicted
+        cache.get('1', self.get_version)
+        cache.put('3', self.get_version, 3)
+        self.assertEqual(2, len(cache))
+        self.assertEqual((True, 1), cache.get('1', self.get_version))
+        self.assertEqual((False, None), cache.get('2', self.get_version))
+        self.assertEqual((True, 3), cache.get('3', self.get_version))
+        self.assertEqual(1, cache.stats()['evictions'])
+
+    def test_004_evict_bytes(self):
+        cache = EvalCache(max_bytes=2500)
+        for i in range(3):
+            cache.put(str(i), self.get_version, numpy.zeros(1000, numpy.uint8))
+        self.assertEqual(2, len(cache))
+        self.assertEqual(2000, cache.stats()['bytes'])
+        self.assertEqual((False, None), cache.get('0', self.get_version))
+        #an entry larger than the cache is still kept until the next put
+        cache.put('big', self.get_version, numpy.zeros(5000, numpy.uint8))
+        self.assertEqual(1, len(cache))
+        self.assertEqual(5000, cache.stats()['bytes'])
+        self.assertEqual(3, cache.stats()['evictions'])
+
+    def test_005_clear(self):
+        cache = EvalCache()
+        cache.put('x', self.get_version, numpy.zeros(10))
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.stats()['bytes'])
+
+
+if __name__ == '__main__':
+    gr_unittest.run(test_eval_cache, "test_eval_cache.xml")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Copyright 2013 Free Software Foundation, Inc.
+This file is part of GNU Radio
+
+GNU Radio Companion is free software; you can redistribute it and/or
+modify it under the terms of the GNU General Public License
+as published by the Free Software Foundation; either version 2
+of the License, or (at your option) any later version.
+
+GNU Radio Companion is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+"""
+
+import math
+from gnuradio import gr_unittest
+from grc.python.FlowGraph import FlowGraph
+
+class _value(object):
+    def __init__(self, code): self._code = code
+    def to_code(self): return self._code
+
+class _variable(object):
+    def __init__(self, id, code): self._id, self._value = id, _value(code)
+    def get_id(self): return self._id
+    def get_param(self, key): return self._value
+
+class _flow_graph(FlowGraph):
+    """
+    A flow graph with only the namespace, its imports and
+    variables are set directly instead of through blocks.
+    """
+    def __init__(self, imports):
+        self._init_namespace()
+        self.imports = imports
+        self.variables = []
+    def get_imports(self): return self.imports
+    def get_parameters(self): return []
+    def get_variables(self): return self.variables
+    def set_variables(self, variables):
+        self.variables = [_variable(id, code) for id, code in variables]
+        self._renew_eval_ns = True
+
+class test_flow_graph(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.fg = _flow_graph(['from math import pi'])
+
+    def test_001_add(self):
+        self.fg.set_variables([('x', 'pi*2')])
+        self.assertEqual(2*math.pi, self.fg.evaluate('x'))
+        self.fg.set_variables([('x', 'pi*2'), ('y', 'x+1')])
+        self.assertEqual(2*math.pi + 1, self.fg.evaluate('y'))
+
+    def test_002_shadow_remove(self):
+        self.fg.set_variables([('pi', '3'), ('x', 'pi*2')])
+        self.assertEqual(6, self.fg.evaluate('x'))
+        #removing the variable uncovers the import again
+        self.fg.set_variables([('x', 'pi*2')])
+        self.assertEqual(math.pi, self.fg.evaluate('pi'))
+        self.assertEqual(2*math.pi, self.fg.evaluate('x'))
+
+    def test_003_shadow_rename(self):
+        self.fg.set_variables([('pi', '3'), ('x', 'pi*2')])
+        self.assertEqual(6, self.fg.evaluate('x'))
+        self.fg.set_variables([('p', '3'), ('x', 'pi*2')])
+        self.assertEqual(3, self.fg.evaluate('p'))
+        self.assertEqual(math.pi, self.fg.evaluate('pi'))
+        self.assertEqual(2*math.pi, self.fg.evaluate('x'))
+
+    def test_004_shadow_fail(self):
+        self.fg.set_variables([('pi', '3'), ('x', 'pi*2')])
+        self.assertEqual(6, self.fg.evaluate('x'))
+        #a variable that fails to evaluate leaves the import bound
+        self.fg.set_variables([('pi', '1/0'), ('x', 'pi*2')])
+        self.assertEqual(math.pi, self.fg.evaluate('pi'))
+        self.assertEqual(2*math.pi, self.fg.evaluate('x'))
+
+    def test_005_fail(self):
+        self.fg.set_variables([('x', '1'), ('y', 'x+1')])
+        self.assertEqual(2, self.fg.evaluate('y'))
+        self.fg.set_variables([('x', 'undefined_name'), ('y', 'x+1')])
+        self.assertRaises(NameError, self.fg.evaluate, 'x')
+        self.assertRaises(NameError, self.fg.evaluate, 'y')
+        self.fg.set_variables([('x', '2'), ('y', 'x+1')])
+        self.assertEqual(3, self.fg.evaluate('y'))
+
+    def test_006_versions(self):
+        self.fg.set_variables([('x', '1'), ('y', 'x+1'), ('z', '5')])
+        self.fg.evaluate('y')
+        x, y, z = map(self.fg.get_namespace_version, ('x', 'y', 'z'))
+        self.fg.set_variables([('x', '2'), ('y', 'x+1'), ('z', '5')])
+        self.assertEqual(3, self.fg.evaluate('y'))
+        #the changed variable and its dependents are evaluated again
+        self.assertNotEqual(x, self.fg.get_namespace_version('x'))
+        self.assertNotEqual(y, self.fg.get_namespace_version('y'))
+        self.assertEqual(z, self.fg.get_namespace_version('z'))
+
+
+if __name__ == '__main__':
+    gr_unittest.run(test_flow_graph, "test_flow_graph.xml")